@@ -0,0 +1,358 @@
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from ichor.core.atoms import ALF, Atom, Atoms
+from ichor.core.calculators import calculate_alf_features_batched
+from ichor.core.common.constants import ang2bohr
+from ichor.core.common.units import AtomicDistance
+from ichor.core.models.calculate_fflux_derivatives import (
+    fflux_derivs,
+    fflux_periodic_features,
+    fflux_predict_values,
+)
+from ichor.core.models.gaussian_energy_derivative_wrt_features import form_b_matrix
+from ichor.core.models.kernels import PeriodicKernel, RBF
+from ichor.core.models.kernels.kernel import KernelProd
+from ichor.core.models.mean import ConstantMean
+from ichor.core.models.model import Model
+from ichor.core.models.predict_forces_for_all_atoms import (
+    predict_fflux_forces_for_all_atoms,
+)
+
+benchmarked_functions = (
+    "form_b_matrix",
+    "fflux_derivs",
+    "predict_fflux_forces_for_all_atoms",
+)
+
+
+def generate_geometry(
+    natoms: int,
+    rng: Optional[np.random.Generator] = None,
+    bond_length: float = 1.2,
+    min_distance: float = 1.0,
+) -> np.ndarray:
+    """Generates a random molecule-like geometry, where every atom is bonded to an atom placed before it.
+
+    :param natoms: The number of atoms
+    :param rng: The random number generator to use
+    :param bond_length: The distance between every new atom and the atom it is bonded to, in Angstroms
+    :param min_distance: The minimum distance between any two atoms, in Angstroms
+    :return: An ``natoms`` x 3 array of coordinates in Angstroms
+    """
+
+    rng = rng or np.random.default_rng()
+    coordinates = np.zeros((natoms, 3))
+
+    i = 1
+    while i < natoms:
+        direction = rng.normal(size=3)
+        direction /= np.linalg.norm(direction)
+        new_atom = coordinates[rng.integers(i)] + bond_length * direction
+        if np.linalg.norm(coordinates[:i] - new_atom, axis=-1).min() > min_distance:
+            coordinates[i] = new_atom
+            i += 1
+
+    return coordinates
+
+
+def nearest_neighbour_alf(coordinates: np.ndarray) -> List[ALF]:
+    """Returns an ALF for every atom, using the closest atom as the x-axis atom and the next closest
+    atom that is not (nearly) collinear with the x-axis as the xy-plane atom.
+
+    :param coordinates: An ``natoms`` x 3 array of coordinates
+    """
+
+    natoms = len(coordinates)
+    system_alf = []
+    for i in range(natoms):
+        distances = np.linalg.norm(coordinates - coordinates[i], axis=-1)
+        neighbours = [j for j in np.argsort(distances) if j != i]
+        x_axis_idx = int(neighbours[0])
+        if natoms == 2:
+            system_alf.append(ALF(i, x_axis_idx))
+            continue
+
+        x_axis = coordinates[x_axis_idx] - coordinates[i]
+        for j in neighbours[1:]:
+            xy_plane = coordinates[j] - coordinates[i]
+            cos_angle = np.dot(x_axis, xy_plane) / (
+                np.linalg.norm(x_axis) * np.linalg.norm(xy_plane)
+            )
+            if abs(cos_angle) < 0.98:
+                break
+        system_alf.append(ALF(i, x_axis_idx, int(j)))
+
+    return system_alf
+
+
+def random_fflux_models(
+    coordinates: np.ndarray,
+    system_alf: List[ALF],
+    ntrain: int = 100,
+    rng: Optional[np.random.Generator] = None,
+    atom_names: Optional[List[str]] = None,
+) -> List[Model]:
+    """Makes an iqa model with an rbf * periodic kernel for every atom, trained on the features of
+    random distortions of a geometry (with random weights). The models are only meant to test the
+    derivative code, the predictions do not mean anything.
+
+    :param coordinates: An ``natoms`` x 3 array of coordinates in Angstroms
+    :param system_alf: The ALF of every atom
+    :param ntrain: The number of training points of every model
+    :param rng: The random number generator to use
+    :param atom_names: The names of the atoms, C1, C2, ... by default
+    """
+
+    rng = rng or np.random.default_rng()
+    natoms = len(coordinates)
+    atom_names = atom_names or [f"C{i + 1}" for i in range(natoms)]
+
+    distorted = coordinates + rng.normal(scale=0.05, size=(ntrain, natoms, 3))
+    # n_atoms x ntrain x n_features
+    x_train = calculate_alf_features_batched(distorted, system_alf)
+    nfeatures = x_train.shape[-1]
+    periodic = fflux_periodic_features(nfeatures)
+
+    models = []
+    for atom_name, x in zip(atom_names, x_train):
+        kernel = KernelProd(
+            RBF(
+                "k1",
+                rng.uniform(0.1, 1.0, size=np.count_nonzero(~periodic)),
+                active_dims=np.flatnonzero(~periodic),
+            ),
+            PeriodicKernel(
+                "k2",
+                rng.uniform(0.1, 1.0, size=np.count_nonzero(periodic)),
+                np.full(np.count_nonzero(periodic), 2 * np.pi),
+                active_dims=np.flatnonzero(periodic),
+            ),
+        )
+        models.append(
+            Model(
+                Path(f"BENCHMARK_iqa_{atom_name}.model"),
+                atom_name=atom_name,
+                prop="iqa",
+                kernel=kernel,
+                mean=ConstantMean(-0.5),
+                x=x,
+                weights=rng.normal(scale=1e-3, size=(ntrain, 1)),
+                use_binary=False,
+            )
+        )
+    return models
+
+
+def five_point_derivative(
+    func: Callable[[np.ndarray], np.ndarray], coordinates: np.ndarray, h: float = 1e-3
+) -> np.ndarray:
+    """Returns the derivatives of a function of the coordinates with respect to every coordinate,
+    calculated with the five point stencil (the error is of order h^4).
+
+    :param func: A function which takes an ``n_geometries`` x ``natoms`` x 3 array of coordinates
+        and returns an ``n_geometries`` x ... array of values
+    :param coordinates: An ``natoms`` x 3 array of coordinates
+    :param h: The step size
+    :return: An ... x ``3 natoms`` array of derivatives
+    """
+
+    ncoordinates = coordinates.size
+    steps = np.array([2.0, 1.0, -1.0, -2.0]) * h
+    displacements = (
+        steps[:, np.newaxis, np.newaxis] * np.eye(ncoordinates)[np.newaxis]
+    ).reshape(-1, *coordinates.shape)
+
+    values = func(coordinates + displacements)
+    values = values.reshape(4, ncoordinates, *values.shape[1:])
+    derivatives = (-values[0] + 8.0 * values[1] - 8.0 * values[2] + values[3]) / (
+        12.0 * h
+    )
+    return np.moveaxis(derivatives, 0, -1)
+
+
+def _time_call(func: Callable, repeats: int) -> float:
+    """Returns the fastest time of a number of calls of a function"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _errors(analytic: np.ndarray, reference: np.ndarray) -> dict:
+    max_abs_error = np.abs(analytic - reference).max()
+    return {
+        "max_abs_error": max_abs_error,
+        "max_rel_error": max_abs_error / max(np.abs(reference).max(), 1e-300),
+    }
+
+
+def benchmark_feature_derivatives(
+    natoms: Sequence[int] = (3, 5, 10, 20, 40, 60),
+    functions: Sequence[str] = benchmarked_functions,
+    repeats: int = 3,
+    ntrain: int = 100,
+    h: float = 1e-3,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Times the analytic derivative code (`form_b_matrix`, `fflux_derivs` and `predict_fflux_forces_for_all_atoms`)
+    on generated geometries of different sizes and checks it against five point finite differences.
+
+    - ``form_b_matrix`` is compared to the derivatives of the features of the first atom
+    - ``fflux_derivs`` is timed for the derivative of the energy of the first atom with respect to an atom which
+      is not part of its ALF (the most expensive case), and compared to the derivatives of its predicted energy
+    - ``predict_fflux_forces_for_all_atoms`` is compared to the negative derivatives of the total predicted energy
+
+    The models used are random (see `random_fflux_models`), so only the derivatives are meaningful.
+
+    :param natoms: The numbers of atoms of the generated geometries
+    :param functions: The functions to benchmark, see ``benchmarked_functions``
+    :param repeats: The number of times every function is called, the fastest call is reported
+    :param ntrain: The number of training points of the models
+    :param h: The finite differences step size, in Bohr
+    :param seed: Seed of the random number generator used for the geometries and models
+    :return: A DataFrame with the function, number of atoms, latency (in seconds) and the maximum absolute and
+        relative error compared to finite differences of every benchmark. See also `scaling_exponents`.
+    """
+
+    unknown_functions = set(functions) - set(benchmarked_functions)
+    if unknown_functions:
+        raise ValueError(
+            f"Cannot benchmark {sorted(unknown_functions)}, functions must be in {benchmarked_functions}."
+        )
+
+    rng = np.random.default_rng(seed)
+    results = []
+
+    for n in natoms:
+        if n < 3:
+            raise ValueError("Benchmarks need geometries of at least 3 atoms.")
+
+        coordinates = generate_geometry(n, rng)
+        system_alf = nearest_neighbour_alf(coordinates)
+        atoms = Atoms([Atom("C", *xyz) for xyz in coordinates])
+        bohr_coordinates = coordinates * ang2bohr
+
+        def alf_features(c: np.ndarray) -> np.ndarray:
+            # the reference features are calculated with `calculate_alf_features_batched`, which does not
+            # share any code with the analytic derivatives that are benchmarked
+            return np.swapaxes(
+                calculate_alf_features_batched(
+                    c, system_alf, units=AtomicDistance.Bohr
+                ),
+                0,
+                1,
+            )
+
+        reference_features = alf_features(bohr_coordinates[np.newaxis])
+        periodic = fflux_periodic_features(reference_features.shape[-1])
+
+        def features(c: np.ndarray) -> np.ndarray:
+            # n_geometries x n_atoms x n_features, the coordinates are in Bohr
+            # phi features are wrapped so that they do not jump between -pi and pi
+            # with the displacements (the models are periodic in phi anyway)
+            f = alf_features(c)
+            difference = f[..., periodic] - reference_features[..., periodic]
+            f[..., periodic] -= 2 * np.pi * np.round(difference / (2 * np.pi))
+            return f
+
+        if "form_b_matrix" in functions:
+            analytic = form_b_matrix(atoms, system_alf, 0)
+            reference = five_point_derivative(
+                lambda c: features(c)[:, 0], bohr_coordinates, h
+            )
+            results.append(
+                {
+                    "function": "form_b_matrix",
+                    "natoms": n,
+                    "latency": _time_call(
+                        lambda: form_b_matrix(atoms, system_alf, 0), repeats
+                    ),
+                    **_errors(analytic, reference),
+                }
+            )
+
+        if {"fflux_derivs", "predict_fflux_forces_for_all_atoms"} & set(functions):
+            models = random_fflux_models(
+                coordinates, system_alf, ntrain, rng, atoms.atom_names
+            )
+
+        if "fflux_derivs" in functions:
+            # the first atom which is not in the ALF of the first atom, or the x-axis atom for 3 atoms
+            non_alf_atoms = [i for i in range(n) if i not in system_alf[0]]
+            iatm_idx = non_alf_atoms[0] if non_alf_atoms else system_alf[0][1]
+            bohr_atoms = atoms.to_bohr()
+
+            analytic = fflux_derivs(iatm_idx, 0, bohr_atoms, system_alf, models[0])
+            reference = five_point_derivative(
+                lambda c: fflux_predict_values(models[0], features(c)[:, 0])[0],
+                bohr_coordinates,
+                h,
+            ).reshape(n, 3)[iatm_idx]
+            results.append(
+                {
+                    "function": "fflux_derivs",
+                    "natoms": n,
+                    "latency": _time_call(
+                        lambda: fflux_derivs(
+                            iatm_idx, 0, bohr_atoms, system_alf, models[0]
+                        ),
+                        repeats,
+                    ),
+                    **_errors(analytic, reference),
+                }
+            )
+
+        if "predict_fflux_forces_for_all_atoms" in functions:
+
+            def total_energy(c: np.ndarray) -> np.ndarray:
+                f = features(c)
+                return sum(
+                    fflux_predict_values(model, f[:, i])[0]
+                    for i, model in enumerate(models)
+                )
+
+            analytic = predict_fflux_forces_for_all_atoms(atoms, models, system_alf)
+            reference = -five_point_derivative(
+                total_energy, bohr_coordinates, h
+            ).reshape(n, 3)
+            results.append(
+                {
+                    "function": "predict_fflux_forces_for_all_atoms",
+                    "natoms": n,
+                    "latency": _time_call(
+                        lambda: predict_fflux_forces_for_all_atoms(
+                            atoms, models, system_alf
+                        ),
+                        repeats,
+                    ),
+                    **_errors(analytic, reference),
+                }
+            )
+
+    return pd.DataFrame(
+        results,
+        columns=["function", "natoms", "latency", "max_abs_error", "max_rel_error"],
+    )
+
+
+def scaling_exponents(results: pd.DataFrame) -> pd.Series:
+    """Returns the scaling exponent of the latency of every function with the number of atoms, i.e. the
+    slope of a straight line fitted to log(latency) against log(natoms), from the results of
+    `benchmark_feature_derivatives`. Functions benchmarked for less than two sizes are not included.
+
+    :param results: The DataFrame returned by `benchmark_feature_derivatives`
+    """
+
+    exponents = {}
+    for function, df in results.groupby("function", sort=False):
+        if df["natoms"].nunique() > 1:
+            exponents[function] = np.polyfit(
+                np.log(df["natoms"]), np.log(df["latency"]), 1
+            )[0]
+    return pd.Series(exponents, name="scaling_exponent", dtype=float)
@@ -4,7 +4,6 @@ from typing import List, Optional, Union
 import matplotlib.pyplot as plt
 import numpy as np
 from ichor.core.calculators import default_connectivity_calculator
-from ichor.core.common.pairwise import pairwise
 from ichor.core.files import DlPolyHistory, GJF, Trajectory, XYZ
 from ichor.core.files.file import ReadFile
 
@@ -12,13 +11,26 @@ from ichor.core.files.file import ReadFile
 from ichor.core.models.kernels.distance import Distance
 
 
+def _distance_matrices(coordinates: np.ndarray) -> np.ndarray:
+    """Computes the distance matrices of all timesteps at once.
+
+    :param coordinates: array of shape (timesteps, natoms, 3)
+    :return: numpy array of shape (timesteps, natoms, natoms)
+    """
+    diff = coordinates[:, :, np.newaxis, :] - coordinates[:, np.newaxis, :, :]
+    return np.sqrt(np.einsum("ijkl,ijkl->ijk", diff, diff))
+
+
 class TrajectoryAnalysis(ReadFile):
     """TrajectoryAnalysis is a class used for general analysis of
     molecular dynamics trajectories.
-    Functionality for now comprehends only distribution of distances for a single molecule
+    Functionality for now comprehends only distribution of distances for a single molecule.
+    The trajectory is processed in chunks of timesteps (see `Trajectory.iter_chunks`),
+    so the whole trajectory is never held in memory at once.
 
     :param trajectory_path: Path to the trajectory file. Can be an xyz or a DLPOLY4 trajectory.
     :type trajectory_path: Union[Path, str]
+    :param chunk_size: The number of timesteps that are processed at a time, defaults to 1000
 
     Example usage:
 
@@ -31,7 +43,7 @@ class TrajectoryAnalysis(ReadFile):
 
     _filetype = ".xyz"
 
-    def __init__(self, trajectory_path: Union[Path, str]):
+    def __init__(self, trajectory_path: Union[Path, str], chunk_size: int = 1000):
         ReadFile.__init__(self, trajectory_path)
         trajectory_path = Path(trajectory_path)
         self.trajectory = (
@@ -39,35 +51,51 @@ class TrajectoryAnalysis(ReadFile):
             if trajectory_path.suffix == ".xyz"
             else DlPolyHistory(trajectory_path)
         )
-        self.distances_vectors = self._compute_distances_vectors()
+        self.chunk_size = chunk_size
+        self._distances_vectors = None
         self._bond_lengths_matrix = None
 
     def _read_file(self):
         self.trajectory._read_file()
 
-    def _compute_distances_vectors(self):
+    @property
+    def distances_vectors(self) -> np.ndarray:
         """
-        Computes the distance between atoms for each timestep and stores.
+        Returns the distances between atoms for all timesteps.
+
+        :return: numpy array of shape (timesteps, natoms * (natoms - 1) / 2)
+        """
+        if self._distances_vectors is None:
+            self._distances_vectors = self._compute_distances_vectors()
+        return self._distances_vectors
+
+    @staticmethod
+    def _chunk_distances_vectors(coordinates: np.ndarray) -> np.ndarray:
+        """
+        Computes the distance between atoms for each timestep of a chunk.
         The diagonal is not needed because that contains 0.0 values, additionally
         only half of the distance matrix is needed because it is symmetric
         """
-        d = np.zeros(
-            (len(self.trajectory), self.trajectory.natoms, self.trajectory.natoms)
-        )
-
-        for i, t in enumerate(self.trajectory):
-            d[i] = Distance.euclidean_distance(t.coordinates, t.coordinates)
+        d = _distance_matrices(coordinates)
 
         # indices of the upper triangular matrix but without the main diagonal
         # the main diagonal only has 0.0 in it because it is distance of atom from itself
-        # only need to get these once because they remain the same
-        indices = np.triu_indices_from(d[0], k=1)
+        indices = np.triu_indices(d.shape[1], k=1)
 
         # grab the upper triangular part as a vector
         # store into a ntimesteps x ndistances matrix
-        d2 = np.array([tmp[indices] for tmp in d])
+        return d[:, indices[0], indices[1]]
 
-        return d2
+    def _compute_distances_vectors(self):
+        """
+        Computes the distance between atoms for each timestep and stores.
+        """
+        return np.concatenate(
+            [
+                self._chunk_distances_vectors(chunk.coordinates)
+                for chunk in self.trajectory.iter_chunks(self.chunk_size)
+            ]
+        )
 
     def delta_dirac(self, r0: float, r1: float) -> int:
         """
@@ -103,21 +131,26 @@ class TrajectoryAnalysis(ReadFile):
         :param nbins: number of bins to consider for the distance range considered, defaults to 1000
         :param max_dist: maximum distance to consider for the distribution, defaults to 10.0
         """
-        distributions_list = []
-
         r = self.r(nbins, max_dist)
 
-        natoms = self.trajectory.natoms
-        ntimesteps = len(self.trajectory)
+        # number of distances that are between two neighbouring values of r (as in delta_dirac)
+        distributions = np.zeros(len(r) - 1, dtype=int)
+        natoms = 0
+        ntimesteps = 0
 
-        for pair in pairwise(r):
-            distribution = self.delta_dirac(pair[0], pair[1])
-            distributions_list.append(
-                distribution
-                / (ntimesteps * (natoms * (natoms - 1)))  # this is to average it out
-            )
+        for chunk in self.trajectory.iter_chunks(self.chunk_size):
+            distances = self._chunk_distances_vectors(chunk.coordinates).ravel()
+            # index of the first value of r that is larger than or equal to each distance
+            bins = np.searchsorted(r, distances, side="left")
+            inside = (bins > 0) & (bins < len(r))
+            inside[inside] = r[bins[inside]] != distances[inside]
+            distributions += np.bincount(bins[inside] - 1, minlength=len(r) - 1)
 
-        return distributions_list
+            natoms = chunk.natoms
+            ntimesteps += len(chunk)
+
+        # this is to average it out
+        return list(distributions / (ntimesteps * (natoms * (natoms - 1))))
 
     def plot_hr(
         self,
@@ -170,8 +203,9 @@ class Stability(TrajectoryAnalysis):
         reference_path: Union[Path, str],
         trajectory_path: Union[Path, str],
         threshold: float,
+        chunk_size: int = 1000,
     ):
-        super().__init__(trajectory_path)
+        super().__init__(trajectory_path, chunk_size)
         reference_path = Path(reference_path)
         self.reference = (
             XYZ(reference_path)
@@ -195,24 +229,31 @@ class Stability(TrajectoryAnalysis):
             self._compute_bond_lengths_matrix()
         return self._bond_lengths_matrix
 
+    def _chunk_bond_lengths_matrix(self, coordinates: np.ndarray) -> np.ndarray:
+        """
+        Computes a distance matrix of all distances for the timesteps of a chunk and masks it with
+        the connectivity of the reference geometry.
+        """
+        return np.where(self.connectivity_ref, _distance_matrices(coordinates), 0)
+
     def _compute_bond_lengths_matrix(self):
         """
         Computes a distance matrix of all distances along a trajectory and masks it with
         the connectivity of the reference geometry.
         """
-        self._bond_lengths_matrix = np.zeros_like(self.distances_matrix)
-        # mask = connectivity[np.newaxis, ...].repeat(self.distances_matrix.shape[0], axis=0)
-        distances_matrix_masked = np.where(
-            self.connectivity_ref, self.distances_matrix, 0
+        self._bond_lengths_matrix = np.concatenate(
+            [
+                self._chunk_bond_lengths_matrix(chunk.coordinates)
+                for chunk in self.trajectory.iter_chunks(self.chunk_size)
+            ]
         )
-        self._bond_lengths_matrix = distances_matrix_masked
 
-    def bond_lengths_differences_matrix(self) -> np.ndarray:
+    def _chunk_bond_lengths_differences_matrix(
+        self, bond_lengths_matrix: np.ndarray
+    ) -> np.ndarray:
         """
         Computes a matrix of the differences of distances
-        between a reference geometry and all the timesteps of a trajectory.
-
-        :return: numpy array of dimensions (timesteps,natoms,natoms)
+        between a reference geometry and the given bond lengths matrices.
         """
         reference_distance_matrix = Distance.euclidean_distance(
             self.reference.coordinates, self.reference.coordinates
@@ -220,29 +261,56 @@ class Stability(TrajectoryAnalysis):
         reference_distance_matrix_masked = np.where(
             self.connectivity_ref, reference_distance_matrix, 0
         )
-        diff = (
-            self.bond_lengths_matrix
-            - reference_distance_matrix_masked[np.newaxis, :, :]
-        )
+        diff = bond_lengths_matrix - reference_distance_matrix_masked[np.newaxis, :, :]
         # Now creating a mask matrix where all the differences of distances
         # that are above a threshold return 1 while the rest is 0
         mask = np.where(np.abs(diff) > self.threshold, 1, 0)
         return mask
 
+    def bond_lengths_differences_matrix(self) -> np.ndarray:
+        """
+        Computes a matrix of the differences of distances
+        between a reference geometry and all the timesteps of a trajectory.
+
+        :return: numpy array of dimensions (timesteps,natoms,natoms)
+        """
+        return self._chunk_bond_lengths_differences_matrix(self.bond_lengths_matrix)
+
     def stable_trajectory(self):
         """
         Computes the bond_lengths_differences_matrix and then checks
         at which timesteps the trajectory is not stable and overwrites the original
         trajectory attribute with the stable trajectory only so that the distribution of distances
         hr can then be computed on the stable part of the trajectory.
+        The trajectory is checked chunk by chunk, stopping at the first unstable timestep.
         """
-        mask = self.bond_lengths_differences_matrix()
-        # indices where the trajectory is unstable above the threshold value
-        indices = np.nonzero(mask)
-        if indices[0].any():
-            print(
-                f"Timestep {indices[0][0]} has bonds over the threshold! Trajectory is unstable after this."
+        ntimesteps = 0
+
+        for chunk in self.trajectory.iter_chunks(self.chunk_size):
+            mask = self._chunk_bond_lengths_differences_matrix(
+                self._chunk_bond_lengths_matrix(chunk.coordinates)
             )
-            self.trajectory = self.trajectory[: indices[0][0]]
-        else:
-            print(f"Trajectory is fully stable for {len(self.trajectory)} steps")
+            # indices where the trajectory is unstable above the threshold value
+            indices = np.nonzero(mask.any(axis=(1, 2)))[0]
+            if len(indices):
+                unstable_timestep = ntimesteps + indices[0]
+                print(
+                    f"Timestep {unstable_timestep} has bonds over the threshold! Trajectory is unstable after this."
+                )
+                self.trajectory = self._first_timesteps(unstable_timestep)
+                self._distances_vectors = None
+                self._bond_lengths_matrix = None
+                return
+            ntimesteps += len(chunk)
+
+        print(f"Trajectory is fully stable for {ntimesteps} steps")
+
+    def _first_timesteps(self, ntimesteps: int) -> Trajectory:
+        """Returns a new Trajectory containing the first ``ntimesteps`` timesteps of the trajectory,
+        which is read chunk by chunk."""
+        trajectory = Trajectory(self.trajectory.path, read_geometries=False)
+        for chunk in self.trajectory.iter_chunks(self.chunk_size):
+            trajectory.extend(chunk[: ntimesteps - len(trajectory)])
+            if len(trajectory) == ntimesteps:
+                break
+        return trajectory
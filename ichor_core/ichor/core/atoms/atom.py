@@ -36,6 +36,32 @@ class Atom(VarReprMixin, Coordinates3D):
         Coordinates3D.__init__(self, x, y, z)
         self.units: AtomicDistance = units
 
+    @classmethod
+    def from_coordinates_view(
+        cls,
+        ty: str,
+        coordinates: np.ndarray,
+        index: Optional[int] = None,
+        parent: Optional["ichor.core.atoms.Atoms"] = None,  # noqa F821
+        units: AtomicDistance = AtomicDistance.Angstroms,
+    ) -> "Atom":  # noqa F821
+        """Makes an `Atom` instance whose coordinates are the given array (no copy is made).
+        This is used to make lightweight `Atom` instances which are views into a coordinate block.
+
+        :param ty: The element of the atom
+        :param coordinates: A float64 array of shape (3,), typically a row of a larger coordinate block
+        :param index: The index of the atom (1-indexed)
+        :param parent: The `Atoms` instance which holds the atom
+        :param units: The units of the coordinates
+        """
+        atom = cls.__new__(cls)
+        atom.type = ty.capitalize()
+        atom._index = index
+        atom._parent = parent
+        atom._coordinates = coordinates
+        atom.units = units
+        return atom
+
     @classmethod
     def from_atom(cls, atom: "Atom") -> "Atom":  # noqa F821
         return Atom(
@@ -1,3 +1,4 @@
+import copy
 import itertools as it
 from itertools import compress
 from typing import Callable, Dict, List, Optional, Sequence, Union
@@ -5,6 +6,7 @@ from typing import Callable, Dict, List, Optional, Sequence, Union
 import numpy as np
 from ichor.core.atoms.alf import ALF
 from ichor.core.atoms.atom import Atom
+from ichor.core.common.units import AtomicDistance
 
 
 class Atoms(list):
@@ -15,16 +17,81 @@ class Atoms(list):
 
     e.g. if we have a trajectory of methanol (6 atoms) with 1000 timesteps, we will have 1000 Atoms instances. Each
     of the Atoms instances will hold 6 instances of the Atom class.
+
+    The coordinates of all atoms are stored in one contiguous ``n_atoms`` x 3 float64 block and the coordinates
+    of every `Atom` instance are a view into a row of that block, so ``atoms.coordinates`` does not make a copy.
+
+    .. note::
+        An `Atom` instance can only be held by one `Atoms` instance. Adding an `Atom` which
+        already belongs to another `Atoms` instance adds a copy of the `Atom` instead.
     """
 
     def __init__(self, atoms: Optional[Sequence[Atom]] = None):
         super().__init__()
         self._centred = False
         self._counter = it.count(1)
+        self._coordinates = np.empty((0, 3))
         if atoms is not None:
             for atom in atoms:
                 self.add(atom)
 
+    @classmethod
+    def from_coordinates(
+        cls,
+        types: Sequence[str],
+        coordinates: np.ndarray,
+        indices: Optional[Sequence[int]] = None,
+        units: AtomicDistance = AtomicDistance.Angstroms,
+    ) -> "Atoms":
+        """Makes an `Atoms` instance which is a view into the given coordinate block (no copy is made).
+        Modifying the coordinates of the atoms in place also modifies the given array.
+
+        :param types: The elements of the atoms
+        :param coordinates: A float64 array of shape ``n_atoms`` x 3
+        :param indices: Optional indices of the atoms (1-indexed). By default, atoms are numbered from 1.
+        :param units: The units of the coordinates
+        """
+        atoms = cls()
+        atoms._bind(types, coordinates, indices, units)
+        return atoms
+
+    def _bind(
+        self,
+        types: Sequence[str],
+        coordinates: np.ndarray,
+        indices: Optional[Sequence[int]] = None,
+        units: AtomicDistance = AtomicDistance.Angstroms,
+        atom_class=Atom,
+    ):
+        """Fills an empty `Atoms` instance with `Atom` instances that are views into ``coordinates``."""
+        if indices is None:
+            indices = range(1, len(types) + 1)
+        self._coordinates = coordinates
+        for i, (ty, idx) in enumerate(zip(types, indices)):
+            list.append(
+                self,
+                atom_class.from_coordinates_view(ty, coordinates[i], idx, self, units),
+            )
+        self._counter = it.count(len(self) + 1)
+
+    def _rebind(self):
+        """Copies the coordinates of all held atoms into a new contiguous block
+        and makes every atom a view into that block. This is called after the
+        order or number of atoms changes."""
+        block = np.empty((len(self), 3))
+        for i, atom in enumerate(list.__iter__(self)):
+            block[i] = atom._coordinates
+            atom._coordinates = block[i]
+        self._coordinates = block
+
+    def _claim(self, atom: Atom) -> Atom:
+        """Returns the `Atom` instance which is going to be held by self. If the coordinates of the atom
+        are already a view into another coordinate block, a copy of the atom is returned instead."""
+        if atom._coordinates.base is not None:
+            atom = copy.copy(atom)
+        atom.parent = self
+        return atom
+
     def add(self, atom: Atom):
         """
         Add Atom instances for each atom in the timestep to the self._atoms list.
@@ -33,12 +100,85 @@ class Atoms(list):
         self.append(atom)
 
     def append(self, atom: Atom):
-        """Appends an `Atom` instance to self."""
-        atom.parent = self
+        """Appends an `Atom` instance to self. The coordinates of the atom are moved into the coordinate block."""
+        atom = self._claim(atom)
         if atom._index is None:
             atom.index = next(self._counter)
+
+        natoms = list.__len__(self)
+        if "_coordinates" not in self.__dict__:
+            # the instance was made without calling __init__, e.g. when unpickling
+            self._coordinates = np.empty((0, 3))
+        block = self._coordinates
+        # only grow the block if the row is not available,
+        # blocks which are views into other arrays are never written past their end
+        if natoms >= len(block) or block.base is not None:
+            new_block = np.empty((max(2 * natoms, 4), 3))
+            new_block[:natoms] = block[:natoms]
+            for i, a in enumerate(list.__iter__(self)):
+                a._coordinates = new_block[i]
+            block = new_block
+            self._coordinates = block
+        block[natoms] = atom._coordinates
+        atom._coordinates = block[natoms]
         super().append(atom)
 
+    def extend(self, atoms: Sequence[Atom]):
+        """Appends every `Atom` in ``atoms`` to self."""
+        for atom in atoms:
+            self.append(atom)
+
+    def __iadd__(self, atoms: Sequence[Atom]):
+        self.extend(atoms)
+        return self
+
+    def insert(self, i: int, atom: Atom):
+        """Inserts an `Atom` instance at position ``i``."""
+        self.append(atom)
+        atom = list.pop(self)
+        list.insert(self, i, atom)
+        self._rebind()
+
+    def pop(self, i: int = -1) -> Atom:
+        """Removes and returns the `Atom` at position ``i``. The returned atom no longer belongs to self."""
+        atom = list.pop(self, i)
+        atom._coordinates = atom._coordinates.copy()
+        atom._parent = None
+        self._rebind()
+        return atom
+
+    def remove(self, atom: Atom):
+        """Removes the first `Atom` instance equal to ``atom``."""
+        self.pop(self.index(atom))
+
+    def sort(self, *args, **kwargs):
+        list.sort(self, *args, **kwargs)
+        self._rebind()
+
+    def reverse(self):
+        list.reverse(self)
+        self._rebind()
+
+    def clear(self):
+        for atom in list.__iter__(self):
+            atom._coordinates = atom._coordinates.copy()
+            atom._parent = None
+        list.clear(self)
+        self._coordinates = np.empty((0, 3))
+
+    def __setitem__(self, i: int, atom: Atom):
+        if not isinstance(i, (int, np.integer)):
+            raise TypeError(
+                f"Index {i} has to be of type int. Currently index is type {type(i)}"
+            )
+        list.__setitem__(self, i, self._claim(atom))
+        self._rebind()
+
+    def __setstate__(self, state: dict):
+        """Restores the instance from a pickle and makes the atoms views into the coordinate block again."""
+        self.__dict__.update(state)
+        self._rebind()
+
     def copy(self) -> "Atoms":
         """Creates a new atoms instance (different object) from the current `Atoms` instance."""
         new = Atoms()
@@ -89,19 +229,14 @@ class Atoms(list):
 
     @property
     def coordinates(self) -> np.ndarray:
-        """Returns an array that contains the coordinates for each Atom instance held in the Atoms instance."""
-        return np.array([atom.coordinates for atom in self])
+        """Returns an ``n_atoms`` x 3 array that contains the coordinates for each Atom instance held in the Atoms
+        instance. This is a view into the coordinate block (no copy is made), so copy it before modifying it."""
+        return self._coordinates[: len(self)]
 
     @property
     def centroid(self) -> np.ndarray:
         """Returns the centroid of the system (the mean of the x,y,z coordinates of the atoms)."""
-        coordinates = self.coordinates.T
-
-        x = np.mean(coordinates[0])
-        y = np.mean(coordinates[1])
-        z = np.mean(coordinates[2])
-
-        return np.array([x, y, z])
+        return np.mean(self.coordinates, axis=0)
 
     @property
     def masses(self) -> List[float]:
@@ -129,14 +264,13 @@ class Atoms(list):
     ):
         """Centers the geometry on some atom. But this is still in GLOBAL Cartesian coordinates."""
         if isinstance(centre_atom, (int, str)):
-            centre_atom = self[centre_atom]
+            centre_atom = self[centre_atom].coordinates.copy()
         elif isinstance(centre_atom, list):
             centre_atom = self[centre_atom].centroid
         elif centre_atom is None:
             centre_atom = self.centroid
 
-        for atom in self:
-            atom.coordinates -= centre_atom
+        self.coordinates[...] -= centre_atom
 
         self._centred = True
 
@@ -292,8 +426,7 @@ class Atoms(list):
 
         centroid = self.centroid
         self.centre()
-        for atom in self:
-            atom.coordinates = R.dot(atom.coordinates.T).T
+        self.coordinates[...] = self.coordinates.dot(R.T)
         self.translate(centroid)
 
     def translate(self, v: np.ndarray):
@@ -301,8 +434,7 @@ class Atoms(list):
 
         :param v: numpy array of shape (3,) which is added to the coordinates of each atom.
         """
-        for atom in self:
-            atom.coordinates += v
+        self.coordinates[...] += v
 
     def __getitem__(self, item) -> Union[Atom, "Atoms"]:
         """Used to index the Atoms isinstance with various types of `item`.
@@ -319,7 +451,7 @@ class Atoms(list):
         elif isinstance(item, (list, np.ndarray, tuple)):
             if len(item) <= 0:
                 return Atoms()
-            if isinstance(item[0], (int, np.int, str)):
+            if isinstance(item[0], (int, np.integer, str)):
                 return Atoms([self[i] for i in item])
             elif isinstance(item[0], bool):
                 return Atoms(list(compress(self, item)))
@@ -330,12 +462,13 @@ class Atoms(list):
         e.g. del atoms[0], where atoms is an Atoms instance will delete the 0th element.
         del atoms["C1"] will delete the Atom instance with the name attribute of 'C1'."""
 
-        if not isinstance(i, (int, str)):
+        if not isinstance(i, (int, np.integer, str)):
             raise TypeError(
                 f"Index {i} has to be of type int. Currently index is type {type(i)}"
             )
-        else:
-            del self[i]
+        if isinstance(i, str):
+            i = self.atom_names.index(i.capitalize())
+        self.pop(i)
 
     def __str__(self):
         return "\n".join(str(atom) for atom in self)
@@ -356,8 +489,5 @@ class Atoms(list):
         return bool(len(self))
 
     def _rmsd(self, other: "Atoms") -> float:
-        dist = np.sum(
-            np.sum(np.power(jatom.coordinates - iatom.coordinates, 2))
-            for iatom, jatom in zip(self, other)
-        )
+        dist = np.sum(np.power(other.coordinates - self.coordinates, 2))
         return np.sqrt(dist / len(self))
@@ -1,10 +1,14 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Callable, Dict, List, Optional, Union
+from typing import Callable, Dict, Iterator, List, Optional, Union
 
 import numpy as np
 from ichor.core.atoms.atoms import ALF, Atoms
-from ichor.core.calculators import calculate_alf_features
+from ichor.core.calculators import (
+    calculate_alf_features,
+    calculate_alf_features_batched,
+)
+from ichor.core.common.units import AtomicDistance
 
 
 class ListOfAtoms(list, ABC):
@@ -67,6 +71,58 @@ class ListOfAtoms(list, ABC):
         """
         ...
 
+    @property
+    @abstractmethod
+    def units(self) -> AtomicDistance:
+        """Abstract method for units.
+
+        :return: The distance units of the coordinates. Assumes all timesteps use the same units as the first atom.
+        """
+        ...
+
+    def iter_chunks(
+        self, chunk_size: int = 1000
+    ) -> Iterator["ichor.core.files.Trajectory"]:  # noqa F821
+        """Iterates over the timesteps in chunks of up to ``chunk_size`` timesteps. Each chunk is a
+        `Trajectory` whose ``coordinates`` are a ``chunk_size`` x ``n_atoms`` x 3 array.
+
+        Only the coordinates of the current chunk are gathered into an array. Note that items which keep
+        their geometry once it has been read (e.g. the points of a `PointsDirectory`) still hold it
+        after their chunk has been processed.
+
+        :param chunk_size: The maximum number of timesteps in a chunk
+        :raises ValueError: If the chunk size is not positive
+        """
+        if chunk_size < 1:
+            raise ValueError(f"Chunk size must be positive, not {chunk_size}.")
+
+        return self._iter_atoms_chunks(chunk_size)
+
+    def _iter_atoms_chunks(
+        self, chunk_size: int
+    ) -> Iterator["ichor.core.files.Trajectory"]:  # noqa F821
+        from ichor.core.files import Trajectory
+
+        def to_trajectory(chunk: List[Atoms]) -> Trajectory:
+            return Trajectory.from_coordinates(
+                self.path,
+                np.array([atoms.coordinates for atoms in chunk]),
+                chunk[0].types_extended,
+                [atom.index for atom in chunk[0]],
+                chunk[0][0].units,
+            )
+
+        chunk = []
+        for timestep in self:
+            # e.g. the points of a PointsDirectory are not Atoms instances, but contain one
+            chunk.append(timestep if isinstance(timestep, Atoms) else timestep.atoms)
+            if len(chunk) == chunk_size:
+                yield to_trajectory(chunk)
+                chunk = []
+
+        if chunk:
+            yield to_trajectory(chunk)
+
     def features(
         self,
         feature_calculator: Callable[..., np.ndarray],
@@ -92,8 +148,19 @@ class ListOfAtoms(list, ABC):
             If the trajectory instance is indexed by slice, the array has shape `n_atoms` x`slice` x `n_features`.
             If a non-atomic calculator is passed, a `n_timesteps` x features (features could be vector, matrix, etc)
             is returned.
+
+        .. note::
+            If `calculate_alf_features` is passed in, the features for all timesteps are calculated at once
+            from the coordinates array with `calculate_alf_features_batched`, which is much faster
+            than calculating features atom by atom.
         """
-        return np.array(
+
+        if is_atomic and feature_calculator is calculate_alf_features:
+            return calculate_alf_features_batched(
+                self.coordinates, *args, units=self.units, **kwargs
+            )
+
+        features = np.array(
             [
                 timestep.features(
                     feature_calculator, *args, is_atomic=is_atomic, **kwargs
@@ -102,6 +169,11 @@ class ListOfAtoms(list, ABC):
             ]
         )
 
+        if is_atomic and features.ndim == 3:
+            return np.swapaxes(features, 0, 1)
+
+        return features
+
     def get_headings(self):
         """
         Helper function which makes the column headings
@@ -132,11 +204,14 @@ class ListOfAtoms(list, ABC):
         *args,
         fname: Optional[Union[str, Path]] = None,
         atom_names: Optional[List[str]] = None,
+        chunk_size: Optional[int] = None,
         **kwargs,
     ):
         """
         Writes csv files containing features for every atom in the system.
         Optionally a list can be passed in to get csv files for only a subset of atoms.
+        Optionally, the features can be calculated and written in chunks of timesteps (see `iter_chunks`),
+        so that the features of the whole trajectory are never held in memory at once.
 
         :param feature_calculator: Calculator function to be used to calculate features
         :param fname: A string to be appended to the default csv file names.
@@ -144,26 +219,32 @@ class ListOfAtoms(list, ABC):
             If an fname is given, the name becomes ``fname_atom_name_features.csv``
         :param atom_names: A list of atom names for which to write csv files.
             If None, then write out the features for every atom in the system.
+        :param chunk_size: The number of timesteps for which features are calculated and written at a time.
+            If None, the features for all timesteps are calculated at once.
         :param args: positional arguments to pass to calculator function
         :param kwargs: key word arguments to be passed to the feature calculator function
         """
         import pandas as pd
 
-        # whether to write csvs for all atoms or subset
-        if atom_names is None:
-            atom_names = self.atom_names
-        elif isinstance(atom_names, str):
+        if isinstance(atom_names, str):
             atom_names = [atom_names]
 
-        for atom_name in atom_names:
-            atom_features = self[atom_name].features(
-                feature_calculator, *args, **kwargs
-            )
-            df = pd.DataFrame(atom_features, columns=self.get_headings())
-            if fname is None:
-                df.to_csv(f"{atom_name}_features.csv", index=None)
-            else:
-                df.to_csv(f"{fname}_{atom_name}_features.csv", index=None)
+        # the features of every chunk are appended to the csv files
+        chunks = [self] if chunk_size is None else self.iter_chunks(chunk_size)
+
+        for i, chunk in enumerate(chunks):
+
+            # whether to write csvs for all atoms or subset
+            for atom_name in atom_names or chunk.atom_names:
+                atom_features = chunk[atom_name].features(
+                    feature_calculator, *args, **kwargs
+                )
+                df = pd.DataFrame(atom_features, columns=chunk.get_headings())
+                if fname is None:
+                    csv_path = f"{atom_name}_features.csv"
+                else:
+                    csv_path = f"{fname}_{atom_name}_features.csv"
+                df.to_csv(csv_path, index=None, mode="a" if i else "w", header=not i)
 
     def features_to_excel(
         self,
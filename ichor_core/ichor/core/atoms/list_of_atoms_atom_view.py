@@ -1,8 +1,13 @@
-from typing import Callable, List, Union
+from typing import Callable, Iterator, List, Union
 
 import numpy as np
-from ichor.core.atoms import ListOfAtoms
+from ichor.core.atoms import Atom, ListOfAtoms
 from ichor.core.atoms.alf import ALF
+from ichor.core.calculators import (
+    calculate_alf_features,
+    calculate_alf_features_batched,
+)
+from ichor.core.common.units import AtomicDistance
 
 
 class AtomView(ListOfAtoms):
@@ -21,12 +26,36 @@ class AtomView(ListOfAtoms):
         self._is_atom_view = True
         self._super = parent
 
-        # this usually iterates over Atoms instances that are stored instance and only adds the information for the
-        # specified atom. Thus AtomView is essentially a list of Atom instances for only one atom
-        # also iterates over PointDirectory instances because PointsDirectory subclasses from ListofAtoms
-        for element in parent:
-            a = element[atom]
-            self.append(a)
+        # the view does not store any Atom instances itself. Indexing or iterating over it
+        # indexes the Atoms instances (or PointDirectory instances, because PointsDirectory
+        # subclasses from ListOfAtoms) held in the parent and only returns the specified atom.
+        # Thus AtomView is essentially a list of Atom instances for only one atom
+
+    def __len__(self):
+        """Returns the number of timesteps in the parent instance"""
+        return len(self._super)
+
+    def __iter__(self) -> Iterator[Atom]:
+        """Iterates over the `Atom` instance of the atom in every timestep of the parent instance"""
+        for element in self._super:
+            yield element[self._atom]
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[Atom, List[Atom]]:
+        """Returns the `Atom` instance of the atom at the given timestep (or a list of `Atom` instances for slices)"""
+        if isinstance(item, slice):
+            return [self[i] for i in range(len(self))[item]]
+        return self._super[item][self._atom]
+
+    @property
+    def atom_index(self) -> int:
+        """Returns the index (0-indexed) of the atom in the parent instance."""
+        return self._super.atom_names.index(self._atom.capitalize())
+
+    @property
+    def coordinates(self) -> np.ndarray:
+        """Returns the coordinates of the atom for every timestep, shape ``n_timesteps`` x 3.
+        For a `Trajectory` parent this is a view into the coordinates of the trajectory (no copy is made)."""
+        return self._super.coordinates[:, self.atom_index]
 
     @property
     def atom_name(self):
@@ -46,6 +75,11 @@ class AtomView(ListOfAtoms):
         """Returns the name of the atom, e.g. 'C1', 'H2', etc."""
         return self._super.natoms
 
+    @property
+    def units(self) -> AtomicDistance:
+        """Returns the distance units of the coordinates of the first Atom instance."""
+        return self[0].units
+
     @property
     def type(self):
         """Returns the types of atoms in the atom view.
@@ -78,6 +112,15 @@ class AtomView(ListOfAtoms):
         :return: The array has shape ``n_timesteps`` x ``n_features``.
         """
 
+        if feature_calculator is calculate_alf_features:
+            return calculate_alf_features_batched(
+                self._super.coordinates,
+                *args,
+                units=self.units,
+                atom_indices=[self.atom_index],
+                **kwargs,
+            )[0]
+
         return np.array(
             [atom.features(feature_calculator, *args, **kwargs) for atom in self]
         )
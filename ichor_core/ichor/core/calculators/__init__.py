@@ -4,14 +4,20 @@ from ichor.core.calculators.alf import (
     calculate_alf_cahn_ingold_prelog,
     default_alf_calculator,
     get_atom_alf,
+    get_system_alf_array,
 )
 from ichor.core.calculators.alf_features_to_coordinates_calculator import (
     alf_features_to_coordinates,
 )
-from ichor.core.calculators.c_matrix_calculator import calculate_c_matrix
+from ichor.core.calculators.c_matrix_calculator import (
+    calculate_c_matrix,
+    calculate_c_matrix_batched,
+)
 from ichor.core.calculators.connectivity import default_connectivity_calculator
 from ichor.core.calculators.features import (
     calculate_alf_features,
+    calculate_alf_features_batched,
+    calculate_alf_features_derivatives_batched,
     default_feature_calculator,
     feature_calculators,
 )
@@ -39,10 +45,14 @@ __all__ = [
     "calculate_alf_cahn_ingold_prelog",
     "default_alf_calculator",
     "get_atom_alf",
+    "get_system_alf_array",
     "alf_features_to_coordinates",
     "calculate_c_matrix",
+    "calculate_c_matrix_batched",
     "default_connectivity_calculator",
     "calculate_alf_features",
+    "calculate_alf_features_batched",
+    "calculate_alf_features_derivatives_batched",
     "default_feature_calculator",
     "feature_calculators",
     "angle_names",
@@ -1,5 +1,7 @@
 from typing import Callable, Dict, List, Union
 
+import numpy as np
+
 from ichor.core.calculators.alf.cahn_ingold_prelog_alf_calculator import (
     calculate_alf_cahn_ingold_prelog,
 )
@@ -51,3 +53,54 @@ def get_atom_alf(
             )
 
     raise NotImplementedError("Can only give an instance of `ALF` or list of `ALF`.")
+
+
+def get_system_alf_array(
+    alf: Union[
+        List["ichor.core.atoms.ALF"],  # noqa F821
+        List[List[int]],
+        Dict[str, "ichor.core.atoms.ALF"],  # noqa F821
+    ],
+    natoms: int,
+) -> np.ndarray:
+    """Converts the atomic local frames of a whole system into an integer array
+    which can be used to index coordinate arrays.
+
+    :param alf: A list of `ALF` instances (or list of lists), or a dictionary of atom name: `ALF`
+        containing the atomic local frame for every atom in the system.
+    :param natoms: The number of atoms in the system.
+    :return: A ``natoms`` x 3 integer array where row ``i`` contains the central atom index,
+        x-axis atom index and xy-plane atom index (0-indexed) of atom ``i``.
+        If the system only has two atoms, the xy-plane index is set to -1.
+    :raises ValueError: If an ALF does not have an xy-plane atom and the system has more than two atoms
+    """
+
+    if isinstance(alf, dict):
+        alf = list(alf.values())
+
+    alf_array = np.full((natoms, 3), -1, dtype=int)
+    found = np.zeros(natoms, dtype=bool)
+
+    for a in alf:
+        origin_idx = a[0]
+        if origin_idx >= natoms:
+            raise ValueError(
+                f"ALF central atom index {origin_idx} is out of range for a system with {natoms} atoms."
+            )
+        alf_array[origin_idx, 0] = origin_idx
+        alf_array[origin_idx, 1] = a[1]
+        if len(a) > 2 and a[2] is not None:
+            alf_array[origin_idx, 2] = a[2]
+        elif natoms > 2:
+            # -1 would index the last atom, it only marks the missing xy-plane atom of a 2 atom system
+            raise ValueError(
+                f"The ALF of the atom with index {origin_idx} has no xy-plane atom, only allowed for a system of 2 atoms, not {natoms}."
+            )
+        found[origin_idx] = True
+
+    if not found.all():
+        raise ValueError(
+            f"The list of ALFs does not contain the alf of the atoms with indices {np.flatnonzero(~found).tolist()}"
+        )
+
+    return alf_array
@@ -1,5 +1,7 @@
+from typing import Dict, List, Union
+
 import numpy as np
-from ichor.core.calculators.alf import get_atom_alf
+from ichor.core.calculators.alf import get_atom_alf, get_system_alf_array
 
 
 def calculate_c_matrix(
@@ -86,3 +88,67 @@ def calculate_c_matrix(
         c_matrix[2, :] = row3
 
         return c_matrix
+
+
+def calculate_c_matrix_batched(
+    coordinates: np.ndarray,
+    alf: Union[
+        List["ichor.core.atoms.ALF"],  # noqa F821
+        List[List[int]],
+        Dict[str, "ichor.core.atoms.ALF"],  # noqa F821
+    ],
+) -> np.ndarray:
+    """Returns the C rotation matrices of every atom for every geometry in one vectorized call.
+    This is the same as calling `calculate_c_matrix` for every atom in every timestep.
+
+    :param coordinates: A ``n_timesteps`` x ``n_atoms`` x 3 array of Cartesian coordinates.
+        A single ``n_atoms`` x 3 geometry is also accepted.
+    :param alf: The atomic local frames for all atoms in the system (list of `ALF` or dict of atom name: `ALF`).
+    :return: A ``n_atoms`` x ``n_timesteps`` x 3 x 3 array of C matrices
+        (or ``n_atoms`` x 3 x 3 if a single geometry was given).
+    """
+
+    coordinates = np.asarray(coordinates, dtype=float)
+    single_geometry = coordinates.ndim == 2
+    if single_geometry:
+        coordinates = coordinates[np.newaxis]
+
+    natoms = coordinates.shape[1]
+    alf_array = get_system_alf_array(alf, natoms)
+
+    origin = coordinates[:, alf_array[:, 0]]
+    x_axis_diff = coordinates[:, alf_array[:, 1]] - origin
+
+    if natoms > 2:
+        xy_plane_diff = coordinates[:, alf_array[:, 2]] - origin
+    else:
+        # there is no xy-plane atom, so use the same dummy atom as in `calculate_c_matrix`
+        xy_plane_diff = coordinates[:, alf_array[:, 1]] + 1.0
+
+    c_matrix = _c_matrix_from_axes(x_axis_diff, xy_plane_diff)
+
+    # n_timesteps x n_atoms x 3 x 3 -> n_atoms x n_timesteps x 3 x 3
+    c_matrix = np.swapaxes(c_matrix, 0, 1)
+
+    return c_matrix[:, 0] if single_geometry else c_matrix
+
+
+def _c_matrix_from_axes(
+    x_axis_diff: np.ndarray, xy_plane_diff: np.ndarray
+) -> np.ndarray:
+    """Forms C matrices from arrays of x-axis and xy-plane vectors (last dimension is 3).
+
+    :return: An array with the same leading dimensions as the inputs, followed by 3 x 3.
+    """
+
+    row1 = x_axis_diff / np.linalg.norm(x_axis_diff, axis=-1, keepdims=True)
+
+    sigma_fflux = -np.einsum("...i,...i->...", x_axis_diff, xy_plane_diff) / np.einsum(
+        "...i,...i->...", x_axis_diff, x_axis_diff
+    )
+    y_vec = sigma_fflux[..., np.newaxis] * x_axis_diff + xy_plane_diff
+    row2 = y_vec / np.linalg.norm(y_vec, axis=-1, keepdims=True)
+
+    row3 = np.cross(row1, row2)
+
+    return np.stack((row1, row2, row3), axis=-2)
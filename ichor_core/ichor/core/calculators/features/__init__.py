@@ -2,8 +2,18 @@ from typing import Callable, Dict
 
 from ichor.core.calculators.features.alf_features_calculator import (
     calculate_alf_features,
+    calculate_alf_features_batched,
+    calculate_alf_features_derivatives_batched,
 )
 
 feature_calculators: Dict[str, Callable] = {"alf": calculate_alf_features}
 
 default_feature_calculator = feature_calculators["alf"]
+
+__all__ = [
+    "calculate_alf_features",
+    "calculate_alf_features_batched",
+    "calculate_alf_features_derivatives_batched",
+    "feature_calculators",
+    "default_feature_calculator",
+]
@@ -1,9 +1,12 @@
-from typing import Dict, List, Union
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
-from ichor.core.calculators.alf import get_atom_alf
-from ichor.core.calculators.c_matrix_calculator import calculate_c_matrix
-from ichor.core.common.constants import ang2bohr
+from ichor.core.calculators.alf import get_atom_alf, get_system_alf_array
+from ichor.core.calculators.c_matrix_calculator import (
+    _c_matrix_from_axes,
+    calculate_c_matrix,
+)
+from ichor.core.common.constants import ang2bohr, bohr2ang
 from ichor.core.common.units import AtomicDistance
 
 
@@ -127,3 +130,412 @@ def calculate_alf_features(
             i_feat += 1
 
     return feature_array
+
+
+def calculate_alf_features_batched(
+    coordinates: np.ndarray,
+    alf: Union[
+        List["ichor.core.atoms.ALF"],  # noqa F821
+        List[List[int]],
+        Dict[str, "ichor.core.atoms.ALF"],  # noqa F821
+    ],
+    distance_unit: AtomicDistance = default_distance_unit,
+    units: AtomicDistance = AtomicDistance.Angstroms,
+    atom_indices: Optional[Sequence[int]] = None,
+) -> np.ndarray:
+    """Calculates the ALF features of every atom for every geometry in one vectorized pass.
+    The features are the same as the ones calculated by `calculate_alf_features`, but
+    no `Atom` instances are needed, so this is much faster for large trajectories.
+
+    :param coordinates: A ``n_timesteps`` x ``n_atoms`` x 3 array of Cartesian coordinates.
+        A single ``n_atoms`` x 3 geometry is also accepted.
+    :param alf: The atomic local frames for all atoms in the system (list of `ALF` or dict of atom name: `ALF`).
+        A single `ALF` instance can also be given, in which case only the features of its central atom are calculated.
+    :param distance_unit: The distance units to use for the calculated distances
+        which are part of the features. The default distance is Bohr.
+    :param units: The units of the given coordinates, Angstroms by default.
+    :param atom_indices: Optional list of central atom indices (0-indexed) for which to calculate features.
+        If None, features are calculated for all atoms.
+    :return: A ``n_atoms`` x ``n_timesteps`` x ``n_features`` array of features (or ``n_atoms`` x ``n_features``
+        if a single geometry was given). If ``atom_indices`` is given, the first dimension is ``len(atom_indices)``.
+    """
+
+    coordinates = np.asarray(coordinates, dtype=float)
+    single_geometry = coordinates.ndim == 2
+    if single_geometry:
+        coordinates = coordinates[np.newaxis]
+
+    ntimesteps, natoms, _ = coordinates.shape
+
+    if natoms < 2:
+        raise ValueError(
+            "coordinates need to have more than 1 atom in order to calculate features."
+        )
+
+    alf_array = _batched_alf_array(alf, natoms, atom_indices)
+    unit_conversion = _unit_conversion(units, distance_unit)
+
+    origin = coordinates[:, alf_array[:, 0]]
+    x_axis_vect = unit_conversion * (coordinates[:, alf_array[:, 1]] - origin)
+    x_bond_norm = np.linalg.norm(x_axis_vect, axis=-1)
+
+    if natoms == 2:
+        features = x_bond_norm[..., np.newaxis]
+    else:
+        features = np.empty((ntimesteps, len(alf_array), 3 * natoms - 6))
+
+        xy_plane_vect = unit_conversion * (coordinates[:, alf_array[:, 2]] - origin)
+        xy_bond_norm = np.linalg.norm(xy_plane_vect, axis=-1)
+
+        features[..., 0] = x_bond_norm
+        features[..., 1] = xy_bond_norm
+        features[..., 2] = np.arccos(
+            np.einsum("...i,...i->...", x_axis_vect, xy_plane_vect)
+            / (x_bond_norm * xy_bond_norm)
+        )
+
+        if natoms > 3:
+            # indices of the remaining atoms for every central atom, in the order they appear in the system
+            all_indices = np.arange(natoms)
+            remaining = np.array(
+                [all_indices[~np.isin(all_indices, a)] for a in alf_array]
+            )
+
+            c_matrix = _c_matrix_from_axes(x_axis_vect, xy_plane_vect)
+
+            # n_timesteps x n_central_atoms x n_remaining_atoms x 3
+            r_vect = unit_conversion * (
+                coordinates[:, remaining] - origin[:, :, np.newaxis]
+            )
+            r_vect_norm = np.linalg.norm(r_vect, axis=-1)
+            zeta = np.einsum("tcij,tcrj->tcri", c_matrix, r_vect)
+
+            # r, theta, phi for every remaining atom, interleaved as r1, theta1, phi1, r2, ...
+            features[..., 3:] = np.stack(
+                (
+                    r_vect_norm,
+                    np.arccos(np.clip(zeta[..., 2] / r_vect_norm, -1.0, 1.0)),
+                    np.arctan2(zeta[..., 1], zeta[..., 0]),
+                ),
+                axis=-1,
+            ).reshape(ntimesteps, len(alf_array), 3 * (natoms - 3))
+
+    # n_timesteps x n_atoms x n_features -> n_atoms x n_timesteps x n_features
+    features = np.swapaxes(features, 0, 1)
+
+    return features[:, 0] if single_geometry else features
+
+
+def _batched_alf_array(
+    alf: Union[
+        "ichor.core.atoms.ALF",  # noqa F821
+        List["ichor.core.atoms.ALF"],  # noqa F821
+        List[List[int]],
+        Dict[str, "ichor.core.atoms.ALF"],  # noqa F821
+    ],
+    natoms: int,
+    atom_indices: Optional[Sequence[int]] = None,
+) -> np.ndarray:
+    """Returns the ALF array of the central atoms for which batched features are calculated,
+    see `calculate_alf_features_batched`."""
+
+    from ichor.core.atoms.alf import ALF
+
+    # a single ALF only defines the features of its own central atom
+    if isinstance(alf, ALF):
+        if atom_indices is not None and list(atom_indices) != [alf.origin_idx]:
+            raise ValueError(
+                f"The passed ALF origin index {alf.origin_idx} does not match atom indices {list(atom_indices)}."
+            )
+        if alf.xy_plane_idx is None and natoms > 2:
+            raise ValueError(
+                f"The ALF of the atom with index {alf.origin_idx} has no xy-plane atom, only allowed for a system of 2 atoms, not {natoms}."
+            )
+        return np.array(
+            [
+                [
+                    alf.origin_idx,
+                    alf.x_axis_idx,
+                    -1 if alf.xy_plane_idx is None else alf.xy_plane_idx,
+                ]
+            ]
+        )
+
+    alf_array = get_system_alf_array(alf, natoms)
+    if atom_indices is not None:
+        alf_array = alf_array[np.asarray(atom_indices, dtype=int)]
+    return alf_array
+
+
+def _unit_conversion(units: AtomicDistance, distance_unit: AtomicDistance) -> float:
+    """Returns the factor converting from the units of the coordinates to the units of the distance features"""
+    if units is distance_unit:
+        return 1.0
+    elif distance_unit is AtomicDistance.Bohr:
+        return ang2bohr
+    return bohr2ang
+
+
+def calculate_alf_features_derivatives_batched(
+    coordinates: np.ndarray,
+    alf: Union[
+        List["ichor.core.atoms.ALF"],  # noqa F821
+        List[List[int]],
+        Dict[str, "ichor.core.atoms.ALF"],  # noqa F821
+    ],
+    distance_unit: AtomicDistance = default_distance_unit,
+    units: AtomicDistance = AtomicDistance.Angstroms,
+    atom_indices: Optional[Sequence[int]] = None,
+) -> np.ndarray:
+    r"""Calculates the Wilson B matrices of every atom for every geometry in one vectorized pass,
+    i.e. the analytic derivatives of the ALF features of a central atom with respect to the Cartesian
+    coordinates of all atoms
+
+    .. math::
+
+        B_{ij} = \frac{df_i}{dx_j}
+
+    The features are the same as the ones calculated by `calculate_alf_features_batched`. The columns are
+    ordered as the x, y, z coordinates of every atom, in the order of the atoms in the coordinates.
+
+    :param coordinates: A ``n_timesteps`` x ``n_atoms`` x 3 array of Cartesian coordinates.
+        A single ``n_atoms`` x 3 geometry is also accepted.
+    :param alf: The atomic local frames for all atoms in the system (list of `ALF` or dict of atom name: `ALF`).
+        A single `ALF` instance can also be given, in which case only the B matrix of its central atom is calculated.
+    :param distance_unit: The distance units of the distance features and of the coordinates which the
+        derivatives are taken with respect to. The default distance is Bohr.
+    :param units: The units of the given coordinates, Angstroms by default.
+    :param atom_indices: Optional list of central atom indices (0-indexed) for which to calculate B matrices.
+        If None, B matrices are calculated for all atoms.
+    :return: A ``n_atoms`` x ``n_timesteps`` x ``n_features`` x ``3 n_atoms`` array (or ``n_atoms`` x ``n_features``
+        x ``3 n_atoms`` if a single geometry was given). If ``atom_indices`` is given, the first dimension
+        is ``len(atom_indices)``.
+    """
+
+    coordinates = np.asarray(coordinates, dtype=float)
+    single_geometry = coordinates.ndim == 2
+    if single_geometry:
+        coordinates = coordinates[np.newaxis]
+
+    ntimesteps, natoms, _ = coordinates.shape
+
+    if natoms < 2:
+        raise ValueError(
+            "coordinates need to have more than 1 atom in order to calculate features."
+        )
+
+    alf_array = _batched_alf_array(alf, natoms, atom_indices)
+    coordinates = _unit_conversion(units, distance_unit) * coordinates
+
+    (
+        features,
+        alf_derivatives,
+        remaining_derivatives,
+        remaining,
+    ) = _alf_features_and_derivatives(coordinates, alf_array)
+
+    ncentral, nfeatures = len(alf_array), features.shape[-1]
+    b_matrix = np.zeros((ntimesteps, ncentral, nfeatures, natoms, 3))
+    central = np.arange(ncentral)[:, np.newaxis]
+
+    # the ALF atoms are different atoms, so the derivatives can be assigned directly
+    # (the indexed dimensions come first, so the derivatives are transposed to match)
+    nalf = alf_derivatives.shape[3]
+    b_matrix[:, central, :, alf_array[:, :nalf]] = np.transpose(
+        alf_derivatives, (1, 3, 0, 2, 4)
+    )
+
+    # the r, theta, phi features of every remaining atom only depend on that atom (and the ALF atoms)
+    for i in range(remaining.shape[1]):
+        b_matrix[
+            :, central[:, 0], 3 + 3 * i : 6 + 3 * i, remaining[:, i]
+        ] = np.swapaxes(remaining_derivatives[:, :, i], 0, 1)
+
+    # n_timesteps x n_atoms x n_features x 3 n_atoms -> n_atoms x n_timesteps x n_features x 3 n_atoms
+    b_matrix = np.swapaxes(b_matrix.reshape(ntimesteps, ncentral, nfeatures, -1), 0, 1)
+
+    return b_matrix[:, 0] if single_geometry else b_matrix
+
+
+def _alf_features_and_derivatives(
+    coordinates: np.ndarray, alf_array: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Calculates the ALF features of every central atom, as well as the analytic derivatives of the
+    features with respect to the Cartesian coordinates, for a batch of geometries.
+
+    Every feature only depends on the coordinates of at most four atoms: the three atoms of the ALF
+    (central, x-axis and xy-plane atoms) and, for the r, theta and phi features, one remaining atom.
+    The derivatives are therefore returned in a compact form instead of the full (mostly zero)
+    n_features x n_atoms x 3 matrix of every central atom.
+
+    .. note::
+        The coordinates are not converted, so the distance features (and derivatives) are in the units of the coordinates.
+
+    :param coordinates: A ``n_timesteps`` x ``n_atoms`` x 3 array of Cartesian coordinates
+    :param alf_array: A ``n_central_atoms`` x 3 integer array of ALF indices, see `get_system_alf_array`
+    :return: A tuple of:
+        the ``n_timesteps`` x ``n_central_atoms`` x ``n_features`` array of features,
+        the ``n_timesteps`` x ``n_central_atoms`` x ``n_features`` x ``n_alf`` x 3 array of derivatives of every
+        feature with respect to the coordinates of the ALF atoms (``n_alf`` is 2 for two atom systems, otherwise 3),
+        the ``n_timesteps`` x ``n_central_atoms`` x ``n_remaining`` x 3 x 3 array of derivatives of the
+        r, theta and phi features of every remaining atom with respect to the coordinates of that atom,
+        the ``n_central_atoms`` x ``n_remaining`` array of the indices of the remaining atoms
+    """
+
+    ntimesteps, natoms, _ = coordinates.shape
+    ncentral = len(alf_array)
+
+    origin = coordinates[:, alf_array[:, 0]]
+    x_axis_vect = coordinates[:, alf_array[:, 1]] - origin
+    x_bond_norm = np.linalg.norm(x_axis_vect, axis=-1)
+    x_bond_unit = x_axis_vect / x_bond_norm[..., np.newaxis]
+
+    if natoms == 2:
+        features = x_bond_norm[..., np.newaxis]
+        alf_derivatives = np.stack((-x_bond_unit, x_bond_unit), axis=-2)[
+            :, :, np.newaxis
+        ]
+        return (
+            features,
+            alf_derivatives,
+            np.empty((ntimesteps, ncentral, 0, 3, 3)),
+            np.empty((ncentral, 0), dtype=int),
+        )
+
+    nfeatures = 3 * natoms - 6
+    features = np.empty((ntimesteps, ncentral, nfeatures))
+    # derivatives with respect to the central, x-axis and xy-plane atoms
+    alf_derivatives = np.zeros((ntimesteps, ncentral, nfeatures, 3, 3))
+
+    xy_plane_vect = coordinates[:, alf_array[:, 2]] - origin
+    xy_bond_norm = np.linalg.norm(xy_plane_vect, axis=-1)
+    xy_bond_unit = xy_plane_vect / xy_bond_norm[..., np.newaxis]
+
+    cos_chi = np.einsum("...i,...i->...", x_axis_vect, xy_plane_vect) / (
+        x_bond_norm * xy_bond_norm
+    )
+    chi = np.arccos(cos_chi)
+
+    features[..., 0] = x_bond_norm
+    features[..., 1] = xy_bond_norm
+    features[..., 2] = chi
+
+    alf_derivatives[..., 0, 0, :] = -x_bond_unit
+    alf_derivatives[..., 0, 1, :] = x_bond_unit
+    alf_derivatives[..., 1, 0, :] = -xy_bond_unit
+    alf_derivatives[..., 1, 2, :] = xy_bond_unit
+
+    inv_sin_chi = (-1.0 / np.sin(chi))[..., np.newaxis]
+    dchi_dx_axis = (
+        inv_sin_chi
+        * (xy_bond_unit - cos_chi[..., np.newaxis] * x_bond_unit)
+        / x_bond_norm[..., np.newaxis]
+    )
+    dchi_dxy_plane = (
+        inv_sin_chi
+        * (x_bond_unit - cos_chi[..., np.newaxis] * xy_bond_unit)
+        / xy_bond_norm[..., np.newaxis]
+    )
+    alf_derivatives[..., 2, 0, :] = -(dchi_dx_axis + dchi_dxy_plane)
+    alf_derivatives[..., 2, 1, :] = dchi_dx_axis
+    alf_derivatives[..., 2, 2, :] = dchi_dxy_plane
+
+    all_indices = np.arange(natoms)
+    remaining = np.array([all_indices[~np.isin(all_indices, a)] for a in alf_array])
+    nremaining = natoms - 3
+
+    if nremaining == 0:
+        return (
+            features,
+            alf_derivatives,
+            np.empty((ntimesteps, ncentral, 0, 3, 3)),
+            remaining.reshape(ncentral, 0),
+        )
+
+    c_matrix = _c_matrix_from_axes(x_axis_vect, xy_plane_vect)
+    e1, e2 = c_matrix[..., 0, :], c_matrix[..., 1, :]
+
+    # derivatives of the rows of the C matrix with respect to the x-axis and xy-plane vectors,
+    # indexed as [..., m, i] = d(row_i) / d(vector_m)
+    identity = np.eye(3)
+    de1_dx_axis = (
+        identity - e1[..., :, np.newaxis] * e1[..., np.newaxis, :]
+    ) / x_bond_norm[..., np.newaxis, np.newaxis]
+
+    x_axis_dot = np.einsum("...i,...i->...", x_axis_vect, x_axis_vect)
+    sigma_fflux = -np.einsum("...i,...i->...", x_axis_vect, xy_plane_vect) / x_axis_dot
+    y_vec = sigma_fflux[..., np.newaxis] * x_axis_vect + xy_plane_vect
+    dsigma_dx_axis = (
+        -xy_plane_vect - 2.0 * sigma_fflux[..., np.newaxis] * x_axis_vect
+    ) / x_axis_dot[..., np.newaxis]
+    dy_dx_axis = (
+        sigma_fflux[..., np.newaxis, np.newaxis] * identity
+        + dsigma_dx_axis[..., :, np.newaxis] * x_axis_vect[..., np.newaxis, :]
+    )
+    dy_dxy_plane = identity - e1[..., :, np.newaxis] * e1[..., np.newaxis, :]
+    normalise_y = (
+        identity - e2[..., :, np.newaxis] * e2[..., np.newaxis, :]
+    ) / np.linalg.norm(y_vec, axis=-1)[..., np.newaxis, np.newaxis]
+    de2_dx_axis = dy_dx_axis @ normalise_y
+    de2_dxy_plane = dy_dxy_plane @ normalise_y
+
+    # the third row is the cross product of the first two rows
+    de3_dx_axis = np.cross(e1[..., np.newaxis, :], de2_dx_axis) + np.cross(
+        de1_dx_axis, e2[..., np.newaxis, :]
+    )
+    de3_dxy_plane = np.cross(e1[..., np.newaxis, :], de2_dxy_plane)
+
+    # n_timesteps x n_central x 3 (row) x 3 (m) x 3 (i)
+    dc_dx_axis = np.stack((de1_dx_axis, de2_dx_axis, de3_dx_axis), axis=-3)
+    dc_dxy_plane = np.stack(
+        (np.zeros_like(de1_dx_axis), de2_dxy_plane, de3_dxy_plane), axis=-3
+    )
+
+    # n_timesteps x n_central x n_remaining x 3
+    r_vect = coordinates[:, remaining] - origin[:, :, np.newaxis]
+    r_norm = np.linalg.norm(r_vect, axis=-1)
+    r_unit = r_vect / r_norm[..., np.newaxis]
+    zeta = np.einsum("tcij,tcrj->tcri", c_matrix, r_vect)
+
+    theta = np.arccos(np.clip(zeta[..., 2] / r_norm, -1.0, 1.0))
+    phi = np.arctan2(zeta[..., 1], zeta[..., 0])
+
+    # derivatives with respect to the central, x-axis, xy-plane and remaining atom,
+    # n_timesteps x n_central x n_remaining x 4 (atom) x 3 (xyz)
+    dr = np.zeros((ntimesteps, ncentral, nremaining, 4, 3))
+    dr[..., 0, :] = -r_unit
+    dr[..., 3, :] = r_unit
+
+    # n_timesteps x n_central x n_remaining x 3 (zeta) x 4 (atom) x 3 (xyz)
+    dzeta = np.empty((ntimesteps, ncentral, nremaining, 3, 4, 3))
+    dzeta[..., 1, :] = np.einsum("tckmi,tcri->tcrkm", dc_dx_axis, r_vect)
+    dzeta[..., 2, :] = np.einsum("tckmi,tcri->tcrkm", dc_dxy_plane, r_vect)
+    dzeta[..., 3, :] = c_matrix[:, :, np.newaxis]
+    dzeta[..., 0, :] = -(dzeta[..., 1, :] + dzeta[..., 2, :] + dzeta[..., 3, :])
+
+    inv_sin_theta = -1.0 / np.sin(theta)
+    dtheta = (inv_sin_theta / r_norm)[..., np.newaxis, np.newaxis] * (
+        dzeta[..., 2, :, :] - (zeta[..., 2] / r_norm)[..., np.newaxis, np.newaxis] * dr
+    )
+
+    rho2 = zeta[..., 0] ** 2 + zeta[..., 1] ** 2
+    dphi = (
+        zeta[..., 0, np.newaxis, np.newaxis] * dzeta[..., 1, :, :]
+        - zeta[..., 1, np.newaxis, np.newaxis] * dzeta[..., 0, :, :]
+    ) / rho2[..., np.newaxis, np.newaxis]
+
+    # r, theta, phi for every remaining atom, interleaved as r1, theta1, phi1, r2, ...
+    features[..., 3:] = np.stack((r_norm, theta, phi), axis=-1).reshape(
+        ntimesteps, ncentral, 3 * nremaining
+    )
+    remaining_derivatives = np.stack((dr, dtheta, dphi), axis=-3)
+    alf_derivatives[..., 3:, :, :] = remaining_derivatives[..., :3, :].reshape(
+        ntimesteps, ncentral, 3 * nremaining, 3, 3
+    )
+
+    return (
+        features,
+        alf_derivatives,
+        remaining_derivatives[..., 3, :],
+        remaining,
+    )
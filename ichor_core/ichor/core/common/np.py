@@ -1,4 +1,8 @@
-from typing import Any, Dict, List, Union
+import hashlib
+import struct
+import zipfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
 
 import numpy as np
 from ichor.core.common.types.itypes import Scalar
@@ -25,6 +29,47 @@ def batched_array(a: np.ndarray, batch_size: int) -> np.ndarray:
         yield a[i : i + batch_size]
 
 
+def batched_slices(n: int, batch_size: int) -> Iterator[slice]:
+    """
+    :param n:           length of the array to split into batches
+    :param batch_size:  size of each batch
+    :raises ValueError: if the batch size is less than 1
+    :return:            Yields successive slices of at most batch_size elements, covering n elements
+    """
+    if batch_size < 1:
+        raise ValueError(f"The batch size must be at least 1, not {batch_size}.")
+    for i in range(0, n, batch_size):
+        yield slice(i, min(i + batch_size, n))
+
+
+def apply_in_batches(
+    func: Callable[[np.ndarray], np.ndarray],
+    a: np.ndarray,
+    batch_size: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Applies a function to batches of the rows of an array and concatenates the results, so that
+    any intermediate arrays made by the function only need to be held in memory for one batch.
+
+    :param func:        function which takes an array of rows and returns an array with one row per input row
+    :param a:           array to split into batches along the first axis
+    :param batch_size:  number of rows in each batch, if None the function is applied to the whole array
+    :return:            the results of all batches, in order
+    """
+    if batch_size is None or len(a) == 0:
+        return func(a)
+
+    result = None
+    for batch in batched_slices(len(a), batch_size):
+        batch_result = func(a[batch])
+        if result is None:
+            result = np.empty(
+                (len(a),) + batch_result.shape[1:], dtype=batch_result.dtype
+            )
+        result[batch] = batch_result
+    return result
+
+
 def ensure_array(a: Union[Scalar, List[Scalar], np.ndarray]) -> np.ndarray:
     if isinstance(a, (int, float)):
         return np.array([a])
@@ -33,3 +78,67 @@ def ensure_array(a: Union[Scalar, List[Scalar], np.ndarray]) -> np.ndarray:
     elif isinstance(a, np.ndarray):
         return a
     raise TypeError(f"Cannot convert '{a}' of type '{type(a)}' into numpy array")
+
+
+def array_hash(array: np.ndarray) -> str:
+    """Returns a hash of the shape and contents of an array, used to find identical arrays
+    (e.g. the training data of models).
+
+    :param array: The array to hash
+    :return: A hex digest of the array
+    """
+    array = np.ascontiguousarray(array)
+    h = hashlib.sha1(str((array.shape, array.dtype.str)).encode())
+    h.update(array.tobytes())
+    return h.hexdigest()
+
+
+def _read_npz_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> np.ndarray:
+    with zf.open(info) as member:
+        return np.lib.format.read_array(member)
+
+
+def load_npz(path: Union[str, Path], mmap: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Loads all arrays of an ``.npz`` file. ``np.load`` ignores ``mmap_mode`` for ``.npz`` files, so arrays
+    of uncompressed files (as written by ``np.savez``) are memory mapped here directly from the zip archive.
+    Only the parts of the arrays which are accessed are then read from disk.
+
+    :param path:    path to the .npz file
+    :param mmap:    whether to memory map the arrays, 0-dimensional, empty and compressed arrays are always read
+    :return:        dictionary mapping array names to (read-only) arrays
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as f:
+        for info in zf.infolist():
+            name = (
+                info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            )
+            if not mmap or info.compress_type != zipfile.ZIP_STORED:
+                arrays[name] = _read_npz_member(zf, info)
+                continue
+
+            # skip the local file header of the member, the array (.npy file) is stored right after it
+            f.seek(info.header_offset)
+            local_header = f.read(30)
+            name_length, extra_length = struct.unpack("<HH", local_header[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+            if dtype.hasobject or len(shape) == 0 or 0 in shape:
+                arrays[name] = _read_npz_member(zf, info)
+            else:
+                arrays[name] = np.memmap(
+                    path,
+                    dtype=dtype,
+                    mode="r",
+                    shape=shape,
+                    order="F" if fortran_order else "C",
+                    offset=f.tell(),
+                )
+    return arrays
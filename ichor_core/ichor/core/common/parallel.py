@@ -0,0 +1,179 @@
+import concurrent.futures
+import multiprocessing
+import os
+import warnings
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+# needed for parallel jobs, because closed over functions (or lambdas) cannot be pickled
+# the function is passed to the worker processes when they are started instead,
+# which only avoids pickling it when the worker processes are forked
+_func = None
+
+
+def _fork_context() -> Optional[multiprocessing.context.BaseContext]:
+    """Returns the fork multiprocessing context, or None if forking is not available (e.g. on Windows)."""
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return None
+
+
+def _worker_init(func: Callable):
+    global _func
+    _func = func
+
+
+def _worker(x):
+    return _func(x)
+
+
+def parallel_map(
+    func: Callable[[Any], Any],
+    iterable: Iterable,
+    ncores: int = 1,
+    executor: Optional[concurrent.futures.Executor] = None,
+    progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+) -> Iterator:
+    """Applies a function to every item of an iterable, optionally in parallel, and yields the results
+    in the same order as the items of the iterable.
+
+    Only a limited number of items are submitted at any time (twice the number of workers), so
+    the results are not all held in memory when the returned generator is consumed one by one.
+
+    :param func: A callable which takes one item of the iterable. If ``ncores`` is larger than 1, the worker
+        processes are forked where this is possible (Linux and macOS, whatever the default start method is),
+        so this can also be a closure or lambda. Where forking is not possible (Windows), ``func`` needs to be
+        picklable.
+    :param iterable: The items which to pass to ``func``
+    :param ncores: The number of processes to use. If 1 (and no executor is given), the items are processed
+        serially in the current process, defaults to 1
+    :param executor: An already existing ``concurrent.futures.Executor`` to use instead of starting
+        a process pool. Note that ``func`` needs to be picklable if this is a process pool.
+    :param progress_callback: A callable which is called with the number of processed items and the
+        total number of items (None if the iterable has no length) every time an item is processed
+    :raises ValueError: If ncores is less than 1
+    :return: A generator which yields the results in the order of the iterable
+    """
+
+    if ncores < 1:
+        raise ValueError(f"The number of cores must be at least 1, not {ncores}.")
+
+    total = len(iterable) if hasattr(iterable, "__len__") else None
+
+    if executor is not None:
+        return _ordered_map(
+            executor,
+            func,
+            iterable,
+            getattr(executor, "_max_workers", ncores),
+            total,
+            progress_callback,
+        )
+    if ncores == 1:
+        return _serial_map(func, iterable, total, progress_callback)
+    return _pool_map(func, iterable, ncores, total, progress_callback)
+
+
+def _serial_map(func, iterable, total, progress_callback):
+    for i, item in enumerate(iterable, start=1):
+        result = func(item)
+        if progress_callback:
+            progress_callback(i, total)
+        yield result
+
+
+def _pool_map(func, iterable, ncores, total, progress_callback):
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=ncores,
+        mp_context=_fork_context(),
+        initializer=_worker_init,
+        initargs=(func,),
+    ) as executor:
+        yield from _ordered_map(
+            executor, _worker, iterable, ncores, total, progress_callback
+        )
+
+
+def _ordered_map(executor, func, iterable, nworkers, total, progress_callback):
+    # futures are submitted ahead of time, but only up to a limit, so that memory is bounded
+    max_pending = 2 * max(nworkers or 1, 1)
+    pending = deque()
+    ndone = 0
+
+    for item in iterable:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= max_pending:
+            ndone += 1
+            result = pending.popleft().result()
+            if progress_callback:
+                progress_callback(ndone, total)
+            yield result
+
+    while pending:
+        ndone += 1
+        result = pending.popleft().result()
+        if progress_callback:
+            progress_callback(ndone, total)
+        yield result
+
+
+@contextmanager
+def limit_blas_threads(nthreads: int):
+    """Context manager which limits the number of threads used by BLAS (e.g. OpenBLAS or MKL) inside it,
+    so that running several BLAS calls from a thread pool does not oversubscribe the cores.
+
+    .. note::
+        The limit is process-wide: it applies to BLAS calls from every thread while the context is active,
+        and it is reset when the context exits, even if another thread has entered the context in the
+        meantime. So concurrent `thread_map` calls (e.g. from different threads) interfere with each
+        other's limits, run them one after another instead.
+
+    Uses threadpoolctl (a dependency of ichor). If it is not installed, a warning is given and the number
+    of BLAS threads is not changed (it can still be set with e.g. the ``OMP_NUM_THREADS`` environment
+    variable before starting Python).
+
+    :param nthreads: The maximum number of threads every BLAS call may use
+    """
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        warnings.warn(
+            "Cannot import 'threadpoolctl', the number of BLAS threads is not limited."
+        )
+        yield
+        return
+
+    with threadpool_limits(limits=nthreads, user_api="blas"):
+        yield
+
+
+def thread_map(
+    func: Callable[[Any], Any],
+    iterable: Iterable,
+    nthreads: int,
+    blas_threads: Optional[int] = None,
+) -> List:
+    """Applies a function to every item of an iterable in a pool of threads and returns the results in
+    the same order as the items. This is useful for functions which spend most of their time in NumPy
+    calls that release the GIL, as these run in parallel without having to copy data to other processes.
+
+    :param func: A callable which takes one item of the iterable
+    :param iterable: The items which to pass to ``func``
+    :param nthreads: The number of threads to use, if 1 the items are processed serially
+    :param blas_threads: The number of threads every BLAS call may use while the pool is running
+        (see `limit_blas_threads`), defaults to the number of cores divided by ``nthreads``. This limit
+        is process-wide, so concurrent calls of `thread_map` interfere with each other.
+    :raises ValueError: If nthreads is less than 1
+    :return: A list of the results in the order of the iterable
+    """
+    if nthreads < 1:
+        raise ValueError(f"The number of threads must be at least 1, not {nthreads}.")
+    if nthreads == 1:
+        return [func(item) for item in iterable]
+
+    blas_threads = blas_threads or max(1, (os.cpu_count() or 1) // nthreads)
+    with limit_blas_threads(blas_threads), concurrent.futures.ThreadPoolExecutor(
+        max_workers=nthreads
+    ) as executor:
+        return list(parallel_map(func, iterable, nthreads, executor=executor))
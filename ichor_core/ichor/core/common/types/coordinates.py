@@ -3,16 +3,32 @@ import numpy as np
 
 class Coordinates3D:
     def __init__(self, x, y, z):
-        self.coordinates = np.array([x, y, z], dtype=float)
+        self._coordinates = np.array([x, y, z], dtype=float)
+
+    @property
+    def coordinates(self) -> np.ndarray:
+        """Returns the x, y, z coordinates as a numpy array of shape (3,).
+
+        .. note::
+            The array might be a view into a larger coordinate block (e.g. the coordinates
+            of an `Atoms` instance), so modifying it in place also modifies the block.
+        """
+        return self._coordinates
+
+    @coordinates.setter
+    def coordinates(self, value: np.ndarray):
+        """Sets the coordinates in place, so that any coordinate block
+        that the coordinates are a view into is also updated."""
+        self._coordinates[...] = value
 
     @property
     def x(self):
-        return self.coordinates[0]
+        return self._coordinates[0]
 
     @property
     def y(self):
-        return self.coordinates[1]
+        return self._coordinates[1]
 
     @property
     def z(self):
-        return self.coordinates[2]
+        return self._coordinates[2]
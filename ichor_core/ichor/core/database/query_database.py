@@ -1,11 +1,13 @@
 from pathlib import Path
-from typing import List, Union
+from typing import List, Tuple, Union
 
+import numpy as np
 import pandas as pd
 from ichor.core.atoms import ALF, Atom, Atoms
 from ichor.core.calculators import (
     calculate_alf_cahn_ingold_prelog,
-    calculate_alf_features,
+    calculate_alf_features_batched,
+    calculate_c_matrix_batched,
     get_atom_alf,
 )
 from ichor.core.common.constants import (
@@ -20,11 +22,12 @@ from ichor.core.database.json import get_json_db_info
 from ichor.core.database.sql import get_sqlite_db_information
 from ichor.core.models.gaussian_energy_derivative_wrt_features import (
     convert_to_feature_forces,
-    form_b_matrix,
+    form_b_matrix_batched,
 )
 from ichor.core.multipoles import (
     rotate_dipole,
     rotate_hexadecapole,
+    rotate_multipoles_batched,
     rotate_octupole,
     rotate_quadrupole,
 )
@@ -86,6 +89,49 @@ def rotate_multipole_moments(row_with_atom_info, C):
     return local_spherical_multipoles
 
 
+_multipole_labels = (
+    spherical_monopole_labels
+    + spherical_dipole_labels
+    + spherical_quadrupole_labels
+    + spherical_octupole_labels
+    + spherical_hexadecapole_labels
+)
+
+
+def pivot_database_dataframe(
+    full_df: pd.DataFrame, point_ids: List[int]
+) -> Tuple[np.ndarray, List[str], pd.DataFrame, np.ndarray]:
+    """Reorders the rows of the dataframe containing all points (and all atoms in every point),
+    so that the data of all points can be used in vectorized calculations.
+
+    :param full_df: DataFrame object extracted from the database (see `get_database_info_from_db_type`)
+    :param point_ids: A list of point ids, the points are returned in this order
+    :return: Tuple of: array of the point ids (points which do not contain all atoms are removed),
+        list of the atom names (in the order of the first point),
+        the dataframe with ``n_points`` x ``n_atoms`` rows (the rows of point ``i`` are rows
+        ``i * n_atoms`` to ``(i + 1) * n_atoms``), and an ``n_points`` x ``n_atoms`` x 3 array of coordinates.
+    """
+
+    # atom names in the order of first appearance, which is the order of the atoms in a point
+    atom_names = list(dict.fromkeys(full_df["atom_name"]))
+    natoms = len(atom_names)
+
+    point_df = full_df.set_index(["id", "atom_name"]).reindex(
+        pd.MultiIndex.from_product([point_ids, atom_names], names=["id", "atom_name"])
+    )
+    coordinates = point_df[["x", "y", "z"]].to_numpy(dtype=float).reshape(-1, natoms, 3)
+
+    # remove points which do not have data for all atoms
+    complete = ~np.isnan(coordinates).any(axis=(1, 2))
+    if not complete.all():
+        point_df = point_df[np.repeat(complete, natoms)]
+        coordinates = coordinates[complete]
+
+    point_ids = np.asarray(point_ids)[complete]
+
+    return point_ids, atom_names, point_df.reset_index(), coordinates
+
+
 def check_supported_db_types(db_type: str):
     """Checks the given database type, raises ValueError if it is not present."""
 
@@ -335,260 +381,154 @@ def write_processed_one_atom_data_to_csv(
         of interest. Having a higher (absolute) integration error for the atom of interest means that
         this point will not be added in the dataset for the atom of interest. However, the same
         point can be added in the dataset for another atom, if the integration error is good, defaults to 0.001
-    :param calc_forces: Whether to calculate -dE/df forces (which takes a long time currently), default False.
+    :param calc_forces: Whether to calculate -dE/df forces, default False.
     """
     parent_directory = Path(parent_directory)
     # make directory where csvs are going to be stored
     parent_directory.mkdir(exist_ok=True)
 
-    # final dictionary that is going to be converted to pd.DataFrame and written to csv
-    total_dict = {}
+    point_ids, atom_names, point_df, coordinates = pivot_database_dataframe(
+        full_df, point_ids
+    )
 
-    # loop over points
-    for point_id in point_ids:
+    # atoms instance of the first point, only used to get the names of the atoms in the features
+    atoms = Atoms(
+        [
+            Atom(get_characters(name), *xyz)
+            for name, xyz in zip(atom_names, coordinates[0])
+        ]
+    )
+    central_atom_index = atoms[atom_name].i  # 0-indexed
+    natoms = len(atoms)
+
+    in_alf_atom_indices = get_atom_alf(atoms[atom_name], alf)
+    not_in_alf_indices = [i for i in range(natoms) if i not in in_alf_atom_indices]
+
+    x_axis_name = atoms[in_alf_atom_indices[1]].name
+
+    # if there are only 2 atoms, this will be None
+    check_for_xy_plane_atom = in_alf_atom_indices[2]
+
+    # if not none, then do xy-plane and potentially others
+    if check_for_xy_plane_atom is not None:
+
+        xy_plane_atom_name = atoms[in_alf_atom_indices[2]].name
+        # the xy plane atom moves in the xy plane, so it itself determines what the valence angle is
+        # the x-axis atom always stays on the x-axis
+        val_angle_name = xy_plane_atom_name
+
+        atom_ordering_in_features = [
+            x_axis_name,
+            xy_plane_atom_name,
+            val_angle_name,
+        ] + [atoms[i].name for i in not_in_alf_indices for _ in range(3)]
+
+    # if it is none, then we only have x-axis feature
+    else:
+        atom_ordering_in_features = [x_axis_name]
+
+    def atom_values(column: str) -> np.ndarray:
+        """Returns an array of shape n_points x n_atoms containing the values of a column"""
+        return point_df[column].to_numpy(dtype=float).reshape(-1, natoms)
+
+    iqa = atom_values("iqa")
+    # the wfn energy and point name are the same for all atoms, since they come from same geometry
+    wfn_energy = atom_values("wfn_energy")[:, 0]
+    point_names = point_df["name"].to_numpy().reshape(-1, natoms)[:, 0]
+
+    # points for which the iqa energy is populated for at least one atom
+    # do not add point to the processed csv if difference between sum of iqa and wfn energy is too large
+    has_iqa = ~np.isnan(iqa).all(axis=1)
+    abs_diff_wfn_iqa_kj_mol = np.abs(wfn_energy - np.nansum(iqa, axis=1)) * 2625.5
+    accepted = ~(has_iqa & (abs_diff_wfn_iqa_kj_mol >= max_diff_iqa_wfn))
+
+    # if no iqa information is in the database (e.g. AIMAll has not been ran yet) then only write features.
+    # otherwise, check that integration error is below threshold, otherwise do not calculate features
+    # for the atom and do not add this point to training set for this atom.
+    # if other atoms have good integration errors, the same point can be used in their training sets.
+    # Note that points where the .int file is missing for this atom have nan integration error, so are removed.
+    write_aimall_data = not full_df["iqa"].isnull().all()
+    if write_aimall_data:
+        accepted &= (
+            np.abs(atom_values("integration_error")[:, central_atom_index])
+            < max_integration_error
+        )
 
-        # find geometry which matches the id
-        one_point_df = full_df.loc[full_df["id"] == point_id]
+    point_ids = point_ids[accepted]
+    coordinates = coordinates[accepted]
 
-        # need to check that iqa is populated for all atoms before summing
-        if not (one_point_df["iqa"].isnull().all()):
-            sum_iqa_energies = one_point_df["iqa"].sum()
-            # the wfn energy will be the same for all atoms, since they come from same geometry
-            # so just grab first value
-            abs_diff_wfn_iqa_kj_mol = (
-                abs(one_point_df["wfn_energy"].values[0] - sum_iqa_energies) * 2625.5
+    # calculate features and C matrices for the atom of interest for all accepted points at once
+    one_atom_features = calculate_alf_features_batched(
+        coordinates, alf, atom_indices=[central_atom_index]
+    )[0]
+    n_features = one_atom_features.shape[-1]
+
+    # add the point_id and name of point, features and wfn energy
+    columns = {
+        "point_id": point_ids,
+        "point_name": point_names[accepted],
+    }
+    columns.update(
+        {
+            f"f{i}_{a}": one_atom_features[:, i - 1]
+            for a, i in zip(atom_ordering_in_features, range(1, n_features + 1))
+        }
+    )
+    columns["wfn_energy"] = wfn_energy[accepted]
+
+    # add feature forces (these are negative of gradient) if forces are present for all atoms
+    if calc_forces:
+        global_forces = np.stack(
+            [atom_values(f) for f in ("force_x", "force_y", "force_z")], axis=-1
+        )[accepted]
+        negative_dE_df = np.full((len(point_ids), n_features), None, dtype=object)
+
+        # B matrices and feature forces of all points with forces are calculated at once
+        has_forces = ~np.isnan(global_forces).any(axis=(-2, -1))
+        if has_forces.any():
+            b_matrices = form_b_matrix_batched(
+                coordinates[has_forces], alf, central_atom_index
             )
-            # do not add point to the processed csv if difference is too large
-            if abs_diff_wfn_iqa_kj_mol >= max_diff_iqa_wfn:
-                continue
-
-        # check that integration error is below threshold, otherwise do not calculate features
-        # for the atom and do not add this point to training set for this atom.
-        # if other atoms have good integration errors, the same point can be used in their training sets.
-        row_with_atom_info = one_point_df.loc[one_point_df["atom_name"] == atom_name]
-
-        if calc_forces:
-            if not one_point_df["force_x"].isnull().values.any():
-                global_forces_array = one_point_df[
-                    ["force_x", "force_y", "force_z"]
-                ].to_numpy()
-            else:
-                global_forces_array = None
-        else:
-            global_forces_array = None
-
-        # If the atomic information (.int file) was missing, then this
-        # iqa energy will be None, so it will not get executed
-        if row_with_atom_info["iqa"].item():
-
-            # if the absolute of the integration error is less than threshold, then calculate features
-            if (
-                abs(row_with_atom_info["integration_error"].item())
-                < max_integration_error
-            ):
-
-                # create atoms instance which will be used to calculate features
-                atoms = Atoms()
-                for row_id, row_data in one_point_df.iterrows():
-                    # atoms accepts atom type (but database contains the atom index as well)
-                    atom_type = get_characters(row_data.atom_name)
-                    atoms.append(Atom(atom_type, row_data.x, row_data.y, row_data.z))
-
-                natoms = len(atoms)
-                in_alf_atom_indices = get_atom_alf(atoms[atom_name], alf)
-                not_in_alf_indices = [
-                    i for i in range(natoms) if i not in in_alf_atom_indices
-                ]
-
-                x_axis_name = atoms[in_alf_atom_indices[1]].name
-
-                # if there are only 2 atoms, this will be None
-                check_for_xy_plane_atom = in_alf_atom_indices[2]
-
-                # if not none, then do xy-plane and potentially others
-                if check_for_xy_plane_atom is not None:
-
-                    xy_plane_atom_name = atoms[in_alf_atom_indices[2]].name
-                    # the xy plane atom moves in the xy plane, so it itself determines what the valence angle is
-                    # the x-axis atom always stays on the x-axis
-                    val_angle_name = xy_plane_atom_name
-
-                    atom_ordering_in_features = [
-                        x_axis_name,
-                        xy_plane_atom_name,
-                        val_angle_name,
-                    ] + [atoms[i].name for i in not_in_alf_indices for _ in range(3)]
-
-                # if it is none, then we only have x-axis feature
-                else:
-                    atom_ordering_in_features = [x_axis_name]
-
-                C = atoms[atom_name].C(alf)
-                central_atom_index = atoms[atom_name].i  # 0-indexed
-                # calculate features for the atom of interest
-                one_atom_features = atoms[atom_name].features(
-                    calculate_alf_features, alf
-                )
-                n_features = len(one_atom_features)
-
-                if global_forces_array is not None:
-                    b_matrix = form_b_matrix(atoms, alf, central_atom_index)
-                    negative_dE_df = convert_to_feature_forces(
-                        global_forces_array, b_matrix
-                    )
-                else:
-                    negative_dE_df = [None] * n_features
-
-                # make dictionary of rotated multipoles
-                if calc_multipoles:
-                    local_spherical_multipoles = rotate_multipole_moments(
-                        row_with_atom_info, C
-                    )
-
-                # add the point_id and name of point to dictionary
-                point_id_str = str(point_id)
-                total_dict[point_id_str] = {
-                    "point_id": point_id,
-                    "point_name": row_with_atom_info["name"].item(),
-                }
-                # add features to dictionary
-                total_dict[point_id_str].update(
-                    {
-                        f"f{i}_{a}": one_atom_feature
-                        for a, i, one_atom_feature in zip(
-                            atom_ordering_in_features,
-                            range(1, n_features + 1),
-                            one_atom_features,
-                        )
-                    }
-                )
-                # add wfn energy to dictionary
-                total_dict[point_id_str].update(
-                    {"wfn_energy": row_with_atom_info["wfn_energy"].item()}
-                )
-
-                # add feature forces to dictionary (these are negative of gradient)
-                if calc_forces:
-                    # add -dE/df (forces wrt features) to dict
-                    total_dict[point_id_str].update(
-                        {
-                            f"-dE/df{i}": neg_dE_df
-                            for i, neg_dE_df in zip(
-                                range(1, n_features + 1), negative_dE_df
-                            )
-                        }
-                    )
-
-                # add iqa to dictionary
-                total_dict[point_id_str].update(
-                    {"iqa": row_with_atom_info["iqa"].item()}
-                )
-
-                # add integration_error to dictionary
-                total_dict[point_id_str].update(
-                    {
-                        "integration_error": row_with_atom_info[
-                            "integration_error"
-                        ].item()
-                    }
-                )
-
-                if calc_multipoles:
-                    # add all the rotated multipole moments
-                    total_dict[point_id_str].update(local_spherical_multipoles)
-
-        # if no iqa information found
-        else:
-
-            # create atoms instance which will be used to calculate features
-            atoms = Atoms()
-            for row_id, row_data in one_point_df.iterrows():
-                # atoms accepts atom type (but database contains the atom index as well)
-                atom_type = get_characters(row_data.atom_name)
-                atoms.append(Atom(atom_type, row_data.x, row_data.y, row_data.z))
-
-            natoms = len(atoms)
-            in_alf_atom_indices = get_atom_alf(atoms[atom_name], alf)
-            not_in_alf_indices = [
-                i for i in range(natoms) if i not in in_alf_atom_indices
-            ]
-
-            x_axis_name = atoms[in_alf_atom_indices[1]].name
-
-            # if there are only 2 atoms, this will be None
-            check_for_xy_plane_atom = in_alf_atom_indices[2]
-
-            # if not none, then do xy-plane and potentially others
-            if check_for_xy_plane_atom is not None:
-
-                xy_plane_atom_name = atoms[in_alf_atom_indices[2]].name
-                # the xy plane atom moves in the xy plane, so it itself determines what the valence angle is
-                # the x-axis atom always stays on the x-axis
-                val_angle_name = xy_plane_atom_name
-
-                atom_ordering_in_features = [
-                    x_axis_name,
-                    xy_plane_atom_name,
-                    val_angle_name,
-                ] + [atoms[i].name for i in not_in_alf_indices for _ in range(3)]
-
-            # if it is none, then we only have x-axis feature
-            else:
-                atom_ordering_in_features = [x_axis_name]
-
-            C = atoms[atom_name].C(alf)
-            central_atom_index = atoms[atom_name].i  # 0-indexed
-            # calculate features for the atom of interest
-            one_atom_features = atoms[atom_name].features(calculate_alf_features, alf)
-            n_features = len(one_atom_features)
-
-            if global_forces_array is not None:
-                b_matrix = form_b_matrix(atoms, alf, central_atom_index)
-                negative_dE_df = convert_to_feature_forces(
-                    global_forces_array, b_matrix
-                )
-            else:
-                negative_dE_df = [None] * n_features
-            # add the point_id and name of point to dictionary
-            point_id_str = str(point_id)
-            total_dict[point_id_str] = {
-                "point_id": point_id,
-                "point_name": row_with_atom_info["name"].item(),
-            }
-            # add features to dictionary
-            total_dict[point_id_str].update(
+            negative_dE_df[has_forces] = convert_to_feature_forces(
+                global_forces[has_forces], b_matrices
+            )
+
+        columns.update(
+            {f"-dE/df{i}": negative_dE_df[:, i - 1] for i in range(1, n_features + 1)}
+        )
+
+    if write_aimall_data:
+        # add iqa and integration error to dictionary
+        columns["iqa"] = iqa[accepted, central_atom_index]
+        columns["integration_error"] = atom_values("integration_error")[
+            accepted, central_atom_index
+        ]
+
+        # add all the rotated multipole moments
+        if calc_multipoles:
+            C = calculate_c_matrix_batched(coordinates, alf)[central_atom_index]
+            multipoles = np.stack(
+                [
+                    atom_values(name)[accepted, central_atom_index]
+                    for name in _multipole_labels
+                ],
+                axis=-1,
+            )
+            local_spherical_multipoles = rotate_multipoles_batched(multipoles, C)
+            columns.update(
                 {
-                    f"f{i}_{a}": one_atom_feature
-                    for a, i, one_atom_feature in zip(
-                        atom_ordering_in_features,
-                        range(1, n_features + 1),
-                        one_atom_features,
-                    )
+                    name: local_spherical_multipoles[:, i]
+                    for i, name in enumerate(_multipole_labels)
                 }
             )
-            # add wfn energy to dictionary
-            total_dict[point_id_str].update(
-                {"wfn_energy": row_with_atom_info["wfn_energy"].item()}
-            )
-
-            if calc_forces:
-                # add -dE/df (forces wrt features) to dict
-                total_dict[point_id_str].update(
-                    {
-                        f"-dE/df{i}": neg_dE_df
-                        for i, neg_dE_df in zip(
-                            range(1, n_features + 1), negative_dE_df
-                        )
-                    }
-                )
 
     # add 1 because model files start with atom index 1
     # need to check if i is an integer because it can also be None if less than 3 atom system
     alf_for_current_atom = [i + 1 for i in alf[central_atom_index] if i is not None]
     alf_str = "alf_" + "_".join(list(map(str, alf_for_current_atom)))
 
-    # write the total dict containing information for all points to a DataFrame and save
-    total_df = pd.DataFrame.from_dict(total_dict, orient="index")
+    # write the information for all points to a DataFrame and save
+    total_df = pd.DataFrame(columns, index=point_ids.astype(str))
     total_df.to_csv(
         parent_directory / f"{atom_name}_processed_data_{alf_str}.csv",
         index=write_index_col,
@@ -1,16 +1,25 @@
 from ichor.core.database.sql.add_to_database import (
     add_atom_names_to_database,
     add_point_to_database,
+    add_points_to_database_bulk,
     create_database_session,
+    get_point_record,
 )
 
-from ichor.core.database.sql.database import create_database
-from ichor.core.database.sql.query_database import get_sqlite_db_information
+from ichor.core.database.sql.database import create_database, create_database_indexes
+from ichor.core.database.sql.query_database import (
+    get_sqlite_db_information,
+    iter_points_from_sqlite_db,
+)
 
 __all__ = [
     "add_atom_names_to_database",
     "add_point_to_database",
+    "add_points_to_database_bulk",
+    "get_point_record",
     "create_database_session",
     "create_database",
+    "create_database_indexes",
     "get_sqlite_db_information",
+    "iter_points_from_sqlite_db",
 ]
@@ -1,11 +1,12 @@
 import warnings
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Iterable, List, Optional, Union
 
+from ichor.core.common.itertools import chunker
 from ichor.core.database.sql.database import AtomNames, Dataset, Points
 
-from sqlalchemy import create_engine, select
+from sqlalchemy import create_engine, func, insert, select
 from sqlalchemy.orm import Session, sessionmaker
 
 
@@ -40,19 +41,34 @@ def add_atom_names_to_database(session: Session, atom_names: List[str], echo=Fal
     session.commit()
 
 
+# columns of the dataset table which are filled in from the records of the points
+_DATASET_COLUMNS = [
+    column.name
+    for column in Dataset.__table__.columns
+    if column.name not in ("id", "point_id", "atom_id")
+]
+
+
+def _date_added() -> str:
+    return datetime.today().strftime("%Y-%m-%d %H:%M:%S")
+
+
 # TODO: make this more robust as some data might be absent. Check that .wfn exists before adding wfn data
 # TODO: check that gaussian out forces exist. Check that int file exists.
-def add_point_to_database(
-    session: Session,
+def get_point_record(
     point: "ichor.core.files.PointDirectory",  # noqa F821
-    echo=False,
     print_missing_data=True,
-):
-    """Adds information from an instance of a PointDirectory to the database.
+) -> Optional[dict]:
+    """Reads the information from an instance of a PointDirectory which is written to the database.
+    The record only contains built-in Python types, so it can be made in a worker process
+    and sent back to the process which writes the database.
 
-    :param database_path: Path to database
     :param point: A PointDirectory instance, containing Gaussian/AIMAll outputs that can be
         written to the database.
+    :param print_missing_data: Whether to print out any missing data
+    :return: A dictionary containing the name and wfn energy of the point, as well as a list of
+        dictionaries (one for each atom) containing the atom name and the values of the
+        columns of the dataset table. None is returned if the point should not be added to the database.
 
     .. note:: Even if atomic data (.int file) is missing for a particular atom in the system,
         the information for the point will still be added to the database. This is because
@@ -70,211 +86,283 @@ def add_point_to_database(
                 f"{point.path.absolute()}: No atomicfiles directory (containing AIMAll .int) was found."
                 "Not added to db"
             )
-            return
+        return
 
     # check for .sh file in directory as AIMALL should delete it if it ran successfully
     # if .sh file is found then do not append this point to the database as it can cause problems
     # when reading the database
-    for _f in point.path.iterdir():
-        if _f.suffix == ".sh":
-            if print_missing_data:
-                print(
-                    f"{point.path.absolute()}: A '.sh' was found so AIMAll likely crashed. Not added to db."
-                )
-                return
+    if any(_f.suffix == ".sh" for _f in point.path.iterdir()):
+        if print_missing_data:
+            print(
+                f"{point.path.absolute()}: A '.sh' was found so AIMAll likely crashed. Not added to db."
+            )
+        return
 
     # check for any .mog files within atomicfiles directory.
     # These are intermediate data files that indicate AIMALL hasn't completed.
     # If found then do not append this point to the database.
-    for _f in point.ints.path.iterdir():
-        if _f.suffix == ".mog" or _f.suffix == ".mog2":
-            if print_missing_data:
-                print(
-                    f"{point.path.absolute()}: A '.mog' was found so AIMAll likely crashed. Not added to db."
-                )
-                return
+    if any(_f.suffix in (".mog", ".mog2") for _f in point.ints.path.iterdir()):
+        if print_missing_data:
+            print(
+                f"{point.path.absolute()}: A '.mog' was found so AIMAll likely crashed. Not added to db."
+            )
+        return
 
     ###############################
     # wfn information
     ###############################
 
-    # if wfn file exists
+    # wfn energy might not exist if Gaussian has not been ran yet (or wfn file does not exist.)
+    # add a None for wfn energy if wfn energy is not present
+    wfn_energy = None
     if point.wfn:
-        # ORM for points table
-        db_point = Points(
-            date_added=datetime.today().strftime("%Y-%m-%d %H:%M:%S"),
-            name=point.name_without_suffix,
-            wfn_energy=point.wfn.total_energy,
-        )
-    # if file does not exist, still add to database, but do not contain wfn information
-    else:
-        # ORM for points table
-        db_point = Points(
-            date_added=datetime.today().strftime("%Y-%m-%d %H:%M:%S"),
-            # wfn energy might not exist if Gaussian has not been ran yet (or wfn file does not exist.)
-            # add a None for wfn energy if wfn energy is not present
-            name=point.name_without_suffix,
-            wfn_energy=None,
+        wfn_energy = point.wfn.total_energy
+    elif print_missing_data:
+        print(
+            f"Point {point.path} does not contain a Gaussian wavefunction (.wfn) file."
         )
-        if print_missing_data:
-            print(
-                f"Point {point.path} does not contain a Gaussian wavefunction (.wfn) file."
-            )
 
     ###############################
     # gaussian output file check
     ###############################
 
+    global_forces = None
     if not point.gaussian_output:
         if print_missing_data:
             print(f"Point {point.path} does not contain a Gaussian output (.gau) file.")
+    # forces are saved directly from gaussian out file, thus they are in
+    # global cartesian coordinates. This means these forces need to be rotated later
+    # when an ALF is chosen for atoms.
+    elif point.gaussian_output.global_forces:
+        global_forces = point.gaussian_output.global_forces
+    # in case that the force keyword was not used but gaussian out exists
+    else:
+        print(
+            f"Point {point.path} does not have forces in Gaussian output (.gau) file."
+        )
 
-    ###############################
-    # _atomicfiles directory check
-    ###############################
-
-    # add database point to session. Need to do this before adding the dataset stuff
-    # because the id needs to be assigned to the point (because dataset contains foreign key point_id)
-    session.add(db_point)
-
-    # use this list later to bulk add all Dataset instances to database
-    # there are multiple Dataset instances because each single point (one row in points table)
-    # relates to multiple rows in the dataset table
+    # one row in points table relates to multiple rows in the dataset table
     # (because one point contains many atoms and each atom has information for it)
-    db_dataset_list = []
+    dataset = []
 
     # list that will add missing int files
     # (if _atomicfiles directory exists) but .int file for an atom does not.
     missing_int_files = []
 
     # add information to dataset table for each atom
-    for atom_name in point.atom_names:
+    for atom in point.atoms:
 
-        # make select statement to get atom name
-        atom_select_statement = select(AtomNames).where(AtomNames.name == atom_name)
-        # get the id of the atom from the atom_names table.
-        # use scalars instead of execute and return the first row (there should be one row as atom names are unique)
-        atom_id = session.scalars(atom_select_statement).first().id
-
-        # get x, y, z coordinates of atom which can then be used to calculated features
+        # x, y, z coordinates of atom which can then be used to calculated features
         # based on the coordinates of the other atoms in the molecule
-        atom_coordinates = point[atom_name].coordinates
-        x_coord = atom_coordinates[0]
-        y_coord = atom_coordinates[1]
-        z_coord = atom_coordinates[2]
+        x_coord, y_coord, z_coord = atom.coordinates.tolist()
+        row = {"atom_name": atom.name, "x": x_coord, "y": y_coord, "z": z_coord}
 
         ###############################
         # .gau / gaussian output information
         ###############################
 
-        # forces are saved directly from gaussian out file, thus they are in
-        # global cartesian coordinates. This means these forces need to be rotated later
-        # when an ALF is chosen for atoms.
-        if point.gaussian_output:
-            if point.gaussian_output.global_forces:
-                atom_global_forces = point.gaussian_output.global_forces[atom_name]
-                atom_force_x = atom_global_forces[0]
-                atom_force_y = atom_global_forces[1]
-                atom_force_z = atom_global_forces[2]
-
-            # in case that the force keyword was not used but gaussian out exists
-            else:
-                atom_force_x, atom_force_y, atom_force_z = None, None, None
-                print(
-                    f"Point {point.path} does not have forces in Gaussian output (.gau) file."
-                )
-        # in case that gaussian out does not exist in point directory
-        else:
-            atom_force_x, atom_force_y, atom_force_z = None, None, None
+        if global_forces:
+            atom_global_forces = global_forces[atom.name]
+            row["force_x"] = float(atom_global_forces[0])
+            row["force_y"] = float(atom_global_forces[1])
+            row["force_z"] = float(atom_global_forces[2])
 
         ###############################
         # .int file information
         ###############################
-        if point.ints:
-            # add information from int file for the current atom
-            # get the INT instance representing the .int file for the atom
-            # use get here to get a default value of None if .int file is missing for some atom
-            atom_int_file = point.ints.get(atom_name, None)
-
-            # if .int file / INT instance exists, then data can be read in
-            if atom_int_file:
-
-                # do not display warning from .int file if iqa energy is not there
-                # iqa energy will not be in an existing .int file in -encomp setting is below 3
-                with warnings.catch_warnings():
-                    warnings.filterwarnings("ignore")
-                    atom_iqa_energy = atom_int_file.iqa
-
-                # integration error should always exist
-                atom_integration_error = atom_int_file.integration_error
-
-                # note that these are not rotated because the alf has not been chosen yet
-                # the user can choose an alf and rotate the global spherical multipoles as needed
-                global_multipole_moments = atom_int_file.global_spherical_multipoles
-
-                # add the Dataset object to list so it can be bulk written later
-                db_dataset_list.append(
-                    Dataset(
-                        point_id=db_point.id,
-                        atom_id=atom_id,
-                        x=x_coord,
-                        y=y_coord,
-                        z=z_coord,
-                        force_x=atom_force_x,
-                        force_y=atom_force_y,
-                        force_z=atom_force_z,
-                        iqa=atom_iqa_energy,
-                        integration_error=atom_integration_error,
-                        **global_multipole_moments,
-                    )
-                )
 
-            # if .int file for an atom does not exist then (but _atomicfiles directory exists)
-            # then just append the coordinates and any other read in information
-            else:
-                # add the Dataset object to list so it can be bulk written later
-                db_dataset_list.append(
-                    Dataset(
-                        point_id=db_point.id,
-                        atom_id=atom_id,
-                        x=x_coord,
-                        y=y_coord,
-                        z=z_coord,
-                        force_x=atom_force_x,
-                        force_y=atom_force_y,
-                        force_z=atom_force_z,
-                        # the .int file arguments will be None by default
-                        # as they can be nullable because of the dataset SQL table definition
-                    )
-                )
-                missing_int_files.append(atom_name)
+        # add information from int file for the current atom
+        # get the INT instance representing the .int file for the atom
+        # use get here to get a default value of None if .int file is missing for some atom
+        atom_int_file = point.ints.get(atom.name, None)
+
+        # if .int file / INT instance exists, then data can be read in
+        if atom_int_file:
+
+            # do not display warning from .int file if iqa energy is not there
+            # iqa energy will not be in an existing .int file in -encomp setting is below 3
+            with warnings.catch_warnings():
+                warnings.filterwarnings("ignore")
+                row["iqa"] = atom_int_file.iqa
+
+            # integration error should always exist
+            row["integration_error"] = atom_int_file.integration_error
+
+            # note that these are not rotated because the alf has not been chosen yet
+            # the user can choose an alf and rotate the global spherical multipoles as needed
+            row.update(atom_int_file.global_spherical_multipoles)
 
+        # if .int file for an atom does not exist then (but _atomicfiles directory exists)
+        # then just add the coordinates and any other read in information
+        # the .int file columns will be None as they are nullable in the dataset SQL table definition
         else:
-            # add the Dataset object to list so it can be bulk written later
-            db_dataset_list.append(
-                Dataset(
-                    point_id=db_point.id,
-                    atom_id=atom_id,
-                    x=x_coord,
-                    y=y_coord,
-                    z=z_coord,
-                    force_x=atom_force_x,
-                    force_y=atom_force_y,
-                    force_z=atom_force_z,
-                    # the .int file arguments will be None by default
-                    # as they can be nullable because of the dataset SQL table definition
-                )
-            )
+            missing_int_files.append(atom.name)
+
+        dataset.append(row)
 
     # if there are missing atoms, then print these out
-    if len(missing_int_files) > 0:
+    if missing_int_files and print_missing_data:
+        print(
+            f"Point {point.path} has missing .int files for atoms: {missing_int_files}."
+        )
+
+    return {
+        "name": point.name_without_suffix,
+        "wfn_energy": wfn_energy,
+        "dataset": dataset,
+    }
 
-        if print_missing_data:
-            print(
-                f"Point {point.path} has missing .int files for atoms: {missing_int_files}."
-            )
+
+def add_point_to_database(
+    session: Session,
+    point: "ichor.core.files.PointDirectory",  # noqa F821
+    echo=False,
+    print_missing_data=True,
+):
+    """Adds information from an instance of a PointDirectory to the database.
+
+    :param session: Session to the database
+    :param point: A PointDirectory instance, containing Gaussian/AIMAll outputs that can be
+        written to the database.
+
+    .. note:: Even if atomic data (.int file) is missing for a particular atom in the system,
+        the information for the point will still be added to the database. This is because
+        the rest the point can still be used in the training set for the other atoms.
+    """
+
+    record = get_point_record(point, print_missing_data=print_missing_data)
+    if record is None:
+        return
+
+    # ORM for points table
+    db_point = Points(
+        date_added=_date_added(), name=record["name"], wfn_energy=record["wfn_energy"]
+    )
+
+    # add database point to session and flush, because the id needs to be assigned to the point
+    # (because dataset contains foreign key point_id)
+    session.add(db_point)
+    session.flush()
+
+    atom_ids = dict(session.execute(select(AtomNames.name, AtomNames.id)).all())
 
     # bulk save the information for all atoms in the point
-    session.bulk_save_objects(db_dataset_list)
+    session.bulk_save_objects(
+        [
+            Dataset(
+                point_id=db_point.id,
+                atom_id=atom_ids[row["atom_name"]],
+                **{column: row.get(column) for column in _DATASET_COLUMNS},
+            )
+            for row in record["dataset"]
+        ]
+    )
     # commit to database
     session.commit()
+
+
+def _insert_point_records(
+    conn, records: Iterable[Optional[dict]], batch_size: int
+) -> int:
+    """Inserts the records with ``executemany`` in batches, see `add_points_to_database_bulk`.
+
+    :return: The number of points which were added to the database
+    """
+
+    date_added = _date_added()
+    npoints = 0
+
+    atom_ids = dict(conn.execute(select(AtomNames.name, AtomNames.id)).all())
+    # the ids of the points are assigned here (instead of by the database),
+    # so that the dataset rows can reference them without reading them back
+    next_point_id = (conn.execute(select(func.max(Points.id))).scalar_one() or 0) + 1
+
+    for chunk in chunker(filter(None, records), batch_size):
+
+        point_rows = []
+        dataset_rows = []
+
+        for point_id, record in enumerate(chunk, start=next_point_id):
+
+            point_rows.append(
+                {
+                    "id": point_id,
+                    "date_added": date_added,
+                    "name": record["name"],
+                    "wfn_energy": record["wfn_energy"],
+                }
+            )
+
+            for row in record["dataset"]:
+                atom_name = row["atom_name"]
+                if atom_name not in atom_ids:
+                    atom_ids[atom_name] = conn.execute(
+                        insert(AtomNames.__table__).values(name=atom_name)
+                    ).inserted_primary_key[0]
+                dataset_rows.append(
+                    {
+                        "point_id": point_id,
+                        "atom_id": atom_ids[atom_name],
+                        **{column: row.get(column) for column in _DATASET_COLUMNS},
+                    }
+                )
+
+        conn.execute(insert(Points.__table__), point_rows)
+        if dataset_rows:
+            conn.execute(insert(Dataset.__table__), dataset_rows)
+
+        next_point_id += len(chunk)
+        npoints += len(chunk)
+
+    return npoints
+
+
+def add_points_to_database_bulk(
+    database_path: Union[str, Path],
+    records: Iterable[Optional[dict]],
+    batch_size: int = 1000,
+    echo=False,
+) -> int:
+    """Adds many points to the database at once. Instead of going through the ORM point by point,
+    the rows are inserted with ``executemany`` in batches inside a single transaction, so this is
+    much faster for large PointsDirectory-ies (e.g. sample pools).
+
+    .. note::
+        During the load, the database uses write-ahead logging and ``synchronous=OFF``, so SQLite does not
+        wait for the data to reach the disk. This trades durability for speed: if the machine crashes or
+        loses power (a crash of Python is fine) during the load, the database file can be corrupted, so
+        keep a copy of databases which cannot be recreated. The journal mode is switched back to
+        ``DELETE`` after the load (also if it fails), because the ``-wal`` and ``-shm`` files of write-ahead
+        logging are not safe on network file systems (e.g. NFS or Lustre on HPC clusters).
+
+    :param database_path: Path to an existing database (see ``create_database``)
+    :param records: An iterable of records (see ``get_point_record``), e.g. read in parallel
+        by worker processes. None records (points which should not be added) are skipped.
+    :param batch_size: Number of points which are inserted with one ``executemany``, defaults to 1000
+    :param echo: Whether for SQLAlchemy to echo SQL commands used, defaults to False
+    :return: The number of points which were added to the database
+    """
+
+    database_path = str(Path(database_path).absolute())
+    engine = create_engine(
+        f"sqlite+pysqlite:///{database_path}", echo=echo, future=True
+    )
+
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+        conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        # end the transaction which is automatically started by SQLAlchemy
+        conn.commit()
+
+        try:
+            with conn.begin():
+                npoints = _insert_point_records(conn, records, batch_size)
+        finally:
+            # the journal mode is stored in the database file, so it is switched back after the load
+            conn.exec_driver_sql("PRAGMA journal_mode=DELETE")
+            conn.exec_driver_sql("PRAGMA synchronous=FULL")
+            conn.commit()
+
+    engine.dispose()
+
+    return npoints
@@ -1,7 +1,7 @@
 from pathlib import Path
 from typing import Union
 
-from sqlalchemy import Column, create_engine, Float, ForeignKey, Integer, String
+from sqlalchemy import Column, create_engine, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -47,6 +47,11 @@ class Points(Base):
 class Dataset(Base):
 
     __tablename__ = "dataset"
+    # indexes used to get the rows of one atom or one point without scanning the whole table
+    __table_args__ = (
+        Index("ix_dataset_atom_id_point_id", "atom_id", "point_id"),
+        Index("ix_dataset_point_id", "point_id"),
+    )
 
     id = Column(Integer, primary_key=True)
     point_id = Column(Integer, ForeignKey("points.id", ondelete="CASCADE"))
@@ -123,5 +128,22 @@ def create_database(database_path: Union[str, Path], echo=False):
     # Session = sessionmaker(bind=engine)
     # session = Session()
 
-    # create the table on disk
+    # create the table (and indexes) on disk
     Base.metadata.create_all(engine)
+
+
+def create_database_indexes(database_path: Union[str, Path], echo=False):
+    """Creates the indexes of the dataset table in an existing database. Databases made with
+    ``create_database`` already contain the indexes, so this is only needed for older databases.
+
+    :param database_path: A string or Path to an existing database on disk.
+    """
+
+    database_path = str(Path(database_path).absolute())
+
+    engine = create_engine(
+        f"sqlite+pysqlite:///{database_path}", echo=echo, future=True
+    )
+
+    for index in Dataset.__table__.indexes:
+        index.create(engine, checkfirst=True)
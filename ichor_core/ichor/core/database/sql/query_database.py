@@ -1,6 +1,6 @@
 from pathlib import Path
 from sqlite3 import Connection as SQLite3Connection
-from typing import List, Tuple, Union
+from typing import Iterator, List, Optional, Tuple, Union
 
 import pandas as pd
 import sqlalchemy
@@ -192,6 +192,73 @@ def get_full_dataframe_for_all_atoms(
     return full_df
 
 
+def iter_points_from_sqlite_db(
+    db_path: Union[str, Path],
+    atom_name: Optional[str] = None,
+    point_id_range: Optional[Tuple[int, int]] = None,
+    chunksize: int = 10000,
+    echo=False,
+) -> Iterator[Tuple[int, pd.DataFrame]]:
+    """Streams the data of the database point by point, instead of loading the whole
+    database into memory (see ``get_full_dataframe_for_all_atoms``). The rows are read
+    ``chunksize`` rows at a time using the indexes of the dataset table.
+
+    :param db_path: Path or str to database
+    :param atom_name: If given, only the rows for this atom (e.g. `C1`) are returned, defaults to None
+    :param point_id_range: If given, only the points with ``start <= id < stop`` are returned, defaults to None
+    :param chunksize: Number of rows read from the database at once, defaults to 10000
+    :param echo: Whether to echo SQL statements, defaults to False
+    :return: A generator which yields the point id and a DataFrame (with the same columns
+        as ``get_full_dataframe_for_all_atoms``) containing the rows for that point,
+        ordered by point id.
+    """
+
+    conn = create_sqlite_db_connection(db_path=db_path, echo=echo)
+
+    dataset_columns = [
+        column
+        for column in Dataset.__table__.columns
+        if column.name not in ("id", "point_id", "atom_id")
+    ]
+
+    stmt = (
+        select(
+            Points.id,
+            Points.date_added,
+            Points.name,
+            Points.wfn_energy,
+            *dataset_columns,
+            AtomNames.name.label("atom_name"),
+        )
+        .join(Dataset, Dataset.point_id == Points.id)
+        .join(AtomNames, Dataset.atom_id == AtomNames.id)
+        # rows of one point are consecutive, in the order in which the atoms were added
+        .order_by(Dataset.point_id, Dataset.id)
+    )
+    if atom_name is not None:
+        stmt = stmt.where(AtomNames.name == atom_name)
+    if point_id_range is not None:
+        start, stop = point_id_range
+        stmt = stmt.where(Dataset.point_id >= start, Dataset.point_id < stop)
+
+    # the rows of the last point in a chunk might continue in the next chunk
+    leftover = None
+
+    for chunk in pd.read_sql(stmt, conn, chunksize=chunksize):
+
+        if leftover is not None:
+            chunk = pd.concat([leftover, chunk], ignore_index=True)
+
+        is_last_point = chunk["id"] == chunk["id"].iat[-1]
+        yield from chunk[~is_last_point].groupby("id", sort=False)
+        leftover = chunk[is_last_point]
+
+    if leftover is not None:
+        yield from leftover.groupby("id", sort=False)
+
+    conn.close()
+
+
 def get_sqlite_db_information(
     db_path: Union[str, Path], echo=False
 ) -> Tuple[List[str], List[str], pd.DataFrame]:
@@ -261,8 +328,11 @@ def trajectory_from_sqlite_database(
 
     trajectory_inst = Trajectory(trajectory_name)
 
+    # group once, instead of searching the whole dataframe for every point
+    point_dfs = dict(iter(full_df.groupby("id", sort=False)))
+
     for point_id in point_ids:
-        atoms = get_atoms_from_sqlite_point_id(full_df, point_id)
+        atoms = get_atoms_from_sqlite_point_id(point_dfs[point_id], point_id)
         trajectory_inst.append(atoms)
 
     return trajectory_inst
@@ -273,12 +343,15 @@ def csv_file_with_specific_properties(
 ):
     """Writes out csv file for each atom containing the given properties"""
 
+    # group once, instead of searching the whole dataframe for every point
+    point_dfs = dict(iter(full_df.groupby("id", sort=False)))
+
     for atom_name in all_atom_names:
         with open(f"{atom_name}_properties.csv", "w") as f:
             f.write(",".join(properties) + "\n")
             for point_id in point_ids:
                 # find geometry which matches the id
-                one_point_df = full_df.loc[full_df["id"] == point_id]
+                one_point_df = point_dfs[point_id]
                 # check that integration error is below threshold, otherwise do not calculate features
                 # for the atom and do not add this point to training set for this atom.
                 # if other atoms have good integration errors, the same point can be used in their training sets.
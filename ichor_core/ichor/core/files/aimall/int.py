@@ -15,7 +15,7 @@ from ichor.core.common.io import relpath
 from ichor.core.common.str import get_digits
 from ichor.core.common.types import Coordinates3D
 from ichor.core.common.types.version import Version
-from ichor.core.files.file import FileContents, ReadFile
+from ichor.core.files.file import FileContents, FileReadError, ReadFile
 from ichor.core.files.file_data import HasData
 from ichor.core.multipoles import (
     rotate_dipole,
@@ -24,6 +24,9 @@ from ichor.core.multipoles import (
     rotate_quadrupole,
 )
 
+# characters removed from the multipole names written by AIMAll, e.g. Q[2,2,c] -> q22c
+_MULTIPOLE_NAME_TABLE = str.maketrans("", "", "[],")
+
 
 class CriticalPointType(Enum):
     Bond = "BCP"
@@ -125,133 +128,131 @@ class Int(ReadFile, HasData):
         """
         return self.global_spherical_multipoles
 
-    def _path_relative_to_aimall(self, int_path: Path, other: Path) -> Path:
-        return relpath(self.path.parent, Path.cwd()) / relpath(other, int_path.parent)
-
     def _read_file(self):
-        """Read an .int file. The first time that the .int file is read successfully, a json file with the
-        important information is written in the same directory.
+        """Read an .int file. The whole file is read at once and the sections of interest are found
+        in a single pass over the lines of the file.
         """
 
         with open(self.path, "r") as f:
-            line = next(f)
-            aimall_version = Version(line.split()[2].strip(","))
-
-            if aimall_version.major == 19:
-                while "Current Directory" not in line:
-                    line = next(f)
-
-                # TODO: document what this is doing and why
-                self.current_directory = Path(line.split()[-1])
-                next(f)  # blank line
-
-                inp_file_path = self.current_directory / Path(next(f).split()[-1])
-                wfn_file_path = self.current_directory / Path(next(f).split()[-1])
-                out_file_path = self.current_directory / Path(next(f).split()[-1])
-
-            elif aimall_version.major == 16:
-                while "Inp File:" not in line:
-                    line = next(f)
-
-                inp_file_path = Path(line.split()[-1])
-                wfn_file_path = Path(next(f).split()[-1])
-                out_file_path = Path(next(f).split()[-1])
-
-            # TODO: not sure if these are correct or if they are needed. Potentially remove.
-            self.inp_file_path = self._path_relative_to_aimall(
-                out_file_path, inp_file_path
-            )
-            self.wfn_file_path = self._path_relative_to_aimall(
-                out_file_path, wfn_file_path
-            )
-            self.out_file_path = self._path_relative_to_aimall(
-                out_file_path, out_file_path
+            lines = f.read().splitlines()
+
+        def find(text: str, start: int) -> int:
+            """Returns the index of the first line (at or after line ``start``) which contains ``text``."""
+            for i in range(start, len(lines)):
+                if text in lines[i]:
+                    return i
+            raise FileReadError(f"Could not find '{text}' in {self.path}.")
+
+        aimall_version = Version(lines[0].split()[2].strip(","))
+
+        if aimall_version.major == 19:
+            i = find("Current Directory", 0)
+
+            # TODO: document what this is doing and why
+            current_directory = Path(lines[i].split()[-1])
+            # skip blank line
+            inp_file_path = current_directory / Path(lines[i + 2].split()[-1])
+            wfn_file_path = current_directory / Path(lines[i + 3].split()[-1])
+            out_file_path = current_directory / Path(lines[i + 4].split()[-1])
+            i += 4
+
+        elif aimall_version.major == 16:
+            i = find("Inp File:", 0)
+
+            current_directory = FileContents
+            inp_file_path = Path(lines[i].split()[-1])
+            wfn_file_path = Path(lines[i + 1].split()[-1])
+            out_file_path = Path(lines[i + 2].split()[-1])
+            i += 2
+
+        else:
+            raise FileReadError(
+                f"Cannot read .int files written by AIMAll version {aimall_version} ({self.path})."
             )
 
-            next(f)  # blank line
-            self.title = next(f).split()[-1].strip()
-
-            line = next(f)
-            while "critical points" not in line:
-                line = next(f)
-
-            line = next(f)
-            self.critical_points = []
-            while "Optional parameters" not in line:
-                if "CP" in line:
-                    record = line.split()
-                    index = int(record[0])
-                    ty = CriticalPointType(record[1])
-                    x = float(record[3])
-                    y = float(record[4])
-                    z = float(record[5])
-                    atoms = record[6:] if len(record) >= 7 else []
-                    self.critical_points.append(
-                        CriticalPoint(index, ty, x, y, z, atoms)
+        # skip blank line
+        title = lines[i + 2].split()[-1].strip()
+
+        i = find("critical points", i + 3)
+        critical_points = []
+        for line in lines[i + 1 : find("Optional parameters", i + 1)]:
+            if "CP" in line:
+                record = line.split()
+                critical_points.append(
+                    CriticalPoint(
+                        int(record[0]),
+                        CriticalPointType(record[1]),
+                        float(record[3]),
+                        float(record[4]),
+                        float(record[5]),
+                        record[6:] if len(record) >= 7 else [],
                     )
-                line = next(f)
-
-            next(f)
-            self.dft_model = next(f).split(":")[-1].strip()
-
-            line = next(f)
-            while "Integration is over atom" not in line:
-                line = next(f)
-            self.atom_name = line.split()[-1].strip().capitalize()
-
-            line = next(f)
-            while "Results of the basin integration" not in line:
-                line = next(f)
-
-            self.basin_integration_results = {}
-            record = next(f).split()
-            self.basin_integration_results[record[0].strip()] = float(record[2])
-            self.net_charge = float(record[5])
-            line = next(f)
-            while "Atomic Traceless Quadrupole" not in line:
-                if "=" in line:
-                    record = line.split("=")
-                    self.basin_integration_results[record[0].strip()] = float(
-                        record[1].split()[0]
-                    )
-                line = next(f)
+                )
 
-            while "Real Spherical Harmonic Moments" not in line:
-                line = next(f)
+        i = find("Optional parameters", i + 1)
+        dft_model = lines[i + 2].split(":")[-1].strip()
 
-            next(f)
-            next(f)
-            next(f)
+        i = find("Integration is over atom", i + 3)
+        atom_name = lines[i].split()[-1].strip().capitalize()
 
-            self.global_spherical_multipoles = {}
-            line = next(f)
-            while "=" in line:
+        i = find("Results of the basin integration", i + 1)
+        basin_integration_results = {}
+        record = lines[i + 1].split()
+        basin_integration_results[record[0].strip()] = float(record[2])
+        net_charge = float(record[5])
+        j = find("Atomic Traceless Quadrupole", i + 2)
+        for line in lines[i + 2 : j]:
+            if "=" in line:
                 record = line.split("=")
-                multipole_name = "".join(
-                    c for c in record[0].lower().strip() if c not in {"[", "]", ","}
+                basin_integration_results[record[0].strip()] = float(
+                    record[1].split()[0]
                 )
-                self.global_spherical_multipoles[multipole_name] = float(record[1])
-                line = next(f)
-
-            # replace q00 so that it subtracts the nuclear charge
-            self.global_spherical_multipoles["q00"] = self.net_charge
-
-            while "IQA Energy Components" not in line:
-                line = next(f)
-
-            next(f)
 
-            self.iqa_energy_components = {}
-            line = next(f)
-            while "=" in line:
-                name, _, value = line.rpartition("=")
-                self.iqa_energy_components[name.strip()] = float(value)
-                line = next(f)
-
-            while "Total time" not in line:
-                line = next(f)
-
-            self.total_time = int(line.split()[3])
+        # skip the header of the multipoles
+        i = find("Real Spherical Harmonic Moments", j) + 4
+        global_spherical_multipoles = {}
+        while "=" in lines[i]:
+            record = lines[i].split("=")
+            multipole_name = record[0].lower().strip().translate(_MULTIPOLE_NAME_TABLE)
+            global_spherical_multipoles[multipole_name] = float(record[1])
+            i += 1
+
+        # replace q00 so that it subtracts the nuclear charge
+        global_spherical_multipoles["q00"] = net_charge
+
+        i = find("IQA Energy Components", i) + 2
+        iqa_energy_components = {}
+        while "=" in lines[i]:
+            name, _, value = lines[i].rpartition("=")
+            iqa_energy_components[name.strip()] = float(value)
+            i += 1
+
+        total_time = int(lines[find("Total time", i)].split()[3])
+
+        # paths of the AIMAll files relative to the current working directory
+        # TODO: not sure if these are correct or if they are needed. Potentially remove.
+        aimall_directory = relpath(self.path.parent, Path.cwd())
+        aimall_output_directory = out_file_path.parent
+
+        self.current_directory = current_directory
+        self.inp_file_path = aimall_directory / relpath(
+            inp_file_path, aimall_output_directory
+        )
+        self.wfn_file_path = aimall_directory / relpath(
+            wfn_file_path, aimall_output_directory
+        )
+        self.out_file_path = aimall_directory / relpath(
+            out_file_path, aimall_output_directory
+        )
+        self.title = title
+        self.critical_points = critical_points
+        self.dft_model = dft_model
+        self.atom_name = atom_name
+        self.net_charge = net_charge
+        self.basin_integration_results = basin_integration_results
+        self.global_spherical_multipoles = global_spherical_multipoles
+        self.iqa_energy_components = iqa_energy_components
+        self.total_time = total_time
 
     @property
     def atom_num(self) -> int:
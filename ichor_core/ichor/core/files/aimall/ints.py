@@ -1,5 +1,6 @@
+import os
 from pathlib import Path
-from typing import Dict, Union
+from typing import Dict, List, Union
 
 import numpy as np
 from ichor.core.files.aimall.ab_int import AbInt
@@ -7,6 +8,13 @@ from ichor.core.files.aimall.int import Int
 from ichor.core.files.directory import AnnotatedDirectory
 from ichor.core.files.file_data import HasData
 
+# attributes of Int instances which are stored in the cache of an IntDirectory
+_CACHED_DICT_ATTRIBUTES = (
+    "basin_integration_results",
+    "global_spherical_multipoles",
+    "iqa_energy_components",
+)
+
 
 class IntDirectory(HasData, AnnotatedDirectory):
     """Wraps around a directory which contains all .int files for the system.
@@ -14,6 +22,14 @@ class IntDirectory(HasData, AnnotatedDirectory):
     :param path: The Path corresponding to a directory holding .int files
     :param parent: An Atoms instance that holds coordinate information for all the atoms in the system.
         Things like XYZ and GJF hold geometry.
+
+    .. note::
+        If ``use_cache`` is set (e.g. ``IntDirectory.use_cache = True``), the data of the .int files
+        (IQA energy components, global multipoles, basin integration results) is cached in a binary
+        ``.ints_cache.npz`` file inside the directory when ``raw_data`` is accessed. The next time ``raw_data``
+        is accessed, .int files whose size and modification time have not changed are not parsed again,
+        but their data is taken from the cache. The cache is off by default, so that reading data does not
+        write into data directories.
     """
 
     # removed inheritance from dict because we are not using class as dictionary
@@ -22,17 +38,148 @@ class IntDirectory(HasData, AnnotatedDirectory):
 
     contents = {"ints": Int, "interaction_ints": AbInt}
 
+    # whether to cache the data of the .int files in a binary file inside the directory
+    use_cache: bool = False
+    _cache_name = ".ints_cache.npz"
+
     def __init__(self, path: Union[Path, str]):
 
         AnnotatedDirectory.__init__(self, path)
 
+    @property
+    def cache_path(self) -> Path:
+        """Returns the path to the binary file in which the data of the .int files is cached."""
+        return self.path / self._cache_name
+
+    @property
+    def _int_files(self) -> List[Int]:
+        """Returns a list of the Int instances, also if there is only one or no .int file in the directory."""
+        if isinstance(self.ints, Int):
+            return [self.ints]
+        return list(self.ints) if self.ints else []
+
+    def _read_cache(self) -> int:
+        """Sets the cached data of every .int file which has not changed since the cache was written.
+        The other attributes of the Int instances are read from the .int file when they are accessed.
+
+        :return: The number of .int files for which the cached data was used
+        """
+
+        try:
+            with np.load(self.cache_path) as cache:
+                strings = cache["strings"].tolist()
+                integers = cache["integers"].tolist()
+                floats = cache["floats"].tolist()
+        except (OSError, ValueError, KeyError):
+            return 0
+
+        # see _write_cache for the layout of the cache
+        n = integers[0]
+        names, atom_names, titles, dft_models = (
+            strings[i * n : (i + 1) * n] for i in range(4)
+        )
+        sizes, mtimes, total_times = (
+            integers[1 + i * n : 1 + (i + 1) * n] for i in range(3)
+        )
+        offsets = integers[1 + 3 * n :]
+        keys = strings[4 * n :]
+        net_charges = floats[:n]
+        values = floats[n:]
+
+        rows = {name: row for row, name in enumerate(names)}
+        ncached = 0
+
+        for int_file in self._int_files:
+            row = rows.get(int_file.path.name)
+            if row is None:
+                continue
+            stat = int_file.path.stat()
+            if sizes[row] != stat.st_size or mtimes[row] != stat.st_mtime_ns:
+                continue
+
+            int_file.atom_name = atom_names[row]
+            int_file.title = titles[row]
+            int_file.dft_model = dft_models[row]
+            int_file.net_charge = net_charges[row]
+            int_file.total_time = total_times[row]
+
+            for i, attribute in enumerate(_CACHED_DICT_ATTRIBUTES):
+                start, end = offsets[i * (n + 1) + row], offsets[i * (n + 1) + row + 1]
+                setattr(
+                    int_file, attribute, dict(zip(keys[start:end], values[start:end]))
+                )
+
+            ncached += 1
+
+        return ncached
+
+    def _write_cache(self):
+        """Writes the data of all .int files to the cache. The .int files are read if needed.
+
+        The cache only contains three arrays, because every array in a .npz file adds overhead when reading:
+
+        - ``strings``: file names, atom names, titles, DFT models (one per .int file), followed by the keys of
+          the basin integration results, global multipoles and IQA energy components of all .int files
+        - ``integers``: the number of .int files, file sizes, modification times, total times, followed by
+          the offsets of each .int file into the keys and values (for each of the dictionaries)
+        - ``floats``: the net charges (one per .int file), followed by the values of the dictionaries
+        """
+
+        int_files = self._int_files
+        stats = [int_file.path.stat() for int_file in int_files]
+
+        strings = (
+            [int_file.path.name for int_file in int_files]
+            + [int_file.atom_name for int_file in int_files]
+            + [int_file.title for int_file in int_files]
+            + [int_file.dft_model for int_file in int_files]
+        )
+        integers = (
+            [len(int_files)]
+            + [stat.st_size for stat in stats]
+            + [stat.st_mtime_ns for stat in stats]
+            + [int_file.total_time for int_file in int_files]
+        )
+        floats = [int_file.net_charge for int_file in int_files]
+
+        # the dictionaries of all .int files are stored one after the other
+        offset = 0
+        for attribute in _CACHED_DICT_ATTRIBUTES:
+            for int_file in int_files:
+                d = getattr(int_file, attribute)
+                integers.append(offset)
+                strings.extend(d.keys())
+                floats.extend(d.values())
+                offset += len(d)
+            integers.append(offset)
+
+        # write to a temporary file first, so that the cache is never read while being written
+        # the cache is optional, so do not fail if it cannot be written (e.g. read-only directory)
+        tmp_path = self.cache_path.with_name(f"{self._cache_name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f,
+                    strings=np.array(strings, dtype=str),
+                    integers=np.array(integers, dtype=np.int64),
+                    floats=np.array(floats, dtype=float),
+                )
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+
     @property
     def raw_data(self) -> dict:
         """Returns data associated with each atom. If interaction ints are present,
         also adds these to the dictionary.
         """
 
-        all_data = {i.atom_name: i.raw_data for i in self.ints}
+        if self.use_cache:
+            ncached = self._read_cache()
+            if ncached != len(self._int_files):
+                self._write_cache()
+
+        all_data = {i.atom_name: i.raw_data for i in self._int_files}
 
         if self.interaction_ints:
             interactions_dict = {
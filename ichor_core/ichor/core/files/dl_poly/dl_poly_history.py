@@ -1,13 +1,13 @@
 from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, List, Optional
 
 import numpy as np
 from ichor.core.atoms import Atom, Atoms
 from ichor.core.common.io import convert_to_path
 from ichor.core.common.str import split_by
 from ichor.core.common.units import AtomicDistance
-from ichor.core.files.file import FileContents
+from ichor.core.files.file import FileContents, FileState
 from ichor.core.files.xyz import Trajectory
 
 
@@ -117,6 +117,11 @@ class DlPolyHistory(Trajectory):
         To get a list of missing timesteps, use the self.removed_timesteps attribute
         of the DlPolyHistory class.
 
+    .. note::
+        Like `Trajectory`, the coordinates of all timesteps are stored in one coordinate block.
+        The DL POLY information of each timestep (timestep number, unit cell, velocities, forces, etc.)
+        is stored separately and `DlpolyTimestep` instances are only made when a timestep is accessed.
+        Slicing a DlPolyHistory returns a `Trajectory` which only contains the coordinates.
     """
 
     _filetype = ""
@@ -133,20 +138,141 @@ class DlPolyHistory(Trajectory):
         self.existing_timesteps = FileContents
         self.removed_timesteps = FileContents
 
+        # per timestep DL POLY information, the coordinates are stored in the Trajectory coordinate block
+        self._timestep_info = []
+        self._velocities = []
+        self._forces = []
+
     @classmethod
     def check_path(cls, path: Path) -> bool:
         return path.stem == "HISTORY"
 
-    def _read_file(self):
+    def add(self, timestep: DlpolyTimestep):
+        """Adds a timestep to the end of the history. The coordinates are stored in the coordinate block,
+        while the DL POLY information, velocities and forces of the timestep are stored separately."""
+
+        super().add(timestep)
+
+        if isinstance(timestep, DlpolyTimestep):
+            self._timestep_info.append(
+                (
+                    timestep.ntimestep,
+                    timestep.number_of_atoms,
+                    timestep.trajectory_key,
+                    timestep.periodic_boundary,
+                    timestep.timestep_length,
+                    timestep.timestep,
+                    timestep.unit_cell.copy(),
+                )
+            )
+        else:
+            self._timestep_info.append(None)
+
+        self._velocities.append(
+            np.array([atom._veloctity for atom in timestep])
+            if len(timestep)
+            and isinstance(timestep[0], DlpolyTimestepAtom)
+            and timestep[0]._veloctity is not None
+            else None
+        )
+        self._forces.append(
+            np.array([atom._force for atom in timestep])
+            if len(timestep)
+            and isinstance(timestep[0], DlpolyTimestepAtom)
+            and timestep[0]._force is not None
+            else None
+        )
+
+    def _timestep(self, i: int) -> DlpolyTimestep:
+        """Returns the ``i`` th timestep as a `DlpolyTimestep` whose coordinates are a view into the coordinate block"""
+
+        timestep = DlpolyTimestep()
+
+        if self._timestep_info[i] is not None:
+            (
+                timestep.ntimestep,
+                timestep.number_of_atoms,
+                timestep.trajectory_key,
+                timestep.periodic_boundary,
+                timestep.timestep_length,
+                timestep.timestep,
+                timestep.unit_cell,
+            ) = self._timestep_info[i]
+
+        timestep._bind(
+            self._types,
+            self._coordinates[i],
+            self._indices,
+            self._units,
+            atom_class=DlpolyTimestepAtom,
+        )
+
+        velocities = self._velocities[i]
+        forces = self._forces[i]
+        for j, atom in enumerate(timestep):
+            atom._veloctity = None if velocities is None else velocities[j]
+            atom._force = None if forces is None else forces[j]
+
+        return timestep
+
+    def iter_chunks(self, chunk_size: int = 1000) -> Iterator[Trajectory]:
+        """Iterates over the history in chunks of up to ``chunk_size`` timesteps. Each chunk is a
+        `Trajectory` whose ``coordinates`` are a ``chunk_size`` x ``n_atoms`` x 3 array.
+
+        If the HISTORY file has not been read yet, the timesteps are parsed from the file chunk by chunk
+        and the history is not read into memory. This allows analysing HISTORY files which do not
+        fit into memory. Timesteps containing binary data are skipped, as when reading the file.
+
+        :param chunk_size: The maximum number of timesteps in a chunk
+        :raises ValueError: If the chunk size is not positive
+        """
+        if chunk_size < 1:
+            raise ValueError(f"Chunk size must be positive, not {chunk_size}.")
+
+        if self.state is FileState.Unread and self.path.exists():
+            return self._iter_file_chunks(chunk_size)
+
+        return super().iter_chunks(chunk_size)
+
+    def _iter_file_chunks(self, chunk_size: int) -> Iterator[Trajectory]:
+
+        # the history might have been read in the meantime (e.g. to get its length)
+        if self.state is FileState.Read:
+            yield from self._iter_chunks(chunk_size)
+            return
+
+        atom_types = None
+        coordinates = []
+
+        for _, atom_types, timestep_coordinates, _, _ in self._iter_timesteps():
+            coordinates.append(timestep_coordinates)
+            if len(coordinates) == chunk_size:
+                yield Trajectory.from_coordinates(
+                    self.path, np.array(coordinates), atom_types
+                )
+                coordinates = []
+
+        if coordinates:
+            yield Trajectory.from_coordinates(
+                self.path, np.array(coordinates), atom_types
+            )
+
+    def _iter_timesteps(self) -> Iterator[tuple]:
+        """Parses the HISTORY file one timestep at a time. Timesteps which contain binary data are skipped.
+
+        :return: A generator of tuples containing the DL POLY information of the timestep, the atom types,
+            and the coordinates, velocities and forces of the atoms (velocities and forces are None
+            if they are not written to the file)
+        """
 
         # we will read the first lines to get number of atoms
         # then read in a chunk of lines, if binary is encountered then discard all geometries
         # this will likely discard extra geometries, but will ensure that
         # all geometries are read in correctly at least
 
-        try:
+        with open(self.path, "r") as f:
 
-            with open(self.path, "r") as f:
+            try:
 
                 line = next(f)
                 self.title = line
@@ -168,131 +294,116 @@ class DlPolyHistory(Trajectory):
 
                 while True:
 
-                    # default is that the timestep does not contain binary
-                    timestep_contains_binary = False
-
                     line = next(f)
                     # if timestep is in beginning of line, this should be beginning of geometry
                     # and there should not be binary in that line
                     if "timestep" == line.split()[0]:
 
-                        this_timestep_lines = []
-                        this_timestep_lines.append(line)
+                        this_timestep_lines = [line]
                         for _ in range(nlines_to_read):
-                            line = next(f)
-                            this_timestep_lines.append(line)
+                            this_timestep_lines.append(next(f))
 
                         # check if any line has binary
                         # if it does, then do not add this timestep
                         # doing so might also remove next timesteps
                         # because of lines missing that are read from the next geometry
-                        for i in this_timestep_lines:
-                            if "\x00" in i:
-                                timestep_contains_binary = True
-                                break
-
                         # if there is no binary in timestep, then it should have clean
                         # data, so we can read it as normal
-                        # iterate over the list containing all tines for this timestep
-                        if not timestep_contains_binary:
-
-                            this_timestep_lines = iter(this_timestep_lines)
-
-                            timestep = DlpolyTimestep()
-
-                            # loop over lines in the timestep that has been read in
-                            line = next(this_timestep_lines)
-                            # record = 'timestep' ntimestep number_of_atoms keytraj keypbc timestep_length timestep
-                            record = line.split()
-                            # since this timestep not contain binary
-                            # the timestep that is in the file should be correct
-                            timestep.ntimestep = int(record[1])
-
-                            timestep.number_of_atoms = int(record[2])
-                            timestep.trajectory_key = DlpolyTrajectoryKey(
-                                int(record[3])
-                            )
-                            timestep.periodic_boundary = DlpolyPeriodicBoundary(
-                                int(record[4])
-                            )
-                            timestep.timestep_length = float(record[5])
-                            timestep.timestep = float(record[6])
-
-                            timestep.unit_cell[0, :] = np.array(
-                                [float(ai) for ai in next(this_timestep_lines).split()]
-                            )  # a vector of unit cell
-                            timestep.unit_cell[1, :] = np.array(
-                                [float(bi) for bi in next(this_timestep_lines).split()]
-                            )  # b vector of unit cell
-                            timestep.unit_cell[2, :] = np.array(
-                                [float(ci) for ci in next(this_timestep_lines).split()]
-                            )  # c vector of unit cell
-
-                            for _ in range(timestep.number_of_atoms):
-
-                                line = next(this_timestep_lines)
-                                # record = atom_type atom_index atomic_mass charge
-                                record = split_by(line, [8, 10, 12, 12])
-
-                                timestep_atom_type = str(record[0])
-
-                                line = next(this_timestep_lines)
-                                timestep_atom_coordinates = np.array(
-                                    [float(ci) for ci in line.split()]
-                                )
-
-                                timestep_atom = DlpolyTimestepAtom(
-                                    timestep_atom_type,
-                                    timestep_atom_coordinates[0],
-                                    timestep_atom_coordinates[1],
-                                    timestep_atom_coordinates[2],
-                                )
-
-                                if timestep.trajectory_key in [
-                                    DlpolyTrajectoryKey.CoordinateVelocity,
-                                    DlpolyTrajectoryKey.CoordinateVelocityForce,
-                                ]:
-                                    timestep_atom.velocity = np.array(
-                                        [
-                                            float(vi)
-                                            for vi in next(this_timestep_lines).split()
-                                        ]
-                                    )
-
-                                if (
-                                    timestep.trajectory_key
-                                    is DlpolyTrajectoryKey.CoordinateVelocityForce
-                                ):
-                                    timestep_atom.force = np.array(
-                                        [
-                                            float(fi)
-                                            for fi in next(this_timestep_lines).split()
-                                        ]
-                                    )
-
-                                timestep.add(timestep_atom)
-
-                            # this timestep should be safe to add
-                            # and no binary data should be present
-                            self.add(timestep)
-
-        except StopIteration:
-            # these are the timesteps that are read in
-            # get the ntimestep attribute
-            # which should always be correct even if data is missing
-            existing_timesteps = [i.ntimestep for i in self]
-
-            # these are the missing timesteps because of binary in HISTORY file
-            removed_timesteps = []
-            # loop over all timesteps that are in the HISTORY file
-            # note that the initial geometry is also counted a timestep
-            # so setting the CONTROL timesteps to 500 for example will give 501 geometries in HISTORY file
-            for i in range(self.ntimesteps):
-                if i not in existing_timesteps:
-                    removed_timesteps.append(i)
-
-            self.existing_timesteps = existing_timesteps
-            self.removed_timesteps = removed_timesteps
+                        if not any("\x00" in i for i in this_timestep_lines):
+                            yield self._parse_timestep(this_timestep_lines)
+
+            except StopIteration:
+                return
+
+    @staticmethod
+    def _parse_timestep(lines: List[str]) -> tuple:
+        """Parses the lines of one timestep (that does not contain binary data) of a HISTORY file.
+        See `_iter_timesteps` for the returned tuple."""
+
+        lines = iter(lines)
+
+        # record = 'timestep' ntimestep number_of_atoms keytraj keypbc timestep_length timestep
+        record = next(lines).split()
+        # since this timestep not contain binary
+        # the timestep that is in the file should be correct
+        ntimestep = int(record[1])
+        number_of_atoms = int(record[2])
+        trajectory_key = DlpolyTrajectoryKey(int(record[3]))
+        periodic_boundary = DlpolyPeriodicBoundary(int(record[4]))
+        timestep_length = float(record[5])
+        timestep = float(record[6])
+
+        # a, b and c vectors of unit cell
+        unit_cell = np.array([next(lines).split() for _ in range(3)], dtype=float)
+
+        atom_types = []
+        coordinates = []
+        velocities = []
+        forces = []
+
+        for _ in range(number_of_atoms):
+
+            # record = atom_type atom_index atomic_mass charge
+            record = split_by(next(lines), [8, 10, 12, 12])
+            atom_types.append(str(record[0]))
+
+            coordinates.append(next(lines).split())
+
+            if trajectory_key in [
+                DlpolyTrajectoryKey.CoordinateVelocity,
+                DlpolyTrajectoryKey.CoordinateVelocityForce,
+            ]:
+                velocities.append(next(lines).split())
+
+            if trajectory_key is DlpolyTrajectoryKey.CoordinateVelocityForce:
+                forces.append(next(lines).split())
+
+        return (
+            (
+                ntimestep,
+                number_of_atoms,
+                trajectory_key,
+                periodic_boundary,
+                timestep_length,
+                timestep,
+                unit_cell,
+            ),
+            atom_types,
+            np.array(coordinates, dtype=float),
+            np.array(velocities, dtype=float) if velocities else None,
+            np.array(forces, dtype=float) if forces else None,
+        )
+
+    def _read_file(self):
+
+        for (
+            timestep_info,
+            atom_types,
+            coordinates,
+            velocities,
+            forces,
+        ) in self._iter_timesteps():
+            # this timestep should be safe to add
+            # and no binary data should be present
+            self._add_coordinates(coordinates[np.newaxis], atom_types)
+            self._timestep_info.append(timestep_info)
+            self._velocities.append(velocities)
+            self._forces.append(forces)
+
+        # these are the timesteps that are read in
+        # get the ntimestep attribute
+        # which should always be correct even if data is missing
+        existing_timesteps = [info[0] for info in self._timestep_info]
+
+        # these are the missing timesteps because of binary in HISTORY file
+        # loop over all timesteps that are in the HISTORY file
+        # note that the initial geometry is also counted a timestep
+        # so setting the CONTROL timesteps to 500 for example will give 501 geometries in HISTORY file
+        existing = set(existing_timesteps)
+        removed_timesteps = [i for i in range(self.ntimesteps) if i not in existing]
+
+        self.existing_timesteps = existing_timesteps
+        self.removed_timesteps = removed_timesteps
 
     # TODO: potentially return this implementation once the issues with
     # binary code in the HISTORY file is resolved.
@@ -1,6 +1,8 @@
 import json
+from functools import partial
+from operator import attrgetter
 from pathlib import Path
-from typing import Callable, Dict, List, Optional, Union
+from typing import Callable, Dict, Iterator, List, Optional, Union
 
 import numpy as np
 import pandas as pd
@@ -8,16 +10,21 @@ from ichor.core.atoms import ALF, Atoms, ListOfAtoms
 from ichor.core.calculators.alf import default_alf_calculator
 from ichor.core.calculators.features.alf_features_calculator import (
     calculate_alf_features,
+    calculate_alf_features_batched,
 )
 from ichor.core.common import constants
 from ichor.core.common.io import mkdir
 from ichor.core.common.itertools import chunker
+from ichor.core.common.parallel import parallel_map
+from ichor.core.common.units import AtomicDistance
 from ichor.core.database.json import get_data_for_point
 from ichor.core.database.sql import (
     add_atom_names_to_database,
     add_point_to_database,
+    add_points_to_database_bulk,
     create_database,
     create_database_session,
+    get_point_record,
 )
 from ichor.core.files import GJF
 
@@ -29,6 +36,46 @@ from ichor.core.files.point_directory import PointDirectory
 from ichor.core.files.xyz import Trajectory, XYZ
 
 
+def _read_point(func: Callable, path: Path):
+    """Reads the point at the given path in a worker process and applies ``func`` to it."""
+    return func(PointDirectory(path))
+
+
+def _process_point(processing_func: Callable, args: tuple, kwargs: dict, point):
+    return point.processed_data(processing_func, *args, **kwargs)
+
+
+def _map_points(
+    points: List[PointDirectory],
+    func: Callable,
+    ncores: int = 1,
+    executor=None,
+    progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+) -> Iterator:
+    """Applies ``func`` to every point and yields the results in the order of the points.
+
+    If the work is done in parallel, only the paths of the points are sent to the worker processes, which
+    then read the files themselves. The PointDirectory instances of the current process are not read.
+
+    :param points: The PointDirectory instances to which to apply ``func``
+    :param func: A callable which takes one PointDirectory
+    :param ncores: The number of processes to use, defaults to 1
+    :param executor: An already existing ``concurrent.futures.Executor`` to use instead of starting a process pool
+    :param progress_callback: A callable which is called with the number of processed points and the
+        total number of points every time a point is processed
+    """
+    if ncores == 1 and executor is None:
+        return parallel_map(func, points, progress_callback=progress_callback)
+
+    return parallel_map(
+        partial(_read_point, func),
+        [point.path for point in points],
+        ncores=ncores,
+        executor=executor,
+        progress_callback=progress_callback,
+    )
+
+
 class PointsDirectory(ListOfAtoms, Directory, HasData):
     """
     A helper class that wraps around a directory which contains points (molecules with various geometries).
@@ -122,33 +169,72 @@ class PointsDirectory(ListOfAtoms, Directory, HasData):
             this PointsDirectoryParent instance.
         """
 
-        all_data_dict = {}
-        for p in self:
-            all_data_dict[p.stem] = p.raw_data
+        return self.get_raw_data()
+
+    def get_raw_data(
+        self,
+        ncores: int = 1,
+        executor=None,
+        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+    ) -> dict:
+        """Returns all raw data associated with the PointsDirectory instance, see ``raw_data``.
+        The points can be read in parallel, in which case the results are still returned in the same
+        order as the points.
+
+        :param ncores: The number of processes used to read the points, defaults to 1
+        :param executor: An already existing ``concurrent.futures.Executor`` to use instead of starting a process pool
+        :param progress_callback: A callable which is called with the number of read points and the
+            total number of points every time a point is read
+        :returns: A dictionary of raw data.
+            Keys of the dictionary are the stem of each PointDirectory contained inside
+            this PointsDirectory instance.
+        """
+
+        all_data = _map_points(
+            self, attrgetter("raw_data"), ncores, executor, progress_callback
+        )
 
-        return all_data_dict
+        return dict(zip((p.stem for p in self), all_data))
 
-    def processed_data(self, processing_func, *args, **kwargs) -> dict:
+    def processed_data(
+        self,
+        processing_func,
+        *args,
+        ncores: int = 1,
+        executor=None,
+        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+        **kwargs,
+    ) -> dict:
         """Processed data is some way, given any arguments and key words arguments,
         and returns a dictionary of the processed data, with keys
         Note that processing function can be any callable,
         i.e. closure, class, etc.
 
         .. note::
-            The processing function must act on one PointDirectory.
+            The processing function must act on one PointDirectory. If an executor is given,
+            the processing function must be picklable.
 
         :param processing_func: Callable which is going to process ONE PointDirectory
         :param args: Positional arguments to pass to processing func
+        :param ncores: The number of processes used to process the points, defaults to 1
+        :param executor: An already existing ``concurrent.futures.Executor`` to use instead of starting a process pool
+        :param progress_callback: A callable which is called with the number of processed points and the
+            total number of points every time a point is processed
+        :param kwargs: Key word arguments to pass to processing func
         :returns: A dictionary of processed data.
             Keys of the dictionary are the stem of each PointDirectory contained inside
             this PointsDirectory instance.
         """
 
-        all_data_dict = {}
-        for p in self:
-            all_data_dict[p.stem] = p.processed_data(processing_func, *args, **kwargs)
+        all_data = _map_points(
+            self,
+            partial(_process_point, processing_func, args, kwargs),
+            ncores,
+            executor,
+            progress_callback,
+        )
 
-        return all_data_dict
+        return dict(zip((p.stem for p in self), all_data))
 
     # TODO: move to processing function
     @property
@@ -261,6 +347,11 @@ class PointsDirectory(ListOfAtoms, Directory, HasData):
         """Returns the number of atoms in the first timestep. Each timestep should have the same number of atoms."""
         return len(self[0].atoms)
 
+    @property
+    def units(self) -> AtomicDistance:
+        """Returns the distance units of the coordinates. Assumes all timesteps use the same units as the first atom."""
+        return self[0].atoms[0].units
+
     @property
     def coordinates(self) -> np.ndarray:
         """
@@ -412,16 +503,24 @@ class PointsDirectory(ListOfAtoms, Directory, HasData):
         )
 
     def write_to_sqlite3_database(
-        self, db_path: Union[str, Path] = None, echo=False, print_missing_data=True
+        self,
+        db_path: Union[str, Path] = None,
+        echo=False,
+        print_missing_data=True,
+        ncores: int = 1,
+        bulk: bool = True,
     ) -> Path:
         """
         Write out important information from a PointsDirectory instance to an SQLite3 database.
 
         :param db_path: database to write to
-        :param echo: Whether to print out SQL queries from SQL Alchemy
         :param echo: Whether to print out SQL queries from SQL Alchemy, defaults to False
         :param print_missing_data: Whether to print out any missing data from each PointDirectory contained
             in self, defaults to False
+        :param ncores: The number of processes used to read the points, defaults to 1
+        :param bulk: Whether to insert all points in batches in a single transaction (see
+            ``add_points_to_database_bulk``). If False, every point is added separately with
+            the ORM and ``ncores`` is not used, defaults to True
         :return: The path to the written SQL database
         """
 
@@ -434,15 +533,21 @@ class PointsDirectory(ListOfAtoms, Directory, HasData):
         if db_path.exists():
             print("Database already exists. Adding new points to database...")
             session = create_database_session(db_path)
-            for point in self:
-                add_point_to_database(
-                    session, point, echo=echo, print_missing_data=print_missing_data
-                )
         else:
             print("Making new database and adding points...")
             create_database(db_path, echo)
             session = create_database_session(db_path)
             add_atom_names_to_database(session, self.atom_names, echo=echo)
+
+        if bulk:
+            session.close()
+            records = _map_points(
+                self,
+                partial(get_point_record, print_missing_data=print_missing_data),
+                ncores,
+            )
+            add_points_to_database_bulk(db_path, records, echo=echo)
+        else:
             for point in self:
                 add_point_to_database(
                     session, point, echo=echo, print_missing_data=print_missing_data
@@ -458,6 +563,7 @@ class PointsDirectory(ListOfAtoms, Directory, HasData):
         print_missing_data=True,
         indent: int = 2,
         separators=(",", ":"),
+        ncores: int = 1,
     ) -> Path:
         """
         Write out important information from a PointsDirectory instance to a json file.
@@ -474,6 +580,7 @@ class PointsDirectory(ListOfAtoms, Directory, HasData):
             in self, defaults to False
         :param indent: integer representing number of spaces to indent, defaults to 2
         :param separators: Separators used for each entry, default (",", ":")
+        :param ncores: The number of processes used to read the points, defaults to 1
         :return: The path to the written json file
         """
 
@@ -494,22 +601,15 @@ class PointsDirectory(ListOfAtoms, Directory, HasData):
         counter = 0
         json_file_path = root_path / f"{tmp_json_file_name}_{counter}.json"
 
-        total_data_list = []
-
-        for chunk in chunker(self, npoints_per_json):
-
-            for point in chunk:
+        all_data = _map_points(
+            self, partial(datafunction, print_missing_data=print_missing_data), ncores
+        )
 
-                total_data_list.append(
-                    datafunction(point, print_missing_data=print_missing_data)
-                )
+        for chunk in chunker(all_data, npoints_per_json):
 
             with open(json_file_path, "w") as json_db:
-                json.dump(
-                    total_data_list, json_db, indent=indent, separators=separators
-                )
+                json.dump(list(chunk), json_db, indent=indent, separators=separators)
 
-                total_data_list = []
                 counter += 1
                 json_file_path = root_path / f"{tmp_json_file_name}_{counter}.json"
 
@@ -598,33 +698,34 @@ class PointsDirectory(ListOfAtoms, Directory, HasData):
 
         from ichor.core.models.gaussian_energy_derivative_wrt_features import (
             convert_to_feature_forces,
-            form_b_matrix,
+            form_b_matrix_batched,
         )
 
-        training_data = []
+        coordinates = []
+        wfn_energies = []
+        cart_forces = []
         for point_dir in self:
-
             atoms = point_dir.xyz.atoms
-            features = atoms[central_atom_idx].features(
-                calculate_alf_features, alf_list
-            )
-            nfeatures = len(features)
-            wfn_energy = point_dir.wfn.total_energy
-            b_matrix = form_b_matrix(atoms, alf_list, central_atom_idx)
-            cart_forces = np.array(
-                list(point_dir.gaussian_output.global_forces.values())
-            )
-            dE_df = convert_to_feature_forces(
-                cart_forces, b_matrix, alf_list, central_atom_idx
-            )
-            training_data.append([*features, wfn_energy, *dE_df])
-
-            input_headers = [f"f{i + 1}" for i in range(nfeatures)]
-            output_headers = ["wfn_energy"] + [
-                f"-dEdf{i + 1}" for i in range(nfeatures)
-            ]
+            coordinates.append(atoms.to_angstroms().coordinates)
+            wfn_energies.append(point_dir.wfn.total_energy)
+            cart_forces.append(list(point_dir.gaussian_output.global_forces.values()))
+
+        # features, B matrices and dE/df of all points are calculated at once
+        coordinates = np.array(coordinates)
+        features = calculate_alf_features_batched(
+            coordinates, alf_list, atom_indices=[central_atom_idx]
+        )[0]
+        b_matrices = form_b_matrix_batched(coordinates, alf_list, central_atom_idx)
+        dE_df = convert_to_feature_forces(np.array(cart_forces), b_matrices)
+        nfeatures = features.shape[-1]
+
+        training_data = np.hstack(
+            [features, np.array(wfn_energies)[:, np.newaxis], dE_df]
+        )
+        input_headers = [f"f{i + 1}" for i in range(nfeatures)]
+        output_headers = ["wfn_energy"] + [f"-dEdf{i + 1}" for i in range(nfeatures)]
 
-            fname = atoms[central_atom_idx].name + str_to_append_to_fname
+        fname = atoms[central_atom_idx].name + str_to_append_to_fname
 
         df = pd.DataFrame(
             training_data,
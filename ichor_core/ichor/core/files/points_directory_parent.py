@@ -1,8 +1,11 @@
+from functools import partial
+from operator import attrgetter
 from pathlib import Path
-from typing import List, Union
+from typing import Callable, List, Optional, Union
 
 from ichor.core.files import PointsDirectory
 from ichor.core.files.directory import Directory
+from ichor.core.files.points_directory import _map_points, _process_point
 
 
 # note the inheritance order, because __iter__ will find the list __iter__ first...
@@ -56,33 +59,86 @@ class PointsDirectoryParent(list, Directory):
             this PointsDirectoryParent instance.
         """
 
-        all_data_dict = {}
-        for p in self:
-            all_data_dict[p.stem] = p.raw_data
+        return self.get_raw_data()
 
-        return all_data_dict
+    def _map_points(
+        self, func: Callable, ncores: int, executor, progress_callback
+    ) -> dict:
+        """Applies ``func`` to the points of all PointsDirectory instances at once (so that
+        the work is shared by the same worker processes) and groups the results by PointsDirectory."""
 
-    def processed_data(self, processing_func, *args, **kwargs) -> dict:
+        all_data = _map_points(
+            [point for points_dir in self for point in points_dir],
+            func,
+            ncores,
+            executor,
+            progress_callback,
+        )
+
+        return {
+            points_dir.stem: {point.stem: next(all_data) for point in points_dir}
+            for points_dir in self
+        }
+
+    def get_raw_data(
+        self,
+        ncores: int = 1,
+        executor=None,
+        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+    ) -> dict:
+        """Returns all raw data associated with the PointsDirectoryParent instance, see ``raw_data``.
+        The points can be read in parallel, in which case the results are still returned in the same
+        order as the points.
+
+        :param ncores: The number of processes used to read the points, defaults to 1
+        :param executor: An already existing ``concurrent.futures.Executor`` to use instead of starting a process pool
+        :param progress_callback: A callable which is called with the number of read points and the
+            total number of points every time a point is read
+        :returns: A dictionary of raw data.
+            Keys of the dictionary are the stem of each PointsDirectory contained inside
+            this PointsDirectoryParent instance.
+        """
+
+        return self._map_points(
+            attrgetter("raw_data"), ncores, executor, progress_callback
+        )
+
+    def processed_data(
+        self,
+        processing_func,
+        *args,
+        ncores: int = 1,
+        executor=None,
+        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+        **kwargs,
+    ) -> dict:
         """Processed data is some way, given any arguments and key words arguments,
         and returns a dictionary of the processed data, with keys
         Note that processing function can be any callable,
         i.e. closure, class, etc.
 
         .. note::
-            The processing function must act on one PointDirectory.
+            The processing function must act on one PointDirectory. If an executor is given,
+            the processing function must be picklable.
 
         :param processing_func: Callable which is going to process ONE PointDirectory
         :param args: Positional arguments to pass to processing func
+        :param ncores: The number of processes used to process the points, defaults to 1
+        :param executor: An already existing ``concurrent.futures.Executor`` to use instead of starting a process pool
+        :param progress_callback: A callable which is called with the number of processed points and the
+            total number of points every time a point is processed
+        :param kwargs: Key word arguments to pass to processing func
         :returns: A dictionary of processed data.
             Keys of the dictionary are the stem of each PointsDirectory contained inside
             this PointsDirectoryParent instance.
         """
 
-        all_data_dict = {}
-        for p in self:
-            all_data_dict[p.stem] = p.processed_data(processing_func, *args, **kwargs)
-
-        return all_data_dict
+        return self._map_points(
+            partial(_process_point, processing_func, args, kwargs),
+            ncores,
+            executor,
+            progress_callback,
+        )
 
     def write_to_json_database(
         self,
@@ -91,6 +147,7 @@ class PointsDirectoryParent(list, Directory):
         print_missing_data=True,
         indent: int = 2,
         separators=(",", ":"),
+        ncores: int = 1,
     ) -> List[Path]:
         """Makes a database from multiple PointsDirectory-like directories which
         are contained in this PointsDirectoryParent
@@ -101,6 +158,7 @@ class PointsDirectoryParent(list, Directory):
         :param print_missing_data: Whether or not to print missing data, defaults to True
         :param indent: json file indent, defaults to 2
         :param separators: json file separators, defaults to (",", ":")
+        :param ncores: The number of processes used to read the points, defaults to 1
         """
 
         if not root_name:
@@ -120,13 +178,19 @@ class PointsDirectoryParent(list, Directory):
                 print_missing_data=print_missing_data,
                 indent=indent,
                 separators=separators,
+                ncores=ncores,
             )
             root_paths.append(root_path)
 
         return root_paths
 
     def write_to_sqlite3_database(
-        self, db_path: Union[str, Path] = None, echo=False, print_missing_data=True
+        self,
+        db_path: Union[str, Path] = None,
+        echo=False,
+        print_missing_data=True,
+        ncores: int = 1,
+        bulk: bool = True,
     ) -> Path:
         """
         Write out important information from a PointsDirectory instance to an SQLite3 database.
@@ -136,6 +200,9 @@ class PointsDirectoryParent(list, Directory):
         :param echo: Whether to print out SQL queries from SQL Alchemy, defaults to False
         :param print_missing_data: Whether to print out any missing data from each PointDirectory contained
             in self, defaults to False
+        :param ncores: The number of processes used to read the points, defaults to 1
+        :param bulk: Whether to insert the points of each PointsDirectory in batches in a single transaction,
+            defaults to True
         :return: The path to the written SQL database
         """
 
@@ -152,5 +219,9 @@ class PointsDirectoryParent(list, Directory):
             # write all data to a single database by passing in the same name for every PointsDirectory
             # get the method and pass in the database path name
             pointsdir.write_to_sqlite3_database(
-                db_path, echo=echo, print_missing_data=print_missing_data
+                db_path,
+                echo=echo,
+                print_missing_data=print_missing_data,
+                ncores=ncores,
+                bulk=bulk,
             )
@@ -1,17 +1,108 @@
+import copyreg
+import mmap
 import re
 from pathlib import Path
-from typing import Callable, Dict, Iterable, List, Union
-from tqdm import tqdm
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
 import numpy as np
 import pandas as pd
-from ichor.core.atoms import Atom, Atoms, ListOfAtoms
+from ichor.core.atoms import Atoms, ListOfAtoms
 from ichor.core.atoms.alf import ALF
 from ichor.core.calculators import alf_features_to_coordinates
+from ichor.core.common import constants
 from ichor.core.common.constants import bohr2ang
 from ichor.core.common.int import count_digits
 from ichor.core.common.io import convert_to_path, mkdir
 from ichor.core.common.itertools import chunker
+from ichor.core.common.units import AtomicDistance
 from ichor.core.files.file import FileState, ReadFile, WriteFile
+from tqdm import tqdm
+
+
+def _frame_index_path(path: Path) -> Path:
+    """Returns the path of the file in which the frame index of a .xyz file is cached."""
+    return path.with_name(f"{path.name}.idx.npz")
+
+
+def _build_frame_index(path: Path) -> Tuple[np.ndarray, int]:
+    """Scans a .xyz file once and records the byte offset at which every timestep starts.
+    The coordinates themselves are not parsed.
+
+    :param path: Path to the .xyz file
+    :return: An array of ``n_timesteps + 1`` byte offsets (the last one is the end of the last timestep)
+        and the number of atoms in each timestep
+    :raises ValueError: If the timesteps do not all contain the same number of atoms
+    """
+
+    offsets = []
+    natoms = 0
+    position = 0
+
+    with open(path, "rb") as f:
+        for line in f:
+            # match the line containing the number of atoms in timestep
+            if re.match(rb"^\s*\d+", line):
+                timestep_natoms = int(line)
+                if offsets and timestep_natoms != natoms:
+                    raise ValueError(
+                        f"Timestep {len(offsets)} in {path} contains {timestep_natoms} atoms, "
+                        f"but previous timesteps contain {natoms} atoms."
+                    )
+                natoms = timestep_natoms
+                offsets.append(position)
+                position += len(line)
+                # skip the comment line and the coordinate lines
+                for _ in range(natoms + 1):
+                    position += len(next(f))
+            else:
+                position += len(line)
+
+    offsets.append(position)
+
+    return np.array(offsets, dtype=np.int64), natoms
+
+
+def read_frame_index(path: Union[str, Path]) -> Tuple[np.ndarray, int]:
+    """Returns the byte offsets of the timesteps in a .xyz file, as well as the number of atoms per timestep.
+    The index is built once and cached next to the .xyz file (as ``<name>.xyz.idx.npz``). The
+    cached index is rebuilt if the size or modification time of the .xyz file changes.
+
+    :param path: Path to the .xyz file
+    :return: An array of ``n_timesteps + 1`` byte offsets (the last one is the end of the last timestep)
+        and the number of atoms in each timestep
+    """
+
+    path = Path(path)
+    index_path = _frame_index_path(path)
+    stat = path.stat()
+
+    if index_path.exists():
+        try:
+            with np.load(index_path) as index:
+                if (
+                    int(index["size"]) == stat.st_size
+                    and int(index["mtime"]) == stat.st_mtime_ns
+                ):
+                    return index["offsets"], int(index["natoms"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    offsets, natoms = _build_frame_index(path)
+
+    # the index is only a cache, so do not fail if it cannot be written (e.g. read-only directory)
+    try:
+        with open(index_path, "wb") as f:
+            np.savez(
+                f,
+                offsets=offsets,
+                natoms=natoms,
+                size=stat.st_size,
+                mtime=stat.st_mtime_ns,
+            )
+    except OSError:
+        pass
+
+    return offsets, natoms
 
 
 class Trajectory(ReadFile, WriteFile, ListOfAtoms):
@@ -28,14 +119,51 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
         to keep the geometries in it (i.e. we want to overwrite the original trajectory),
         then set to False.If kept as True (the default), calling the write() method twice
         will cause a second set of the geometries to be added to the original trajectory file.
+    :param lazy: If True, the .xyz file is not parsed when the trajectory is read. Instead, an index of
+        the byte offsets of the timesteps is built (and cached next to the file, see `read_frame_index`)
+        and timesteps are only parsed from a memory map of the file when they are accessed.
+        ``len(trajectory)``, ``trajectory[i]``, slices and iteration then do not need to parse the whole file.
+        Accessing the ``coordinates`` of the whole trajectory, or modifying it, loads all timesteps into memory.
+        The memory map is closed by `close` (or when leaving a ``with`` block of the trajectory).
     """
 
     _filetype = ".xyz"
 
-    def __init__(self, path: Union[Path, str], *args, read_geometries=True, **kwargs):
-        ListOfAtoms.__init__(self, *args, **kwargs)
+    def __init__(
+        self,
+        path: Union[Path, str],
+        *args,
+        read_geometries=True,
+        lazy: bool = False,
+        **kwargs,
+    ):
+        ListOfAtoms.__init__(self)
+
+        # the coordinates of all timesteps are stored in one float64 block of shape
+        # (capacity, n_atoms, 3), of which only the first self._ntimesteps timesteps are used.
+        # The atom types and indices are shared by all timesteps.
+        # Atoms instances are only made when a timestep is accessed and are views into the block.
+        self._coordinates: Optional[np.ndarray] = None
+        self._ntimesteps = 0
+        # whether the block was allocated by this instance and can be grown/written past the used timesteps
+        # if it is a view into another array (e.g. a slice of another trajectory), it is copied when appending
+        self._owns_coordinates = False
+        self._types: Optional[List[str]] = None
+        self._indices: Optional[List[int]] = None
+        self._units: AtomicDistance = AtomicDistance.Angstroms
+
+        # in lazy mode, only the byte offsets of the timesteps in the file are kept
+        # and timesteps are parsed from a memory map of the file when they are accessed
+        self._lazy = lazy
+        self._frame_offsets: Optional[np.ndarray] = None
+        self._frame_natoms = 0
+        self._mmap: Optional[mmap.mmap] = None
+
         super(ReadFile, self).__init__(path)
 
+        for atoms in list(*args, **kwargs):
+            self.add(atoms)
+
         # needs to be here, because calling len for example will read the file again
         # in cases where atoms are added to trajectory, then trajectory is written
         # following calling len(trajectory) will result in the file being read
@@ -51,11 +179,200 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
         elif self.path.exists() and not read_geometries:
             self.state = FileState.Read
 
+    @classmethod
+    def from_coordinates(
+        cls,
+        path: Union[Path, str],
+        coordinates: np.ndarray,
+        atom_types: List[str],
+        atom_indices: Optional[List[int]] = None,
+        units: AtomicDistance = AtomicDistance.Angstroms,
+    ) -> "Trajectory":
+        """Makes a Trajectory instance from an array of coordinates without making
+        any `Atom` instances. The array is not copied, so the trajectory is a view into it.
+
+        :param path: The path associated with the trajectory instance. The file is not read.
+        :param coordinates: A ``n_timesteps`` x ``n_atoms`` x 3 array of coordinates
+        :param atom_types: A list of atom types (elements), in the same order as the atoms in the array
+        :param atom_indices: Optional list of atom indices (1-indexed) used for the atom names.
+            By default, atoms are numbered from 1.
+        :param units: The units of the coordinates, default Angstroms
+        """
+        trajectory = Trajectory(path, read_geometries=False)
+        trajectory.state = FileState.Read
+        trajectory._set_coordinates(
+            np.asarray(coordinates, dtype=float), atom_types, atom_indices, units
+        )
+        return trajectory
+
+    def _set_coordinates(
+        self,
+        coordinates: np.ndarray,
+        atom_types: List[str],
+        atom_indices: Optional[List[int]] = None,
+        units: AtomicDistance = AtomicDistance.Angstroms,
+    ):
+        """Replaces the contents of the trajectory with a view into the given coordinate block."""
+        self._coordinates = coordinates
+        self._ntimesteps = len(coordinates)
+        self._owns_coordinates = False
+        self._types = [ty.capitalize() for ty in atom_types]
+        self._indices = (
+            list(atom_indices)
+            if atom_indices is not None
+            else list(range(1, len(atom_types) + 1))
+        )
+        self._units = units
+
+    def _add_coordinates(
+        self,
+        coordinates: np.ndarray,
+        atom_types: List[str],
+        atom_indices: Optional[List[int]] = None,
+        units: AtomicDistance = AtomicDistance.Angstroms,
+    ):
+        """Appends a ``n_timesteps`` x ``n_atoms`` x 3 block of coordinates to the end of the trajectory.
+        The block is copied into the trajectory coordinate block, which grows geometrically.
+
+        :raises ValueError: If the atoms do not match the atoms of the timesteps already in the trajectory.
+        """
+
+        atom_types = [ty.capitalize() for ty in atom_types]
+
+        self._load_frames()
+
+        if self._types is None or self._ntimesteps == 0:
+            self._types = atom_types
+            self._indices = (
+                list(atom_indices)
+                if atom_indices is not None
+                else list(range(1, len(atom_types) + 1))
+            )
+            self._units = units
+            self._coordinates = np.empty((0, len(atom_types), 3))
+            self._ntimesteps = 0
+            self._owns_coordinates = True
+        elif atom_types != self._types:
+            raise ValueError(
+                f"Cannot add a geometry with atoms {atom_types} to a trajectory with atoms {self._types}. "
+                "All timesteps of a trajectory must contain the same atoms."
+            )
+
+        if units is not self._units:
+            coordinates = coordinates * (
+                constants.bohr2ang
+                if self._units is AtomicDistance.Angstroms
+                else constants.ang2bohr
+            )
+
+        ntimesteps = self._ntimesteps + len(coordinates)
+        if ntimesteps > len(self._coordinates) or not self._owns_coordinates:
+            block = np.empty(
+                (max(ntimesteps, 2 * self._ntimesteps, 16),)
+                + self._coordinates.shape[1:]
+            )
+            block[: self._ntimesteps] = self._coordinates[: self._ntimesteps]
+            self._coordinates = block
+            self._owns_coordinates = True
+
+        self._coordinates[self._ntimesteps : ntimesteps] = coordinates
+        self._ntimesteps = ntimesteps
+
+    def _timestep(self, i: int) -> Atoms:
+        """Returns the ``i`` th timestep as an `Atoms` instance whose coordinates are a view into the coordinate block.
+
+        :param i: The (non-negative) index of the timestep
+        """
+        if self._frame_offsets is not None:
+            return Atoms.from_coordinates(
+                self._types, self._read_frames([i])[0], self._indices, self._units
+            )
+        return Atoms.from_coordinates(
+            self._types, self._coordinates[i], self._indices, self._units
+        )
+
+    def _parse_frame(self, i: int) -> Tuple[List[str], np.ndarray]:
+        """Parses the ``i`` th timestep from the memory map of the file (lazy mode only).
+
+        :param i: The (non-negative) index of the timestep
+        :return: The atom types and the ``n_atoms`` x 3 coordinates of the timestep
+        """
+        if self._mmap is None:
+            with open(self.path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        start, end = self._frame_offsets[i], self._frame_offsets[i + 1]
+        # skip the line with the number of atoms and the comment line
+        lines = self._mmap[start:end].splitlines()[2 : 2 + self._frame_natoms]
+        # only keep x, y, z to work for extended xyz which contain extra information after the coordinates
+        rows = [line.split()[:4] for line in lines]
+
+        return [row[0].decode() for row in rows], np.array(
+            [row[1:] for row in rows], dtype=float
+        )
+
+    def _read_frames(self, indices: Iterable[int]) -> np.ndarray:
+        """Parses the given timesteps from the memory map of the file (lazy mode only).
+
+        :param indices: The (non-negative) indices of the timesteps
+        :return: A ``n_indices`` x ``n_atoms`` x 3 array of coordinates
+        """
+        indices = list(indices)
+        coordinates = np.empty((len(indices), len(self._types), 3))
+        for j, i in enumerate(indices):
+            coordinates[j] = self._parse_frame(i)[1]
+        return coordinates
+
+    def _load_frames(self):
+        """Parses all timesteps of a lazy trajectory into the coordinate block,
+        after which the trajectory behaves as a trajectory that is not lazy."""
+        if self._frame_offsets is None:
+            return
+        self._coordinates = self._read_frames(range(self._ntimesteps))
+        self._owns_coordinates = True
+        self._frame_offsets = None
+        self.close()
+
+    def close(self):
+        """Closes the memory map of the file of a lazy trajectory. It is opened again if
+        more timesteps are parsed from the file afterwards."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> "Trajectory":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _read_frame_index(self):
+        """Reads the byte offsets of the timesteps (lazy mode) and the atoms from the first timestep."""
+
+        offsets, natoms = read_frame_index(self.path)
+
+        if len(offsets) < 2:
+            return
+
+        self._frame_offsets = offsets
+        self._frame_natoms = natoms
+        self._ntimesteps = len(offsets) - 1
+
+        atom_types, _ = self._parse_frame(0)
+        self._types = [ty.capitalize() for ty in atom_types]
+        self._indices = list(range(1, len(atom_types) + 1))
+        self._units = AtomicDistance.Angstroms
+
     def _read_file(self):
 
+        if self._lazy:
+            self._read_frame_index()
+            return
+
+        atom_types = None
+        coordinates = []
+
         with open(self.path, "r") as f:
-            # make empty Atoms instance in which to store one timestep
-            atoms = Atoms()
             for line in f:
                 # match the line containing the number of atoms in timestep
                 if re.match(r"^\s*\d+", line):
@@ -71,39 +388,63 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
                     #     atoms.properties_error = ast.literal_eval(properties_error)
 
                     # the next line after the comment line is where coordinates begin
+                    timestep_types = []
                     for _ in range(natoms):
                         line = next(f)
                         # add *_ to work for extended xyz which contain extra information after x,y,z coordinates
                         atom_type, x, y, z, *_ = line.split()
-                        atoms.add(Atom(atom_type, float(x), float(y), float(z)))
-
-                    # add the Atoms instance to the Trajectory instance
-                    self.add(atoms)
-                    # make new Atoms instance where next timestep can be stored
-                    atoms = Atoms()
+                        timestep_types.append(atom_type)
+                        coordinates.append((float(x), float(y), float(z)))
+
+                    # all timesteps share the atom types of the first timestep
+                    if atom_types is None:
+                        atom_types = timestep_types
+                    elif timestep_types != atom_types:
+                        raise ValueError(
+                            f"Timestep {len(coordinates) // natoms - 1} in {self.path} contains atoms {timestep_types}, "
+                            f"but previous timesteps contain atoms {atom_types}."
+                        )
+
+        if atom_types is not None:
+            self._add_coordinates(
+                np.array(coordinates).reshape(-1, len(atom_types), 3), atom_types
+            )
 
     @property
     def types(self):
         """Returns the atom elements for atoms, assumes each timesteps has the same atoms.
         Removes duplicates."""
-        return self[0].types
+        return list(set(self.types_extended))
 
     @property
     def types_extended(self):
         """Returns the atom elements for atoms, assumes each timesteps has the same atoms.
         Removes duplicates."""
-        return self[0].types_extended
+        if self.state is not FileState.Read:
+            self.read()
+        return list(self._types)
 
     @property
     def atom_names(self):
         """Return the atom names from the first timestep. Assumes that all timesteps have the same
         number of atoms/atom names."""
-        return self[0].atom_names
+        if self.state is not FileState.Read:
+            self.read()
+        return [f"{ty}{idx}" for ty, idx in zip(self._types, self._indices)]
 
     @property
     def natoms(self):
         """Returns the number of atoms in the first timestep. Each timestep should have the same number of atoms."""
-        return len(self[0])
+        if self.state is not FileState.Read:
+            self.read()
+        return len(self._types)
+
+    @property
+    def units(self) -> AtomicDistance:
+        """Returns the distance units of the coordinates. All timesteps use the same units."""
+        if self.state is not FileState.Read:
+            self.read()
+        return self._units
 
     @property
     def coordinates(self) -> np.ndarray:
@@ -111,9 +452,16 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
         Returns:
             :type: `np.ndarray`
             the xyz coordinates of all atoms for all timesteps. Shape `n_timesteps` x `n_atoms` x `3`
+            This is a view into the coordinate block of the trajectory (no copy is made),
+            so copy the array before modifying it.
+            For a lazy trajectory, this loads all timesteps into memory.
         """
-
-        return np.array([timestep.coordinates for timestep in self])
+        if self.state is not FileState.Read:
+            self.read()
+        self._load_frames()
+        if self._coordinates is None:
+            return np.empty((0, 0, 3))
+        return self._coordinates[: self._ntimesteps]
 
     def connectivity(
         self, connectivity_calculator: Callable[..., np.ndarray]
@@ -147,12 +495,75 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
         }
 
     def add(self, atoms):
-        """Add a list of Atoms (corresponding to one timestep) to the end of the trajectory list"""
+        """Add a list of Atoms (corresponding to one timestep) to the end of the trajectory list.
+        The coordinates are copied into the coordinate block of the trajectory."""
         if isinstance(atoms, Atoms):
-            self.append(atoms)
+            self._add_coordinates(
+                atoms.coordinates[np.newaxis],
+                atoms.types_extended,
+                [atom.index for atom in atoms],
+                atoms[0].units if len(atoms) else self._units,
+            )
         else:
             raise ValueError(f"Cannot add an instance of {type(atoms)} to self.")
 
+    def append(self, atoms):
+        """Add a list of Atoms (corresponding to one timestep) to the end of the trajectory list"""
+        self.add(atoms)
+
+    def extend(self, timesteps: Iterable[Atoms]):
+        """Adds all timesteps from an iterable of `Atoms` instances (or another Trajectory) to the end of self."""
+        if isinstance(timesteps, Trajectory):
+            if len(timesteps):
+                self._add_coordinates(
+                    timesteps.coordinates,
+                    timesteps._types,
+                    timesteps._indices,
+                    timesteps._units,
+                )
+        else:
+            for atoms in timesteps:
+                self.add(atoms)
+
+    def iter_chunks(self, chunk_size: int = 1000) -> Iterator["Trajectory"]:
+        """Iterates over the trajectory in chunks of up to ``chunk_size`` timesteps, so that the
+        coordinates of the whole trajectory are never held in memory at once. Each chunk is a
+        `Trajectory` whose ``coordinates`` are a ``chunk_size`` x ``n_atoms`` x 3 array.
+
+        If the trajectory has not been read yet, the chunks are read from a lazy copy of the trajectory
+        (see the ``lazy`` argument), so only the timesteps of the current chunk are parsed from the file
+        and this trajectory stays unread. If the trajectory is already in memory, the chunks are views
+        into the coordinate block.
+
+        :param chunk_size: The maximum number of timesteps in a chunk
+        :raises ValueError: If the chunk size is not positive
+        """
+        if chunk_size < 1:
+            raise ValueError(f"Chunk size must be positive, not {chunk_size}.")
+
+        if self.state is FileState.Unread and self.path.exists() and not self._lazy:
+            return self._iter_lazy_chunks(chunk_size)
+        if self.state is not FileState.Read:
+            self.read()
+
+        return self._iter_chunks(chunk_size)
+
+    def _ntimesteps_without_reading(self) -> int:
+        """Returns the number of timesteps. If the trajectory has not been read yet, it is taken from the
+        index of the file (see `read_frame_index`), so the trajectory is not read."""
+        if self.state is FileState.Unread and self.path.exists() and not self._lazy:
+            offsets, _ = read_frame_index(self.path)
+            return max(len(offsets) - 1, 0)
+        return len(self)
+
+    def _iter_lazy_chunks(self, chunk_size: int) -> Iterator["Trajectory"]:
+        with Trajectory(self.path, lazy=True) as lazy_trajectory:
+            yield from lazy_trajectory.iter_chunks(chunk_size)
+
+    def _iter_chunks(self, chunk_size: int) -> Iterator["Trajectory"]:
+        for start in range(0, self._ntimesteps, chunk_size):
+            yield self[start : start + chunk_size]
+
     def rmsd(self, ref=None):
         if ref is None:
             ref = self[0]
@@ -256,43 +667,51 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
         inner_dir_name = f"{system_name}{chunk_idx}{default_points_dir_suffix}"
         mkdir(root_path / inner_dir_name, empty=True)
 
+        # the trajectory is read in chunks, so only split_size timesteps are in memory at a time
+        # a trajectory that has not been read yet stays unread, see `iter_chunks`
+        chunks = self.iter_chunks(split_size)
+        ntimesteps = self._ntimesteps_without_reading()
+
         # get only the every-th element of the trajectory
-        geometries_to_write = self[::every]
-        len_geoms_to_write = len(geometries_to_write)
+        len_geoms_to_write = len(range(0, ntimesteps, every))
 
         total_geom_counter = 0
         geom_counter = 0
 
         # loop over geometries and write to respective dir
-        for i, atoms_instance in enumerate(
-            tqdm(
-                geometries_to_write,
-                desc="Processing point dirs",
-            )
-        ):
-
-            if center:
-                atoms_instance.centre()
-
-            point_name = f"{system_name}{str(i).zfill(max(4, count_digits(len_geoms_to_write)))}.xyz"
-            path = Path(point_name)
-            path = root_path / inner_dir_name / path
-            xyz_file = XYZ(path, atoms_instance)
-            xyz_file.write()
-
-            geom_counter += 1
-            total_geom_counter += 1
-            # if we have reached the split size, then make a new inner directory
-            # do not make a new directory if last point is reached
-            if geom_counter == split_size:
+        with tqdm(total=len_geoms_to_write, desc="Processing point dirs") as progress:
+            for start, chunk in zip(range(0, ntimesteps, split_size), chunks):
+                for coordinates in chunk.coordinates[(-start) % every :: every]:
+
+                    # do not modify the coordinates of the trajectory
+                    if center:
+                        coordinates = coordinates - coordinates.mean(axis=0)
+                    atoms_instance = Atoms.from_coordinates(
+                        chunk._types, coordinates, chunk._indices, chunk._units
+                    )
 
-                # reset counter and update chunk
-                geom_counter = 0
-                chunk_idx += 1
-                # make a new PointsDirectory-like directory
-                inner_dir_name = f"{system_name}{chunk_idx}{default_points_dir_suffix}"
-                if total_geom_counter != len_geoms_to_write:
-                    mkdir(root_path / inner_dir_name, empty=True)
+                    point_name = f"{system_name}{str(total_geom_counter).zfill(max(4, count_digits(len_geoms_to_write)))}.xyz"
+                    path = Path(point_name)
+                    path = root_path / inner_dir_name / path
+                    xyz_file = XYZ(path, atoms_instance)
+                    xyz_file.write()
+                    progress.update()
+
+                    geom_counter += 1
+                    total_geom_counter += 1
+                    # if we have reached the split size, then make a new inner directory
+                    # do not make a new directory if last point is reached
+                    if geom_counter == split_size:
+
+                        # reset counter and update chunk
+                        geom_counter = 0
+                        chunk_idx += 1
+                        # make a new PointsDirectory-like directory
+                        inner_dir_name = (
+                            f"{system_name}{chunk_idx}{default_points_dir_suffix}"
+                        )
+                        if total_geom_counter != len_geoms_to_write:
+                            mkdir(root_path / inner_dir_name, empty=True)
 
         return root_path
 
@@ -393,27 +812,30 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
                 if total_geom_counter != len_geoms_to_write - 1:
                     mkdir(root_path / inner_dir_name, empty=True)
 
-    @convert_to_path
     def split_traj(
-        self, root_dir: Path = Path("split_trajectory"), split_size: int = 1000
+        self,
+        root_dir: Union[str, Path] = Path("split_trajectory"),
+        split_size: int = 1000,
     ):
         """Splits trajectory into sub-trajectories and writes then to a folder.
         Eg. a 10,000 original trajectory can be split into 10 sub-trajectories
         containing 1,000 geometries each (given a split size of 1,000).
 
         :param root_dir: The folder to write sub-trajectories to.
-            Must be a Path object and this directory will be created internally.
+            This directory will be created internally.
         :param split_size: The split size by which to split original trajectory.
         """
 
+        root_dir = Path(root_dir)
         mkdir(root_dir, empty=True)
-        chunks = [self[x : x + split_size] for x in range(0, len(self), split_size)]
         original_traj_stem = self.path.stem
 
-        for idx, chunk in enumerate(chunks):
+        # slices are views into the coordinate block, so no geometries are copied here
+        # for a lazy trajectory, only the timesteps of the current chunk are parsed
+        for idx, start in enumerate(range(0, len(self), split_size)):
             new_traj_name = f"{original_traj_stem}_split{idx}.xyz"
             new_traj = Trajectory(root_dir / new_traj_name)
-            new_traj.extend(chunk)
+            new_traj.extend(self[start : start + split_size])
             new_traj.write()
 
     @convert_to_path
@@ -490,19 +912,7 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
         xyz_array = alf_features_to_coordinates(features_array)
         xyz_array = bohr2ang * xyz_array
 
-        trajectory = Trajectory(trajectory_path)
-        trajectory.state = FileState.Read
-
-        for geometry in xyz_array:
-            # initialize empty Atoms instance
-            atoms = Atoms()
-            for ty, atom_coord in zip(atom_types, geometry):
-                # add Atom instances for every atom in the geometry to the Atoms instance
-                atoms.add(Atom(ty, atom_coord[0], atom_coord[1], atom_coord[2]))
-            # Add the filled Atoms instance to the Trajectory instance and repeat for next geometry
-            trajectory.add(atoms)
-
-        return trajectory
+        return Trajectory.from_coordinates(trajectory_path, xyz_array, atom_types)
 
     @classmethod
     def np_array_to_trajectory(
@@ -524,19 +934,7 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
         xyz_array = alf_features_to_coordinates(arr)
         xyz_array = bohr2ang * xyz_array
 
-        trajectory = Trajectory(trajectory_path)
-        trajectory.state = FileState.Read
-
-        for geometry in xyz_array:
-            # initialize empty Atoms instance
-            atoms = Atoms()
-            for ty, atom_coord in zip(atom_types, geometry):
-                # add Atom instances for every atom in the geometry to the Atoms instance
-                atoms.add(Atom(ty, atom_coord[0], atom_coord[1], atom_coord[2]))
-            # Add the filled Atoms instance to the Trajectory instance and repeat for next geometry
-            trajectory.add(atoms)
-
-        return trajectory
+        return Trajectory.from_coordinates(trajectory_path, xyz_array, atom_types)
 
     def change_atom_ordering(self, new_traj_name: Path, new_atom_ordering: List[int]):
         """Changes the atom ordering of the trajectory, given a list of how indices should be
@@ -551,16 +949,13 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
         if new_traj_name.suffix != ".xyz":
             new_traj_name = new_traj_name.with_suffix(".xyz")
 
-        new_traj = Trajectory(new_traj_name)
-        new_traj.state = FileState.Read
-
-        for old_atoms_instance in self:
-            new_atoms_instance = Atoms()
-            for new_atom_idx in new_atom_ordering:
-                new_atoms_instance.append(old_atoms_instance[new_atom_idx])
-            new_traj.append(new_atoms_instance)
-
-        return new_traj
+        return Trajectory.from_coordinates(
+            new_traj_name,
+            self.coordinates[:, new_atom_ordering],
+            [self._types[i] for i in new_atom_ordering],
+            [self._indices[i] for i in new_atom_ordering],
+            self._units,
+        )
 
     def split_packmol_trajectory(
         self, atoms_per_molecule: int, trajectory_name="packmol_traj_split.xyz"
@@ -586,32 +981,39 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
             (i.e. the molecule does not float around in space too much.)
         """
 
-        write_str = ""
+        write_str = []
 
-        for i, atoms_instance in enumerate(self):
-            if (i % every) == 0:
-                if center:
-                    atoms_instance.centre()
-                write_str += f"{len(atoms_instance)}\n"
-                write_str += f"i = {i}\n"
-                for atom in atoms_instance:
-                    write_str += (
-                        f"{atom.type} {atom.x:16.12f} {atom.y:16.12f} {atom.z:16.12f}\n"
-                    )
+        coordinates = self.coordinates
+        atom_types = self.types_extended
+
+        for i in range(0, len(self), every):
+            if center:
+                coordinates[i] -= coordinates[i].mean(axis=0)
+            write_str.append(f"{len(atom_types)}\n")
+            write_str.append(f"i = {i}\n")
+            for ty, (x, y, z) in zip(atom_types, coordinates[i]):
+                write_str.append(f"{ty} {x:16.12f} {y:16.12f} {z:16.12f}\n")
 
-        return write_str
+        return "".join(write_str)
 
     def __getitem__(self, item) -> Atoms:
         """Used to index a Trajectory instance by a str (eg. trajectory['C1']) or by integer (eg. trajectory[2]),
         remember that indeces in Python start at 0, so trajectory[2] is the 3rd timestep.
-        You can use something like (np.array([traj[i].features for i in range(2)]).shape) to features of a slice of
-        a trajectory as slice is not implemented in __getitem__"""
+        Slicing a trajectory (eg. trajectory[10:100]) returns a new Trajectory instance which is a
+        view into the same coordinates (no geometries are copied). For a lazy trajectory,
+        only the requested timesteps are parsed from the file."""
         if self.state is not FileState.Read:
             self.read()
 
         # if ListOfAtoms instance is indexed by an integer or np.int64, then index as a list
-        if isinstance(item, (int, np.int64)):
-            return list.__getitem__(self, item)
+        if isinstance(item, (int, np.integer)):
+            if item < 0:
+                item += self._ntimesteps
+            if not 0 <= item < self._ntimesteps:
+                raise IndexError(
+                    f"Timestep index out of range for trajectory with {self._ntimesteps} timesteps."
+                )
+            return self._timestep(item)
 
         # if ListOfAtoms is indexed by a string, such as an atom name (eg. C1, H2, O3, H4, etc.)
         elif isinstance(item, str):
@@ -619,42 +1021,81 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
 
             return AtomView(self, item)
 
-        # if PointsDirectory is indexed by a slice e.g. [:50], [20:40], etc.
-        elif isinstance(item, slice):
-
-            # setting read_geometries to false will not read the file again
-            new_traj = Trajectory(
-                self.path, list.__getitem__(self, item), read_geometries=False
+        # if Trajectory is indexed by a slice e.g. [:50], [20:40], etc. or a list, e.g. [0, 5, 10]
+        # slices are views into the coordinate block, while lists make a copy
+        elif isinstance(item, (slice, list, np.ndarray)):
+
+            if self._frame_offsets is not None:
+                coordinates = self._read_frames(np.arange(self._ntimesteps)[item])
+            elif isinstance(item, slice):
+                coordinates = self.coordinates[item]
+            else:
+                coordinates = self.coordinates[np.asarray(item)]
+
+            return Trajectory.from_coordinates(
+                self.path,
+                coordinates,
+                self._types or [],
+                self._indices,
+                self._units,
             )
 
-            return new_traj
-
-        # if PointsDirectory is indexed by a list, e.g. [0, 5, 10]
-        elif isinstance(item, (list, np.ndarray)):
-
-            new_traj = Trajectory(self.path, [list.__getitem__(self, i) for i in item])
-            # need to set the filestate to read otherwise the file will be read again
-            new_traj.state = FileState.Read
-
-            return Trajectory(self.path, [list.__getitem__(self, i) for i in item])
-
         # if indexing by something else that has not been programmed yet
         # should only be reached if not indexed by int, str, or slice
         raise TypeError(
             f"Cannot index type '{self.__class__.__name__}' with type '{type(item)}"
         )
 
+    def __setitem__(self, i: int, atoms: Atoms):
+        """Replaces the coordinates of timestep ``i`` with the coordinates of the given `Atoms` instance."""
+        if self.state is not FileState.Read:
+            self.read()
+        if not isinstance(atoms, Atoms):
+            raise ValueError(f"Cannot add an instance of {type(atoms)} to self.")
+        if atoms.types_extended != self._types:
+            raise ValueError(
+                f"Cannot add a geometry with atoms {atoms.types_extended} to a trajectory with atoms {self._types}."
+            )
+        self.coordinates[i] = atoms.coordinates
+
+    def __delitem__(self, item: Union[int, slice, List[int]]):
+        """Deletes one or more timesteps from the trajectory."""
+        if self.state is not FileState.Read:
+            self.read()
+        indices = np.arange(self._ntimesteps)[item]
+        self._coordinates = np.delete(self.coordinates, indices, axis=0)
+        self._ntimesteps = len(self._coordinates)
+        self._owns_coordinates = True
+
     def __iter__(self) -> Iterable[Atoms]:
         """Used to iterate over timesteps (Atoms instances) in places such as for loops"""
         if self.state is not FileState.Read:
             self.read()
-        return super().__iter__()
+        for i in range(self._ntimesteps):
+            yield self._timestep(i)
+
+    def __reversed__(self) -> Iterable[Atoms]:
+        if self.state is not FileState.Read:
+            self.read()
+        for i in reversed(range(self._ntimesteps)):
+            yield self._timestep(i)
 
     def __len__(self):
         """Returns the number of timesteps in the Trajectory instance"""
         if self.state is not FileState.Read:
             self.read()
-        return super().__len__()
+        return self._ntimesteps
+
+    def __reduce__(self):
+        """Timesteps are stored in the coordinate block and not in the underlying list, so only the
+        attributes are pickled. The memory map of a lazy trajectory cannot be pickled, it is opened
+        again when needed."""
+        state = self.__dict__.copy()
+        state["_mmap"] = None
+        return copyreg.__newobj__, (self.__class__,), state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
 
     def __repr__(self) -> str:
         """Make a repr otherwise doing print(trajectory_instance) will print
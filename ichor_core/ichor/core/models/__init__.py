@@ -1,6 +1,20 @@
+from ichor.core.models.ase_calculator import FFLUXCalculator
+from ichor.core.models.inference_server import FFLUXInferenceService
 from ichor.core.models.model import Model
 from ichor.core.models.model_with_gradient import ModelWithGradients
 from ichor.core.models.model_with_gradient_rbf_only import ModelWithGradientsRBF
 from ichor.core.models.models import Models
+from ichor.core.models.precision import Precision
+from ichor.core.models.predictor import ModelGroup, ModelsPredictor
 
-__all__ = ["Model", "Models", "ModelWithGradients", "ModelWithGradientsRBF"]
+__all__ = [
+    "FFLUXCalculator",
+    "FFLUXInferenceService",
+    "Model",
+    "Models",
+    "ModelWithGradients",
+    "ModelWithGradientsRBF",
+    "ModelGroup",
+    "ModelsPredictor",
+    "Precision",
+]
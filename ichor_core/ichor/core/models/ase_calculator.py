@@ -0,0 +1,77 @@
+from pathlib import Path
+from typing import List, Optional, Union
+
+from ase.calculators.calculator import all_changes, Calculator
+from ase.units import Bohr, Hartree
+from ichor.core.atoms import ALF
+from ichor.core.common.str import get_characters
+from ichor.core.common.units import AtomicDistance
+from ichor.core.models.inference_server import FFLUXInferenceService
+from ichor.core.models.models import Models
+
+
+class FFLUXCalculator(Calculator):
+    """An ASE calculator which predicts the energy and forces of a geometry with the iqa models of every atom
+    (the total energy and forces that FFLUX predicts), so molecular dynamics and geometry optimisations can be
+    run with the models directly from ASE, e.g. to test models before running DL_POLY.
+
+    The models are loaded (and every per-model constant is computed) once, see `FFLUXInferenceService`.
+    Every step computes the features and their derivatives once, and the energy and forces are predicted
+    together, so asking ASE for the forces after the energy (or the other way around) of the same geometry
+    uses the cached results.
+
+    .. note::
+        The ASE atoms must be in the same order as `atom_names`. Energies are returned in eV and
+        forces in eV/Angstrom, as ASE expects.
+
+    :param models: A Models instance, the path of a directory of models, or an `FFLUXInferenceService`
+    :param atom_names: The names of the atoms, in the order of the ASE atoms. By default, the atoms are
+        ordered by the origin of the ALF of their models.
+    :param system_alf: The 0-indexed ALF of every atom. By default, the ALF in the models is used.
+    :param kwargs: Passed to `ase.calculators.calculator.Calculator`
+    """
+
+    implemented_properties = ["energy", "free_energy", "forces"]
+
+    def __init__(
+        self,
+        models: Union[Models, FFLUXInferenceService, str, Path],
+        atom_names: Optional[List[str]] = None,
+        system_alf: Optional[List[ALF]] = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        if isinstance(models, FFLUXInferenceService):
+            self.service = models
+        else:
+            self.service = FFLUXInferenceService(
+                models, atom_names=atom_names, system_alf=system_alf
+            )
+        self.symbols = [
+            get_characters(atom_name) for atom_name in self.service.atom_names
+        ]
+
+    def calculate(self, atoms=None, properties=("energy",), system_changes=all_changes):
+        """Predicts the energy and the forces of the geometry, which ASE calls when
+        the geometry has changed since the last prediction.
+
+        :raises ValueError: If the atoms do not match the atoms of the models
+        """
+        super().calculate(atoms, properties, system_changes)
+
+        if "numbers" in system_changes:
+            symbols = self.atoms.get_chemical_symbols()
+            if symbols != self.symbols:
+                raise ValueError(
+                    f"The atoms {symbols} do not match the atoms of the models {self.service.atom_names}."
+                )
+
+        energy, forces = self.service.predict(
+            self.atoms.positions, units=AtomicDistance.Angstroms
+        )
+        energy *= Hartree
+        self.results = {
+            "energy": energy,
+            "free_energy": energy,
+            "forces": forces * (Hartree / Bohr),
+        }
@@ -1,131 +1,147 @@
+import weakref
+from typing import Tuple
+
 import numpy as np
+from ichor.core.common.np import batched_slices
 from ichor.core.models.fflux_derivative_helper_functions import *
 
 
-def fflux_predict_value(model_inst, test_x_features):
-
-    x_train_array = model_inst.x
-    weights = model_inst.weights.flatten()
-
-    kernels = model_inst.kernel
-    rbf_thetas = kernels.k1._thetas
-    periodic_thetas = kernels.k2._thetas
-
-    n_train = x_train_array.shape[0]
-    n_features = x_train_array.shape[1]
-
-    # make sure thetas are ordered correctly (cannot concat rbf thetas
-    # to periodic thetas because it leads to wrong indexing)
-    # first five thetas are for rbf dimensions (because non cyclic),
-    # then 6th (5th index) is a phi dimension, then two rbf, then periodic and so on
-    thetas = []
-    rbf_idx = 0
-    periodic_idx = 0
-    for i in range(n_features):
-        if ((i + 1) % 3) == 0 and i != 2:
-            thetas.append(periodic_thetas[periodic_idx])
-            periodic_idx += 1
-        else:
-            thetas.append(rbf_thetas[rbf_idx])
-            rbf_idx += 1
-    thetas = np.array(thetas)
-
-    Q_est = 0.0
-    dQ_df = np.zeros(n_features)
-    dQ_df_temp = np.zeros(n_features)
-
-    for j in range(n_train):
-
-        expo = 0.0
-
-        for h in range(n_features):
-
-            fdiff = x_train_array[j, h] - test_x_features[h]
-
-            # if phi dimension, then use periodic kernel
-            if ((h + 1) % 3) == 0 and h != 2:
-
-                # 4.0 because we use 1/(2*l^2), for every kernel.
-                # For the periodic kernel, there is no 2 in the definition
-                # gpytorch only divided by lambda (which is equal to l^2)
-                expo = expo + 4.0 * thetas[h] * np.sin((fdiff / 2.0)) ** 2
-                dQ_df_temp[h] = (
-                    weights[j]
-                    * (-4.0)
-                    * thetas[h]
-                    * sign_j(fdiff)
-                    * np.sin(abs(fdiff) / 2.0)
-                    * np.cos(abs(fdiff) / 2.0)
-                )
-
-            # if not phi dimension, use rbf kernel
-            else:
-
-                expo = expo + thetas[h] * fdiff * fdiff
+# kernel parameters of every model used by the fflux prediction functions, see `fflux_kernel_parameters`
+_fflux_kernel_parameters_cache = weakref.WeakKeyDictionary()
 
-                dQ_df_temp[h] = (
-                    weights[j] * sign_j(fdiff) * -2.0 * thetas[h] * abs(fdiff)
-                )
+# maximum number of elements of the (test points x training points x features) temporary arrays,
+# test points are predicted in chunks so that the arrays stay smaller than this
+_max_fflux_chunk_elements = 2**22
 
-        expo = np.exp(-expo)
 
-        Q_est = Q_est + weights[j] * expo
+def fflux_periodic_features(n_features: int) -> np.ndarray:
+    """Returns a boolean mask of the features which use the periodic kernel. The first five features
+    are non-cyclic (rbf), then the 6th (5th index) is a phi feature, then two rbf features, then a phi
+    feature and so on.
 
-        dQ_df_temp = expo * dQ_df_temp
+    :param n_features: The number of features
+    """
+    h = np.arange(n_features)
+    return ((h + 1) % 3 == 0) & (h != 2)
 
-        dQ_df = dQ_df + dQ_df_temp
 
-    Q_est = Q_est + model_inst.mean.value(np.zeros((1, 1)))
-    Q_est = Q_est.item()
+def fflux_kernel_parameters(
+    model_inst, rbf_only: bool = False
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the thetas of a model ordered by feature, as well as the mask of the features which
+    use the periodic kernel. The thetas are only reordered once per model (kernel) and reused for
+    every subsequent prediction, unless the hyperparameters of the kernel change.
 
-    return Q_est, dQ_df
+    :param model_inst: A Model instance, with an rbf * periodic kernel (or an rbf kernel if rbf_only is True)
+    :param rbf_only: Whether the rbf kernel is used for all features
+    :return: A tuple of the n_features thetas and the n_features boolean mask of periodic features
+    """
 
+    kernel = model_inst.kernel
+    n_features = model_inst.x.shape[-1]
+    params = np.ravel(kernel.params).tobytes()
+
+    cached = _fflux_kernel_parameters_cache.get(kernel)
+    if cached is not None and cached[0] == (n_features, rbf_only, params):
+        return cached[1]
+
+    if rbf_only:
+        thetas = np.array(kernel._thetas, dtype=float)
+        periodic = np.zeros(n_features, dtype=bool)
+    else:
+        # make sure thetas are ordered correctly (cannot concat rbf thetas
+        # to periodic thetas because it leads to wrong indexing)
+        periodic = fflux_periodic_features(n_features)
+        thetas = np.empty(n_features)
+        thetas[~periodic] = kernel.k1._thetas
+        thetas[periodic] = kernel.k2._thetas
+
+    if thetas.shape != (n_features,):
+        raise ValueError(
+            f"The kernel of the model has {thetas.size} thetas but there are {n_features} features."
+        )
 
-def fflux_predict_value_rbf_only(model_inst, test_x_features):
+    _fflux_kernel_parameters_cache[kernel] = (
+        (n_features, rbf_only, params),
+        (thetas, periodic),
+    )
+    return thetas, periodic
 
-    x_train_array = model_inst.x
-    weights = model_inst.weights.flatten()
 
-    kernels = model_inst.kernel
-    rbf_thetas = kernels._thetas
+def fflux_predict_values(
+    model_inst, test_x_features: np.ndarray, rbf_only: bool = False
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Predicts the values of a model, as well as the derivatives of the predictions with respect to
+    the features, for one or many test points.
 
-    n_train = x_train_array.shape[0]
-    n_features = x_train_array.shape[1]
+    :param model_inst: A Model instance, with an rbf * periodic kernel (or an rbf kernel if rbf_only is True)
+    :param test_x_features: An n_features array, or an n_test x n_features array of test points
+    :param rbf_only: Whether the rbf kernel is used for all features
+    :return: A tuple of the predictions (n_test array, or a float for a single test point) and
+        the derivatives of the predictions with respect to the features (n_test x n_features array,
+        or an n_features array for a single test point)
+    """
 
-    # make sure thetas are ordered correctly
-    # (cannot concat rbf thetas to periodic thetas because it leads to wrong indexing)
-    # first five thetas are for rbf dimensions (because non cyclic),
-    # then 6th (5th index) is a phi dimension, then two rbf, then periodic and so on
-    thetas = np.array(rbf_thetas)
+    thetas, periodic = fflux_kernel_parameters(model_inst, rbf_only=rbf_only)
+    rbf = ~periodic
 
-    Q_est = 0.0
-    dQ_df = np.zeros(n_features)
-    dQ_df_temp = np.zeros(n_features)
+    x_train_array = np.asarray(model_inst.x)
+    weights = np.ravel(model_inst.weights)
+    n_train, n_features = x_train_array.shape
 
-    for j in range(n_train):
+    x_test = np.asarray(test_x_features, dtype=float)
+    single_point = x_test.ndim == 1
+    x_test = np.atleast_2d(x_test)
 
-        expo = 0.0
+    Q_est = np.empty(len(x_test))
+    dQ_df = np.empty(x_test.shape)
 
-        for h in range(n_features):
+    chunk_size = max(1, _max_fflux_chunk_elements // (n_train * n_features))
+    for rows in batched_slices(len(x_test), chunk_size):
+        fdiff = x_train_array[np.newaxis, ...] - x_test[rows, np.newaxis, :]
+        rbf_diff = fdiff[..., rbf]
+        half_periodic_diff = fdiff[..., periodic] / 2.0
 
-            fdiff = x_train_array[j, h] - test_x_features[h]
-            # use rbf for all dimensions
-            expo = expo + thetas[h] * fdiff * fdiff
+        # 4.0 because we use 1/(2*l^2), for every kernel.
+        # For the periodic kernel, there is no 2 in the definition
+        # gpytorch only divided by lambda (which is equal to l^2)
+        expo = np.dot(rbf_diff * rbf_diff, thetas[rbf]) + np.dot(
+            4.0 * np.sin(half_periodic_diff) ** 2, thetas[periodic]
+        )
+        # weight * covariance of every training point, n_chunk x n_train
+        weighted_k = weights * np.exp(-expo)
 
-            dQ_df_temp[h] = weights[j] * sign_j(fdiff) * -2.0 * thetas[h] * abs(fdiff)
+        Q_est[rows] = weighted_k.sum(axis=-1)
+        dQ_df[rows, rbf] = (
+            2.0 * thetas[rbf] * np.einsum("tj,tjh->th", weighted_k, rbf_diff)
+        )
+        dQ_df[rows, periodic] = (
+            4.0
+            * thetas[periodic]
+            * np.einsum(
+                "tj,tjh->th",
+                weighted_k,
+                np.sin(half_periodic_diff) * np.cos(half_periodic_diff),
+            )
+        )
 
-        expo = np.exp(-expo)
+    Q_est += model_inst.mean.value(x_test)
 
-        Q_est = Q_est + weights[j] * expo
+    if single_point:
+        return Q_est.item(), dQ_df[0]
+    return Q_est, dQ_df
 
-        dQ_df_temp = expo * dQ_df_temp
 
-        dQ_df = dQ_df + dQ_df_temp
+def fflux_predict_value(model_inst, test_x_features):
+    """Predicts the value of a model with an rbf * periodic kernel, as well as the derivatives of the
+    prediction with respect to the features. See `fflux_predict_values`."""
+    return fflux_predict_values(model_inst, test_x_features)
 
-    Q_est = Q_est + model_inst.mean.value(np.zeros((1, 1)))
-    Q_est = Q_est.item()
 
-    return Q_est, dQ_df
+def fflux_predict_value_rbf_only(model_inst, test_x_features):
+    """Predicts the value of a model with an rbf kernel, as well as the derivatives of the
+    prediction with respect to the features. See `fflux_predict_values`."""
+    return fflux_predict_values(model_inst, test_x_features, rbf_only=True)
 
 
 def fflux_derivs(iatm_idx, jatm_idx, atoms_instance, system_alf, model_inst):
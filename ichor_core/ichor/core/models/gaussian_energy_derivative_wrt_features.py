@@ -2,7 +2,8 @@ from typing import List
 
 import numpy as np
 from ichor.core.atoms import ALF, Atoms
-from ichor.core.models.calculate_fflux_derivatives import fflux_derivs_da_df_matrix
+from ichor.core.calculators import calculate_alf_features_derivatives_batched
+from ichor.core.common.units import AtomicDistance
 
 # TODO: Add method that converts back to Cartesian coordinates.
 # Note that the rows will be A_0, A_x, A_xy, non_alf atoms. So need to revert back to original rows
@@ -77,64 +78,40 @@ def form_b_matrix(
     """
 
     # make sure the coords are in Bohr because forces are calculated per Bohr
-    atoms = atoms.to_bohr()
-    natoms = len(atoms)
-
-    # loop over all atoms in the system and calculate n_features x 3 submatrix
-    # matrix contains derivatives of Global cartesian coordinates for one atom wrt all features.
-
-    if natoms == 2:
-        b_matrix = np.zeros((1, 6))
-        for j in range(2):
-            da_df = fflux_derivs_da_df_matrix(
-                central_atom_idx, system_alf[central_atom_idx][j], atoms, system_alf
-            )
-            # fill in the three columns corresponding to df_i / dx_j for the specific atom
-            # this way ensures that the original ordering of the atoms is preserved in the B matrix
-            b_matrix[
-                :,
-                [
-                    3 * system_alf[central_atom_idx][j],
-                    3 * system_alf[central_atom_idx][j] + 1,
-                    3 * system_alf[central_atom_idx][j] + 2,
-                ],
-            ] = da_df
-
-    elif natoms > 2:
-        # first three atoms that are central, x-axis, xy-plane
-        nfeatures = 3 * natoms - 6
-        b_matrix = np.zeros((nfeatures, 3 * natoms))
-        for j in range(3):
-            da_df = fflux_derivs_da_df_matrix(
-                central_atom_idx, system_alf[central_atom_idx][j], atoms, system_alf
-            )
-            # fill in the three columns corresponding to df_i / dx_j for the specific atom
-            # this way ensures that the original ordering of the atoms is preserved in the B matrix
-            b_matrix[
-                :,
-                [
-                    3 * system_alf[central_atom_idx][j],
-                    3 * system_alf[central_atom_idx][j] + 1,
-                    3 * system_alf[central_atom_idx][j] + 2,
-                ],
-            ] = da_df
-
-        non_local_atoms = [
-            t for t in range(natoms) if t not in system_alf[central_atom_idx]
-        ]
-
-        for non_local_atm in non_local_atoms:
-            da_df = fflux_derivs_da_df_matrix(
-                central_atom_idx, non_local_atm, atoms, system_alf
-            )
-            # fill in the three columns corresponding to df_i / dx_j for the specific atom
-            # this way ensures that the original ordering of the atoms is preserved in the B matrix
-            b_matrix[
-                :, [3 * non_local_atm, 3 * non_local_atm + 1, 3 * non_local_atm + 2]
-            ] = da_df
+    return form_b_matrix_batched(
+        atoms.to_bohr().coordinates,
+        system_alf,
+        central_atom_idx,
+        units=AtomicDistance.Bohr,
+    )
+
+
+def form_b_matrix_batched(
+    coordinates: np.ndarray,
+    system_alf: List["ALF"],  # noqa F821
+    central_atom_idx: int,
+    units: AtomicDistance = AtomicDistance.Angstroms,
+) -> np.ndarray:
+    """Returns the Wilson B matrices of one central atom for many geometries at once, see `form_b_matrix`.
+    All derivatives are calculated from intermediates (bond vectors, C matrices) which are shared
+    between the features, see `calculate_alf_features_derivatives_batched`.
+
+    :param coordinates: A ``n_timesteps`` x ``n_atoms`` x 3 array of Cartesian coordinates,
+        or a single ``n_atoms`` x 3 geometry
+    :param system_alf: The system alf as a list of `ALF` instances, 0-indexed
+    :param central_atom_idx: The index of the atom to be used as the central atom
+    :param units: The units of the coordinates, Angstroms by default. The B matrices are always per Bohr.
+    :return: A ``n_timesteps`` x ``n_features`` x ``3 n_atoms`` array
+        (or ``n_features`` x ``3 n_atoms`` if a single geometry was given)
+    """
 
-    # return B matrix
-    return b_matrix
+    return calculate_alf_features_derivatives_batched(
+        coordinates,
+        system_alf,
+        distance_unit=AtomicDistance.Bohr,
+        units=units,
+        atom_indices=[central_atom_idx],
+    )[0]
 
 
 def b_matrix_true_finite_differences(atoms, system_alf, central_atom_idx=0, h=1e-6):
@@ -192,17 +169,17 @@ def b_matrix_true_finite_differences(atoms, system_alf, central_atom_idx=0, h=1e
 
 
 def form_g_matrix(b_matrix: np.ndarray):
-    """Forms the G matrix as in Gaussian.
+    """Forms the G matrix as in Gaussian. A stack of B matrices gives a stack of G matrices.
 
     .. note::
         G is a symmetric square (BuB^T, where u is the identity matrix here))
     """
 
-    return b_matrix @ b_matrix.T
+    return b_matrix @ np.swapaxes(b_matrix, -1, -2)
 
 
 def form_g_inverse(g_matrix: np.ndarray):
-    """Inverts the G matrix, gives generalized inverse"""
+    """Inverts the G matrix (or a stack of G matrices), gives generalized inverse"""
 
     # using the generalized inverse seems to mess up results
     # there is some sort of roundoff error
@@ -214,7 +191,7 @@ def form_g_inverse(g_matrix: np.ndarray):
 
     # can use pseudo inverse instead of finding G and G inverse
     U, S, V = np.linalg.svd(g_matrix)
-    g_inv = V.T @ np.diag(S**-1) @ U.T
+    g_inv = np.swapaxes(V, -1, -2) @ (S[..., np.newaxis] ** -1 * np.swapaxes(U, -1, -2))
 
     return g_inv
 
@@ -227,12 +204,12 @@ def convert_to_feature_forces(global_cartesian_forces: np.ndarray, b_matrix):
 
     dE/df are the values that need to be used when adding derivatives to GP model.
 
-    :param global_cartesian_forces: A 2D numpy array of shape (N_atoms, 3) containing the global Cartesian forces.
+    :param global_cartesian_forces: A 2D numpy array of shape (N_atoms, 3) containing the global Cartesian forces,
+        or a n_timesteps x N_atoms x 3 array of forces of many geometries.
     :param b_matrix: Wilson B matrix to be used to calculate, as well as dE/df. Should be of shape
-        (3N-6) x 3N where N is the number of atoms.
-    :param system_alf: A list of ALF instances containing the ALF of every atom.
-    :param central_atom_idx: The index of the atom (0-indexed) which was the central ALF atom for which
-        features (and feature derivatives) were calculated.
+        (3N-6) x 3N where N is the number of atoms, or n_timesteps x (3N-6) x 3N for many geometries
+        (see `form_b_matrix_batched`).
+    :return: An array of n_features feature forces, or n_timesteps x n_features for many geometries
 
     .. note::
         The ordering of the forces should match up with the ordering of the B matrix.
@@ -253,7 +230,11 @@ def convert_to_feature_forces(global_cartesian_forces: np.ndarray, b_matrix):
     # note that if the forces are passed in, will get the
     # feature forces, which are the -ve of the gradient
     # the gradient is what is used for models
-    feature_forces = g_inv @ b_matrix @ global_cartesian_forces.flatten()
+    global_cartesian_forces = np.asarray(global_cartesian_forces, dtype=float)
+    flat_forces = global_cartesian_forces.reshape(
+        global_cartesian_forces.shape[:-2] + (-1, 1)
+    )
+    feature_forces = (g_inv @ b_matrix @ flat_forces)[..., 0]
 
     return feature_forces
 
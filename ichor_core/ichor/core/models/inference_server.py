@@ -0,0 +1,427 @@
+import io
+import socket
+import socketserver
+import struct
+import threading
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+import numpy as np
+from ichor.core.atoms import ALF
+from ichor.core.calculators import get_system_alf_array
+from ichor.core.calculators.features.alf_features_calculator import (
+    _alf_features_and_derivatives,
+)
+from ichor.core.common.constants import ang2bohr
+from ichor.core.common.np import batched_slices
+from ichor.core.common.units import AtomicDistance
+from ichor.core.models.calculate_fflux_derivatives import fflux_kernel_parameters
+from ichor.core.models.kernels import RBF
+from ichor.core.models.model import Model
+from ichor.core.models.models import Models
+from ichor.core.models.predict_forces_for_all_atoms import (
+    _energy_gradient,
+    _max_forces_chunk_elements,
+    get_iqa_models,
+)
+
+# maximum number of elements of the test points x training points covariance matrices
+_max_covariance_chunk_elements = 2**22
+
+# maximum size of one array sent over a socket, larger messages are rejected before they are read
+_max_message_bytes = 2**30
+
+_ok = 0
+_error = 1
+
+
+class FFLUXModelConstants:
+    r"""The constants of one iqa model which are needed to predict the energy and its derivatives with respect
+    to the features, computed once when the model is loaded.
+
+    For the rbf * periodic kernels used by FFLUX, the exponent of the kernel is a squared distance between
+    mapped features (the rbf features scaled by :math:`\sqrt{\theta}`, and :math:`\sqrt{\theta} \cos x` and
+    :math:`\sqrt{\theta} \sin x` for the periodic features), so the covariance of all test points is computed with
+    one matrix product with the mapped training inputs. The derivatives of the energy
+
+    .. math::
+
+        \frac{dQ}{df_h} = 2 \theta_h \sum_j w_j k_j (x_{j,h} - f_h) \quad \text{(rbf)}, \qquad
+        \frac{dQ}{df_h} = 2 \theta_h \sum_j w_j k_j \sin(x_{j,h} - f_h) \quad \text{(periodic)}
+
+    are also matrix products, with the (sines and cosines of the) training inputs, so no
+    test points x training points x features arrays are needed.
+
+    :param model: An iqa model with an rbf * periodic (or rbf) kernel
+    """
+
+    def __init__(self, model: Model):
+        self.model = model
+        thetas, periodic = fflux_kernel_parameters(
+            model, rbf_only=isinstance(model.kernel, RBF)
+        )
+        self.rbf = ~periodic
+        self.periodic = periodic
+        self.thetas_rbf = thetas[self.rbf]
+        self.thetas_periodic = thetas[self.periodic]
+        self.weights = np.ravel(model.weights).astype(float)
+        self.mean = model.mean
+
+        x_train = np.asarray(model.x, dtype=float)
+        # the rbf features are centered, which reduces the cancellation in the squared distances
+        self.center = x_train[:, self.rbf].mean(axis=0)
+        mapped = self._mapped_features(x_train)
+        self.mapped_train = np.hstack(
+            [
+                mapped,
+                np.ones((len(mapped), 1)),
+                np.einsum("ij,ij->i", mapped, mapped)[:, np.newaxis],
+            ]
+        )
+        periodic_train = x_train[:, self.periodic]
+        self.gradient_train = np.hstack(
+            [
+                x_train[:, self.rbf] - self.center,
+                np.sin(periodic_train),
+                np.cos(periodic_train),
+            ]
+        )
+
+    @property
+    def ntrain(self) -> int:
+        return len(self.weights)
+
+    def _mapped_features(self, x: np.ndarray) -> np.ndarray:
+        periodic_x = x[:, self.periodic]
+        sqrt_thetas_periodic = np.sqrt(self.thetas_periodic)
+        return np.hstack(
+            [
+                np.sqrt(self.thetas_rbf) * (x[:, self.rbf] - self.center),
+                sqrt_thetas_periodic * np.cos(periodic_x),
+                sqrt_thetas_periodic * np.sin(periodic_x),
+            ]
+        )
+
+    def predict(self, x_test: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Predicts the energies and the derivatives of the energies with respect to the features.
+
+        :param x_test: An n_test x n_features array of features
+        :return: A tuple of the n_test energies and the n_test x n_features derivatives
+        """
+        mapped = self._mapped_features(x_test)
+        # 2 a.b - |a|^2 - |b|^2, the negative exponent of the kernel
+        mapped_test = np.hstack(
+            [
+                2.0 * mapped,
+                -np.einsum("ij,ij->i", mapped, mapped)[:, np.newaxis],
+                -np.ones((len(mapped), 1)),
+            ]
+        )
+        weighted_k = np.dot(mapped_test, self.mapped_train.T)
+        np.minimum(weighted_k, 0.0, out=weighted_k)
+        np.exp(weighted_k, out=weighted_k)
+        weighted_k *= self.weights
+
+        sum_weighted_k = weighted_k.sum(axis=-1)
+        sums = np.dot(weighted_k, self.gradient_train)
+
+        nrbf = len(self.thetas_rbf)
+        nperiodic = len(self.thetas_periodic)
+        periodic_x = x_test[:, self.periodic]
+
+        dQ_df = np.empty(x_test.shape)
+        dQ_df[:, self.rbf] = (
+            2.0
+            * self.thetas_rbf
+            * (
+                sums[:, :nrbf]
+                - (x_test[:, self.rbf] - self.center) * sum_weighted_k[:, np.newaxis]
+            )
+        )
+        dQ_df[:, self.periodic] = (
+            2.0
+            * self.thetas_periodic
+            * (
+                np.cos(periodic_x) * sums[:, nrbf : nrbf + nperiodic]
+                - np.sin(periodic_x) * sums[:, nrbf + nperiodic :]
+            )
+        )
+
+        return sum_weighted_k + self.mean.value(x_test), dQ_df
+
+
+class FFLUXInferenceService:
+    """A long-lived predictor of the total (iqa) energy and the Cartesian forces of geometries, as predicted
+    by FFLUX, for driving molecular dynamics from Python (e.g. with ASE). Everything that does not depend on
+    the geometry (the ordering of the thetas, the weights, the mapped training inputs, see
+    `FFLUXModelConstants`) is computed once when the service is made, so every prediction only computes
+    the features (and their derivatives) and a few matrix products per atom.
+
+    Requests are batched by passing many geometries at once. The service can also be served over a Unix
+    socket to other processes, see `serve` and `FFLUXInferenceClient`.
+
+    :param models: A Models instance (or the path of a directory of models), an iqa model is needed
+        for every atom
+    :param atom_names: The names of the atoms, in the order of the coordinates. By default, the atoms are
+        ordered by the origin of the ALF of their models.
+    :param system_alf: The 0-indexed ALF of every atom. By default, the ALF in the models is used.
+    :param precompute_variance: Whether to also factorize the covariance matrix of every model when the
+        service is made, so that `variance` does not have to do this on the first request
+    """
+
+    def __init__(
+        self,
+        models: Union[Models, str, Path],
+        atom_names: Optional[List[str]] = None,
+        system_alf: Optional[List[ALF]] = None,
+        precompute_variance: bool = False,
+    ):
+        if not isinstance(models, Models):
+            models = Models(models)
+
+        if atom_names is None:
+            iqa_models = sorted(
+                (model for model in models if model.prop == "iqa"),
+                key=lambda model: model.alf[0],
+            )
+            atom_names = [model.atom_name for model in iqa_models]
+        else:
+            iqa_models = get_iqa_models(models, atom_names)
+
+        self.atom_names = list(atom_names)
+        self.models = iqa_models
+        self.system_alf = system_alf or [model.alf for model in iqa_models]
+        self.alf_array = get_system_alf_array(self.system_alf, self.natoms)
+        self.constants = [FFLUXModelConstants(model) for model in iqa_models]
+
+        if precompute_variance:
+            for model in self.models:
+                model._cholesky()
+
+        self.chunk_size = max(
+            1,
+            min(
+                _max_forces_chunk_elements // (36 * self.natoms**2),
+                _max_covariance_chunk_elements
+                // max(constants.ntrain for constants in self.constants),
+            ),
+        )
+
+    @property
+    def natoms(self) -> int:
+        return len(self.atom_names)
+
+    def _bohr_coordinates(
+        self, coordinates: np.ndarray, units: AtomicDistance
+    ) -> Tuple[np.ndarray, bool]:
+        coordinates = np.asarray(coordinates, dtype=float)
+        single_geometry = coordinates.ndim == 2
+        if single_geometry:
+            coordinates = coordinates[np.newaxis]
+        if coordinates.ndim != 3 or coordinates.shape[1:] != (self.natoms, 3):
+            raise ValueError(
+                f"Expected coordinates of shape (n_geometries, {self.natoms}, 3), got {coordinates.shape}."
+            )
+        if units is AtomicDistance.Angstroms:
+            coordinates = coordinates * ang2bohr
+        return coordinates, single_geometry
+
+    def predict(
+        self, coordinates: np.ndarray, units: AtomicDistance = AtomicDistance.Bohr
+    ) -> Tuple[Union[float, np.ndarray], np.ndarray]:
+        """Predicts the total energies and the Cartesian forces of one or many geometries.
+
+        :param coordinates: An ``n_geometries`` x ``n_atoms`` x 3 array of coordinates, or a single
+            ``n_atoms`` x 3 geometry, with the atoms in the order of `atom_names`
+        :param units: The units of the coordinates, Bohr by default
+        :raises ValueError: If the coordinates do not have the right shape
+        :return: A tuple of the ``n_geometries`` energies (in Hartree) and the ``n_geometries`` x ``n_atoms`` x 3
+            forces (in Hartree per Bohr), or a float and an ``n_atoms`` x 3 array for a single geometry
+        """
+        coordinates, single_geometry = self._bohr_coordinates(coordinates, units)
+        ngeometries = len(coordinates)
+
+        energies = np.zeros(ngeometries)
+        forces = np.empty((ngeometries, self.natoms, 3))
+
+        for rows in batched_slices(ngeometries, self.chunk_size):
+            (
+                features,
+                alf_derivatives,
+                remaining_derivatives,
+                remaining,
+            ) = _alf_features_and_derivatives(coordinates[rows], self.alf_array)
+
+            dQ_df = np.empty(features.shape)
+            for atm_idx, constants in enumerate(self.constants):
+                Q, dQ_df[:, atm_idx] = constants.predict(features[:, atm_idx])
+                energies[rows] += Q
+
+            forces[rows] = -_energy_gradient(
+                dQ_df,
+                self.alf_array,
+                alf_derivatives,
+                remaining_derivatives,
+                remaining,
+            )
+
+        if single_geometry:
+            return energies.item(), forces[0]
+        return energies, forces
+
+    def variance(
+        self, coordinates: np.ndarray, units: AtomicDistance = AtomicDistance.Bohr
+    ) -> np.ndarray:
+        """Returns the variance of the iqa model of every atom for one or many geometries.
+
+        :param coordinates: An ``n_geometries`` x ``n_atoms`` x 3 array of coordinates, or a single geometry
+        :param units: The units of the coordinates, Bohr by default
+        :return: An ``n_geometries`` x ``n_atoms`` array (or an ``n_atoms`` array for a single geometry)
+        """
+        coordinates, single_geometry = self._bohr_coordinates(coordinates, units)
+        features = _alf_features_and_derivatives(coordinates, self.alf_array)[0]
+        variances = np.stack(
+            [
+                model.variance(features[:, atm_idx], chunk_size=self.chunk_size)
+                for atm_idx, model in enumerate(self.models)
+            ],
+            axis=-1,
+        )
+        return variances[0] if single_geometry else variances
+
+    def serve(self, socket_path: Union[str, Path]) -> "FFLUXInferenceServer":
+        """Starts serving predictions on a Unix socket in a background thread, see `FFLUXInferenceClient`.
+        Call ``shutdown`` and ``server_close`` on the returned server to stop it.
+
+        :param socket_path: The path of the socket file to make
+        """
+        server = FFLUXInferenceServer(self, socket_path)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(atoms={self.atom_names})"
+
+
+def _write_array(f: BinaryIO, array: np.ndarray):
+    buffer = io.BytesIO()
+    np.save(buffer, np.asarray(array, dtype=float), allow_pickle=False)
+    f.write(struct.pack("!Q", buffer.tell()))
+    f.write(buffer.getbuffer())
+
+
+def _read_exactly(f: BinaryIO, nbytes: int) -> bytes:
+    data = f.read(nbytes)
+    if len(data) != nbytes:
+        raise EOFError("Connection closed before the whole message was received.")
+    return data
+
+
+def _read_array(f: BinaryIO) -> np.ndarray:
+    (nbytes,) = struct.unpack("!Q", _read_exactly(f, 8))
+    if nbytes > _max_message_bytes:
+        raise ValueError(
+            f"Message of {nbytes} bytes is larger than the maximum of {_max_message_bytes} bytes."
+        )
+    return np.load(io.BytesIO(_read_exactly(f, nbytes)), allow_pickle=False)
+
+
+class _FFLUXRequestHandler(socketserver.StreamRequestHandler):
+    """Handles the requests of one client connection. Every request is an array of coordinates (in Bohr),
+    every response is a status byte followed by the energies and forces arrays, or an error message."""
+
+    def handle(self):
+        while True:
+            try:
+                coordinates = _read_array(self.rfile)
+            except EOFError:
+                return
+            except ValueError as e:
+                # the rest of the message cannot be skipped reliably, so the connection is closed
+                self._write_error(e)
+                return
+
+            try:
+                energies, forces = self.server.service.predict(coordinates)
+            except Exception as e:
+                self._write_error(e)
+            else:
+                self.wfile.write(struct.pack("!B", _ok))
+                _write_array(self.wfile, energies)
+                _write_array(self.wfile, forces)
+            self.wfile.flush()
+
+    def _write_error(self, error: Exception):
+        message = f"{type(error).__name__}: {error}".encode()
+        self.wfile.write(struct.pack("!BQ", _error, len(message)))
+        self.wfile.write(message)
+        self.wfile.flush()
+
+
+class FFLUXInferenceServer(socketserver.ThreadingUnixStreamServer):
+    """Serves the predictions of an `FFLUXInferenceService` on a Unix socket, so that the models only need
+    to be loaded once for many (short-lived) clients, see `FFLUXInferenceClient`. Every connection is
+    handled in its own thread, so clients which stay connected do not block other clients.
+
+    :param service: The service which makes the predictions
+    :param socket_path: The path of the socket file to make, which is removed when the server is closed
+    """
+
+    daemon_threads = True
+
+    def __init__(self, service: FFLUXInferenceService, socket_path: Union[str, Path]):
+        self.service = service
+        self.socket_path = Path(socket_path)
+        super().__init__(str(self.socket_path), _FFLUXRequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        self.socket_path.unlink(missing_ok=True)
+
+
+class FFLUXInferenceClient:
+    """Requests predictions from an `FFLUXInferenceServer` running on a Unix socket.
+
+    :param socket_path: The path of the socket the server is listening on
+    :param timeout: The number of seconds to wait for a response, by default there is no limit
+    """
+
+    def __init__(self, socket_path: Union[str, Path], timeout: Optional[float] = None):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(str(socket_path))
+        self._file = self._socket.makefile("rwb")
+
+    def predict(
+        self, coordinates: np.ndarray, units: AtomicDistance = AtomicDistance.Bohr
+    ) -> Tuple[Union[float, np.ndarray], np.ndarray]:
+        """Predicts the total energies and Cartesian forces of one or many geometries,
+        see `FFLUXInferenceService.predict`.
+
+        :raises RuntimeError: If the server could not make the predictions
+        """
+        coordinates = np.asarray(coordinates, dtype=float)
+        if units is AtomicDistance.Angstroms:
+            coordinates = coordinates * ang2bohr
+
+        _write_array(self._file, coordinates)
+        self._file.flush()
+
+        (status,) = struct.unpack("!B", _read_exactly(self._file, 1))
+        if status != _ok:
+            (nbytes,) = struct.unpack("!Q", _read_exactly(self._file, 8))
+            raise RuntimeError(_read_exactly(self._file, nbytes).decode())
+
+        energies = _read_array(self._file)
+        forces = _read_array(self._file)
+        return (energies.item() if energies.ndim == 0 else energies), forces
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,127 @@
+from typing import List, Optional
+
+import numpy as np
+from ichor.core.models.kernels.kernel import Kernel, KernelProd
+from ichor.core.models.kernels.periodic_kernel import PeriodicKernel
+from ichor.core.models.kernels.rbf import RBF
+from ichor.core.models.kernels.rbf_cyclic import RBFCyclic
+
+stationary_kernels = (RBF, RBFCyclic, PeriodicKernel)
+
+
+class FusedStationaryProduct:
+    r"""Evaluates a product of stationary kernels (`RBF`, `RBFCyclic` and `PeriodicKernel`) in a single pass,
+    instead of computing (and allocating) a covariance matrix for every kernel and multiplying them.
+
+    The product of the kernels is the exponential of a sum over the features
+
+    .. math::
+
+        k(x_1, x_2) = \exp \left( -\sum_d \theta_d g_d(x_{1,d} - x_{2,d}) \right)
+
+    where :math:`g_d(\Delta) = \Delta^2` for the rbf features and :math:`g_d(\Delta) = 4 \sin^2(\pi \Delta / p_d)`
+    for the periodic features. Both can be written as a squared distance between mapped features (the periodic
+    features are mapped to :math:`\sqrt{\theta_d} (\cos(2 \pi x_d / p_d), \sin(2 \pi x_d / p_d))`), so the exponent
+    of all the rbf and periodic features is computed with one matrix product, which is the only n x m matrix
+    that is allocated. The cyclic (phi) features of `RBFCyclic` kernels need the wrapped differences, so these
+    are accumulated into the exponent in place, one feature at a time.
+
+    .. note::
+        The hyperparameters are read from the kernels every time the covariance is computed, so changing the
+        hyperparameters of the kernels is picked up.
+
+    :param kernels: The kernels to multiply
+    """
+
+    def __init__(self, kernels: List[Kernel]):
+        self.kernels = kernels
+
+    def _mapped_features(self, x: np.ndarray) -> np.ndarray:
+        """Returns the features mapped so that the squared distance between the mapped features is the exponent
+        of the rbf and periodic features"""
+        mapped = []
+        for kernel in self.kernels:
+            thetas = np.asarray(kernel._thetas, dtype=float)
+            x_active = x[:, kernel.active_dims]
+            if isinstance(kernel, PeriodicKernel):
+                angles = (2.0 * np.pi) * x_active / kernel._period_length
+                mapped += [np.sqrt(thetas) * np.cos(angles)]
+                mapped += [np.sqrt(thetas) * np.sin(angles)]
+            else:
+                scale = np.sqrt(thetas)
+                if isinstance(kernel, RBFCyclic):
+                    scale[kernel.mask] = 0.0
+                mapped += [scale * x_active]
+        return np.concatenate(mapped, axis=1)
+
+    def k(self, x1: np.ndarray, x2: np.ndarray, dtype=np.float64) -> np.ndarray:
+        """Calculates the covariance matrix of the product of the kernels from two sets of points
+
+        :param x1: np.ndarray of shape n x ndimensions
+        :param x2: np.ndarray of shape m x ndimensions
+        :param dtype: The floating point type the covariance matrix is computed in, e.g. ``np.float32`` to
+            halve the memory used (see `Precision`)
+        :return: The covariance matrix of shape (n, m)
+        """
+
+        mapped1 = self._mapped_features(x1)
+        mapped2 = self._mapped_features(x2)
+        if np.dtype(dtype) != np.float64:
+            # distances do not change when all points are shifted, so center the mapped features
+            # before rounding them, to reduce the cancellation in the squared distances
+            center = mapped1.mean(axis=0)
+            mapped1 -= center
+            mapped2 -= center
+
+        # the negative squared distance between the mapped features, 2 a.b - |a|^2 - |b|^2
+        # (see `Distance.squared_euclidean_distance`), is computed with a single matrix product
+        # by appending the squared norms to the mapped features
+        ones1 = np.ones((len(mapped1), 1))
+        ones2 = np.ones((len(mapped2), 1))
+        norms1 = np.einsum("ij,ij->i", mapped1, mapped1)[:, np.newaxis]
+        norms2 = np.einsum("ij,ij->i", mapped2, mapped2)[:, np.newaxis]
+        exponent = np.dot(
+            np.hstack([2.0 * mapped1, -norms1, -ones1]).astype(dtype),
+            np.hstack([mapped2, ones2, norms2]).astype(dtype).T,
+        )
+        # small positive values may occur when using quadratic expansion, so clip to 0 if that happens
+        np.minimum(exponent, 0.0, out=exponent)
+
+        buffer = None
+        for kernel in self.kernels:
+            if not isinstance(kernel, RBFCyclic):
+                continue
+            if buffer is None:
+                buffer = np.empty_like(exponent)
+            for dim, theta in zip(
+                kernel.active_dims[kernel.mask], kernel._thetas[kernel.mask]
+            ):
+                np.subtract(x2[np.newaxis, :, dim], x1[:, np.newaxis, dim], out=buffer)
+                buffer += np.pi
+                np.mod(buffer, 2 * np.pi, out=buffer)
+                buffer -= np.pi
+                np.square(buffer, out=buffer)
+                buffer *= theta
+                exponent -= buffer
+
+        np.exp(exponent, out=exponent)
+        return exponent
+
+
+def product_factors(kernel: Kernel) -> List[Kernel]:
+    """Returns the kernels which are multiplied together in a (nested) product of kernels"""
+    if isinstance(kernel, KernelProd):
+        return product_factors(kernel.k1) + product_factors(kernel.k2)
+    return [kernel]
+
+
+def fused_evaluator(kernel: Kernel) -> Optional[FusedStationaryProduct]:
+    """Returns a `FusedStationaryProduct` which evaluates the kernel, if the kernel is a stationary kernel
+    or a product of stationary kernels. Otherwise, returns None."""
+    fused = getattr(kernel, "_fused", None)
+    if fused is not None:
+        return fused
+    factors = product_factors(kernel)
+    if all(type(factor) in stationary_kernels for factor in factors):
+        return FusedStationaryProduct(factors)
+    return None
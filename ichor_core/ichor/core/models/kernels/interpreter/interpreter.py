@@ -10,5 +10,6 @@ class KernelInterpreter:
         self.global_state = global_state
 
     def interpret(self) -> Kernel:
+        """Returns the kernel described by the composition, compiled for fast evaluation (see `Kernel.compile`)"""
         tree = self.parser.parse()
-        return tree.visit(self.global_state)
+        return tree.visit(self.global_state).compile()
@@ -68,6 +68,10 @@ class Kernel(ABC):
     def __mul__(self, other):
         return KernelProd(self, other)
 
+    def compile(self) -> "Kernel":
+        """Prepares the kernel for fast evaluation, see `KernelProd.compile`. Returns the kernel itself."""
+        return self
+
     @abstractmethod
     def write_str(self):
         pass
@@ -77,15 +81,22 @@ class CompositeKernel(Kernel, ABC):
     def __init__(self, k1: Kernel, k2: Kernel):
         self.k1 = k1
         self.k2 = k2
+        # fused evaluation of the kernel, see `KernelProd.compile`
+        self._fused = None
 
     @property
     def params(self) -> np.ndarray:
-        return np.concatenate(self.k1.params, self.k2.params)
+        return np.concatenate([np.ravel(self.k1.params), np.ravel(self.k2.params)])
 
     @property
     def nkernel(self) -> int:
         return self.k1.nkernel + self.k2.nkernel
 
+    def compile(self) -> "Kernel":
+        self.k1.compile()
+        self.k2.compile()
+        return self
+
     def write_str(self) -> str:
         """Used to write out kernel info to model file"""
         str_to_write = ""
@@ -120,17 +131,30 @@ class KernelSum(CompositeKernel):
 class KernelProd(CompositeKernel):
     """Kernel multiplication implementation"""
 
-    @property
-    def params(self):
-        return np.concatenate(self.k1.params, self.k2.params)
+    def compile(self) -> "Kernel":
+        """If all the multiplied kernels are stationary (`RBF`, `RBFCyclic` or `PeriodicKernel`), the product is
+        evaluated in a single pass over the features instead of multiplying the covariance matrices of the
+        separate kernels, see `FusedStationaryProduct`. Otherwise, the multiplied kernels are compiled."""
+        from ichor.core.models.kernels.fused import fused_evaluator
+
+        self._fused = fused_evaluator(self)
+        if self._fused is None:
+            super().compile()
+        return self
 
     def k(self, xi, xj):
+        if self._fused is not None:
+            return self._fused.k(xi, xj)
         return self.k1.k(xi, xj) * self.k2.k(xi, xj)
 
     def r(self, xi, x):
+        if self._fused is not None:
+            return self._fused.k(xi, x)
         return self.k1.r(xi, x) * self.k2.r(xi, x)
 
     def R(self, x):
+        if self._fused is not None:
+            return self._fused.k(x, x)
         return self.k1.R(x) * self.k2.R(x)
 
     @property
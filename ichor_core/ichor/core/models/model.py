@@ -1,9 +1,13 @@
+import os
+import weakref
+import zipfile
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 
 import numpy as np
 from ichor.core.atoms import ALF
 from ichor.core.common.io import mkdir
+from ichor.core.common.np import apply_in_batches, array_hash, load_npz
 from ichor.core.common.str import get_digits
 from ichor.core.common.types import Version
 from ichor.core.files.file import FileContents, ReadFile, WriteFile
@@ -22,6 +26,32 @@ from ichor.core.models.mean import (
     QuadraticMean,
     ZeroMean,
 )
+from ichor.core.models.precision import Precision, reduced_precision_predict
+from scipy.linalg import cho_factor, cho_solve, solve_triangular
+
+
+# training inputs shared by the binary copies of models (see `Model.write_binary`), so that
+# models with the same training inputs also share the same (memory mapped) array after reading
+_shared_training_inputs = weakref.WeakValueDictionary()
+
+
+def _load_shared_training_inputs(path: Path) -> np.ndarray:
+    key = str(path.resolve())
+    x = _shared_training_inputs.get(key)
+    if x is None:
+        x = np.load(path, mmap_mode="r")
+        _shared_training_inputs[key] = x
+    return x
+
+
+def _training_inputs_file(binary_path: Path) -> Optional[str]:
+    """Returns the name of the ``.x_<hash>.npy`` file used by a binary copy of a model,
+    or None if the binary copy does not exist or cannot be read."""
+    try:
+        with np.load(binary_path) as arrays:
+            return str(arrays["x_file"])
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
 
 
 def _get_default_input_units(nfeats: int) -> List[str]:
@@ -72,9 +102,17 @@ class Model(ReadFile, WriteFile):
         program: str = FileContents,
         program_version: Version = FileContents,
         notes: Dict[str, str] = FileContents,
+        use_binary: bool = True,
+        write_binary_on_read: bool = False,
     ):
         super(ReadFile, self).__init__(path)
 
+        # whether to read (and write) the binary copy of the model, see `write_binary`
+        self.use_binary = use_binary
+        # whether to write the binary copy when the model file is read and the binary copy is missing
+        # or out of date, which is off by default so reading models never writes to model directories
+        self.write_binary_on_read = write_binary_on_read
+
         self.program = program
         self.system_name = system_name
         self.atom_name = atom_name
@@ -95,205 +133,276 @@ class Model(ReadFile, WriteFile):
         self.program_version = program_version
         self.notes = notes
 
+        # cholesky factorization of the covariance matrix, see `_cholesky`
+        self._cholesky_cache = None
+
+    @property
+    def binary_path(self) -> Path:
+        """The path of the binary copy of the model, which is the model file path with an added .npz suffix"""
+        return self._binary_path(self.path)
+
+    @staticmethod
+    def _binary_path(path: Path) -> Path:
+        return path.with_name(path.name + ".npz")
+
     def _read_file(self, up_to: Optional[str] = None):
         """Read in a FEREBUS output file which contains the optimized
-        hyperparameters, mean function, and other information that is needed to make predictions."""
+        hyperparameters, mean function, and other information that is needed to make predictions.
+
+        If an up to date binary copy of the model exists (see `write_binary`), it is read instead
+        of the text file. If ``write_binary_on_read`` is set, the binary copy is written after reading
+        the text file, so that the model is read faster next time."""
+
+        if self.use_binary and self._read_binary():
+            return
+
+        with open(self.path, "r") as f:
+            self._read_lines(f, up_to)
+
+        if self.use_binary and self.write_binary_on_read and up_to is None:
+            # the binary copy is only used to read the model faster, so do not fail if
+            # it cannot be written (e.g. in a read-only directory)
+            try:
+                self.write_binary()
+            except OSError:
+                pass
+
+    def _read_binary(self) -> bool:
+        """Reads the model from its binary copy. The training data and weights are memory mapped,
+        so they are only read from disk when they are used.
+
+        :return: Whether the model was read, which is False if the binary copy does not exist or if it is
+            out of date (the model file has changed since the binary copy was written)
+        """
+        binary_path = self.binary_path
+        if not binary_path.exists():
+            return False
+
+        try:
+            arrays = load_npz(binary_path)
+            stat = self.path.stat()
+            if tuple(arrays["source"]) != (stat.st_size, stat.st_mtime_ns):
+                return False
+            header = str(arrays["header"])
+            if "x_file" in arrays:
+                x = _load_shared_training_inputs(
+                    binary_path.parent / str(arrays["x_file"])
+                )
+            else:
+                x = arrays["x"]
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return False
+
+        self._read_lines(iter(header.splitlines(keepends=True)))
+        if self.x is FileContents:
+            self.x = x
+        if self.y is FileContents:
+            self.y = arrays["y"]
+        if self.weights is FileContents:
+            self.weights = arrays["weights"]
+
+        return True
+
+    def _read_lines(self, f, up_to: Optional[str] = None):
+        """Parses the lines of a model file.
+
+        :param f: An iterator over the lines of a model file, such as an open file
+        :param up_to: Stop reading after the first line which contains this string
+        """
         kernel_composition = ""
         kernel_dict = {}
         notes = {}
 
         stop_reading = False
 
-        with open(self.path, "r") as f:
-            for line in f:
-                if stop_reading:
-                    break
+        for line in f:
+            if stop_reading:
+                break
+
+            if up_to is not None and up_to in line:
+                stop_reading = True
+
+            if "<TODO>" in line:
+                continue
+
+            if "program" in line:
+                self.program = self.program or line.split()[-1]
+                continue
+
+            if "version" in line:
+                self.program_version = self.program_version or Version(line.split()[-1])
+                continue
+
+            if "jitter" in line or "nugget" in line or "noise" in line:
+                # noise to add to the diagonal to help with numerical stability.
+                # Typically on the scale 1e-6 to 1e-10
+                self.jitter = self.jitter or float(line.split()[-1])
+                continue
+
+            if "likelihood" in line:
+                self.likelihood = self.likelihood or float(line.split()[-1])
+                continue
+
+            if "#" in line and "=" in line:
+                line = line.lstrip("#")
+                key, val = line.split("=")
+                notes[key.strip()] = val.strip()
+                continue
+
+            if line.startswith("#"):
+                line = line.lstrip("#")
+                notes[line.strip()] = None
+
+            if "name" in line:  # system name e.g. WATER
+                self.system_name = self.system_name or line.split()[1]
+                continue
+
+            if line.startswith("atom"):  # atom for which a GP model was made eg. O1
+                self.atom_name = self.atom_name or line.split()[1].capitalize()
+                continue
+
+            if (
+                "property" in line
+            ):  # property (such as iqa or particular multipole moment) for which a GP model was made
+                self.prop = self.prop or line.split()[1]
+                continue
+
+            if "ALF" in line:
+                tmp_line_split = line.split()[1:]
+                if tmp_line_split[-1] == "None":
+                    self.alf = self.alf or ALF(
+                        *[int(a) - 1 for a in line.split()[1:-1]], None
+                    )
+                else:
+                    self.alf = self.alf or ALF(*[int(a) - 1 for a in line.split()[1:]])
+                continue
+
+            if "number_of_atoms" in line:
+                self.natoms = self.natoms or int(line.split()[1])
+                continue
+
+            if "number_of_features" in line:  # number of inputs to the GP
+                self.nfeats = self.nfeats or int(line.split()[1])
+                continue
+
+            if (
+                "number_of_training_points" in line
+            ):  # number of training points to make the GP model
+                self.ntrain = self.ntrain or int(line.split()[1])
+                continue
+
+            # GP mean (mu) section
+            if "[mean]" in line:
+                mean_type = next(f).split()[-1]  # type
+                if mean_type == "constant":
+                    mean = ConstantMean(float(next(f).split()[1]))
+                elif mean_type == "zero":
+                    mean = ZeroMean()
+                elif mean_type in ["linear", "quadratic"]:
+                    beta = np.array([float(b) for b in next(f).split()[1:]])
+                    xmin = np.array([float(x) for x in next(f).split()[1:]])
+                    ymin = float(next(f).split()[-1])
+                    if mean_type == "linear":
+                        mean = LinearMean(beta, xmin, ymin)
+                    elif mean_type == "quadratic":
+                        mean = QuadraticMean(beta, xmin, ymin)
+
+                self.mean = self.mean or mean
+                continue
+
+            if "composition" in line:
+                # which kernels were used to make the GP model.
+                # Different kernels can be specified for different input dimensions
+                kernel_composition = line.split()[-1]
+                continue
+
+            # GP kernel section
+            if "[kernel." in line:
+                kernel_name = line.split(".")[-1].rstrip().rstrip("]")
+                line = next(f)
+                kernel_type = line.split()[-1].strip()
+                ndims = int(next(f).split()[-1])  # number of dimensions
+                line = next(f)
+                if "TODO" not in line:
+                    active_dims = np.array([int(ad) - 1 for ad in line.split()[1:]])
+                else:
+                    active_dims = np.arange(ndims)
+
+                if kernel_type == "rbf":
+                    thetas = np.array([float(hp) for hp in next(f).split()[1:]])
+                    kernel_dict[kernel_name] = RBF(
+                        kernel_name, thetas, active_dims=active_dims
+                    )
+                elif kernel_type in [
+                    "rbf-cyclic",
+                    "rbf-cylic",
+                ]:  # Due to typo in FEREBUS 7.0
+                    thetas = np.array([float(hp) for hp in next(f).split()[1:]])
+                    kernel_dict[kernel_name] = RBFCyclic(
+                        kernel_name, thetas, active_dims=active_dims
+                    )
+                elif kernel_type == "constant":
+                    value = float(next(f).split()[-1])
+                    kernel_dict[kernel_name] = ConstantKernel(
+                        kernel_name, value, active_dims=active_dims
+                    )
+                elif kernel_type == "periodic":
+                    thetas = np.array([float(hp) for hp in next(f).split()[1:]])
+                    kernel_dict[kernel_name] = PeriodicKernel(
+                        kernel_name,
+                        thetas,
+                        np.full(thetas.shape, 2 * np.pi),
+                        active_dims=active_dims,
+                    )
 
-                if up_to is not None and up_to in line:
-                    stop_reading = True
+                continue
 
-                if "<TODO>" in line:
-                    continue
+            if "units.x" in line:
+                self.input_units = self.input_units or line.split()[1:]
 
-                if "program" in line:
-                    self.program = self.program or line.split()[-1]
-                    continue
+            if "units.y" in line:
+                self.output_unit = self.output_unit or line.split()[-1]
 
-                if "version" in line:
-                    self.program_version = self.program_version or Version(
-                        line.split()[-1]
-                    )
-                    continue
-
-                if "jitter" in line or "nugget" in line or "noise" in line:
-                    # noise to add to the diagonal to help with numerical stability.
-                    # Typically on the scale 1e-6 to 1e-10
-                    self.jitter = self.jitter or float(line.split()[-1])
-                    continue
-
-                if "likelihood" in line:
-                    self.likelihood = self.likelihood or float(line.split()[-1])
-                    continue
-
-                if "#" in line and "=" in line:
-                    line = line.lstrip("#")
-                    key, val = line.split("=")
-                    notes[key.strip()] = val.strip()
-                    continue
-
-                if line.startswith("#"):
-                    line = line.lstrip("#")
-                    notes[line.strip()] = None
-
-                if "name" in line:  # system name e.g. WATER
-                    self.system_name = self.system_name or line.split()[1]
-                    continue
-
-                if line.startswith("atom"):  # atom for which a GP model was made eg. O1
-                    self.atom_name = self.atom_name or line.split()[1].capitalize()
-                    continue
-
-                if (
-                    "property" in line
-                ):  # property (such as iqa or particular multipole moment) for which a GP model was made
-                    self.prop = self.prop or line.split()[1]
-                    continue
-
-                if "ALF" in line:
-                    tmp_line_split = line.split()[1:]
-                    if tmp_line_split[-1] == "None":
-                        self.alf = self.alf or ALF(
-                            *[int(a) - 1 for a in line.split()[1:-1]], None
-                        )
-                    else:
-                        self.alf = self.alf or ALF(
-                            *[int(a) - 1 for a in line.split()[1:]]
-                        )
-                    continue
-
-                if "number_of_atoms" in line:
-                    self.natoms = self.natoms or int(line.split()[1])
-                    continue
-
-                if "number_of_features" in line:  # number of inputs to the GP
-                    self.nfeats = self.nfeats or int(line.split()[1])
-                    continue
-
-                if (
-                    "number_of_training_points" in line
-                ):  # number of training points to make the GP model
-                    self.ntrain = self.ntrain or int(line.split()[1])
-                    continue
-
-                # GP mean (mu) section
-                if "[mean]" in line:
-                    mean_type = next(f).split()[-1]  # type
-                    if mean_type == "constant":
-                        mean = ConstantMean(float(next(f).split()[1]))
-                    elif mean_type == "zero":
-                        mean = ZeroMean()
-                    elif mean_type in ["linear", "quadratic"]:
-                        beta = np.array([float(b) for b in next(f).split()[1:]])
-                        xmin = np.array([float(x) for x in next(f).split()[1:]])
-                        ymin = float(next(f).split()[-1])
-                        if mean_type == "linear":
-                            mean = LinearMean(beta, xmin, ymin)
-                        elif mean_type == "quadratic":
-                            mean = QuadraticMean(beta, xmin, ymin)
-
-                    self.mean = self.mean or mean
-                    continue
-
-                if "composition" in line:
-                    # which kernels were used to make the GP model.
-                    # Different kernels can be specified for different input dimensions
-                    kernel_composition = line.split()[-1]
-                    continue
-
-                # GP kernel section
-                if "[kernel." in line:
-                    kernel_name = line.split(".")[-1].rstrip().rstrip("]")
-                    line = next(f)
-                    kernel_type = line.split()[-1].strip()
-                    ndims = int(next(f).split()[-1])  # number of dimensions
+            # training inputs data
+            if "[training_data.x]" in line:
+                line = next(f)
+                x = np.empty((self.ntrain, self.nfeats))
+                i = 0
+                while line.strip() != "":
+                    x[i, :] = np.array([float(num) for num in line.split()])
+                    i += 1
                     line = next(f)
-                    if "TODO" not in line:
-                        active_dims = np.array([int(ad) - 1 for ad in line.split()[1:]])
-                    else:
-                        active_dims = np.arange(ndims)
-
-                    if kernel_type == "rbf":
-                        thetas = np.array([float(hp) for hp in next(f).split()[1:]])
-                        kernel_dict[kernel_name] = RBF(
-                            kernel_name, thetas, active_dims=active_dims
-                        )
-                    elif kernel_type in [
-                        "rbf-cyclic",
-                        "rbf-cylic",
-                    ]:  # Due to typo in FEREBUS 7.0
-                        thetas = np.array([float(hp) for hp in next(f).split()[1:]])
-                        kernel_dict[kernel_name] = RBFCyclic(
-                            kernel_name, thetas, active_dims=active_dims
-                        )
-                    elif kernel_type == "constant":
-                        value = float(next(f).split()[-1])
-                        kernel_dict[kernel_name] = ConstantKernel(
-                            kernel_name, value, active_dims=active_dims
-                        )
-                    elif kernel_type == "periodic":
-                        thetas = np.array([float(hp) for hp in next(f).split()[1:]])
-                        kernel_dict[kernel_name] = PeriodicKernel(
-                            kernel_name,
-                            thetas,
-                            np.full(thetas.shape, 2 * np.pi),
-                            active_dims=active_dims,
-                        )
-
-                    continue
-
-                if "units.x" in line:
-                    self.input_units = self.input_units or line.split()[1:]
-
-                if "units.y" in line:
-                    self.output_unit = self.output_unit or line.split()[-1]
-
-                # training inputs data
-                if "[training_data.x]" in line:
+                if self.x is FileContents:
+                    self.x = x
+                continue
+
+            # training labels data
+            if "[training_data.y]" in line:
+                line = next(f)
+                y = np.empty((self.ntrain, 1))
+                i = 0
+                while line.strip() != "":
+                    y[i, 0] = float(line)
+                    i += 1
                     line = next(f)
-                    x = np.empty((self.ntrain, self.nfeats))
-                    i = 0
-                    while line.strip() != "":
-                        x[i, :] = np.array([float(num) for num in line.split()])
-                        i += 1
+                if self.y is FileContents:
+                    self.y = y
+                continue
+
+            if "[weights]" in line:
+                line = next(f)
+                weights = np.empty((self.ntrain, 1))
+                i = 0
+                while line.strip() != "":
+                    weights[i, 0] = float(line)
+                    i += 1
+                    try:
                         line = next(f)
-                    self.x = self.x or x
-                    continue
+                    except StopIteration:
+                        break
 
-                # training labels data
-                if "[training_data.y]" in line:
-                    line = next(f)
-                    y = np.empty((self.ntrain, 1))
-                    i = 0
-                    while line.strip() != "":
-                        y[i, 0] = float(line)
-                        i += 1
-                        line = next(f)
-                    self.y = self.y or y
-                    continue
-
-                if "[weights]" in line:
-                    line = next(f)
-                    weights = np.empty((self.ntrain, 1))
-                    i = 0
-                    while line.strip() != "":
-                        weights[i, 0] = float(line)
-                        i += 1
-                        try:
-                            line = next(f)
-                        except StopIteration:
-                            break
-
-                    self.weights = self.weights or weights
+                if self.weights is FileContents:
+                    self.weights = weights
 
         self.kernel = (
             self.kernel
@@ -347,15 +456,58 @@ class Model(ReadFile, WriteFile):
         small number on the order of 1e-6 to 1e-10."""
         return self.kernel.R(self.x) + (self.jitter * np.identity(self.ntrain))
 
+    def _cholesky(self) -> Tuple[np.ndarray, bool]:
+        """Returns the Cholesky factorization of the covariance matrix R, as returned by
+        ``scipy.linalg.cho_factor``. The factorization is cached, so R is only built and factorized
+        once instead of every time the variance, likelihood, etc. are computed. The cache is invalidated
+        when the training inputs, kernel (or its hyperparameters) or jitter are changed.
+
+        .. note::
+            Modifying the training inputs in-place (e.g. ``model.x[0, 0] = 1.0``) is not detected, call
+            `clear_cache` after doing so.
+        """
+
+        key = self._cholesky_key()
+        cache = self._cholesky_cache
+
+        if (
+            cache is None
+            or cache[0][0] is not key[0]
+            or cache[0][1] is not key[1]
+            or cache[0][2:] != key[2:]
+        ):
+            self._cholesky_cache = (
+                key,
+                cho_factor(self.R, lower=True, check_finite=False),
+            )
+
+        return self._cholesky_cache[1]
+
+    def _cholesky_key(self) -> tuple:
+        # the training inputs and kernel are compared by identity (so that reassigning them invalidates
+        # the cache), the hyperparameters and jitter by value
+        return (
+            self.x,
+            self.kernel,
+            self.x.shape,
+            np.ravel(self.kernel.params).tobytes(),
+            self.jitter,
+        )
+
+    def clear_cache(self):
+        """Clears the cached Cholesky factorization of the covariance matrix, so that it is recomputed
+        the next time it is needed."""
+        self._cholesky_cache = None
+
     @property
     def invR(self) -> np.ndarray:
         """Returns the inverse of the covariance matrix R"""
-        return np.linalg.inv(self.R)
+        return cho_solve(self._cholesky(), np.identity(self.ntrain), check_finite=False)
 
     @property
     def lower_cholesky(self) -> np.ndarray:
         """Decomposes the covariance matrix into L and L^T. Returns the lower triangular matrix L."""
-        return np.linalg.cholesky(self.R)
+        return np.tril(self._cholesky()[0])
 
     @property
     def _y_minus_mean(self):
@@ -363,51 +515,218 @@ class Model(ReadFile, WriteFile):
 
     @property
     def logdet(self):
-        sign, logdet = np.linalg.slogdet(self.R)
-        return sign * logdet
+        # R is positive definite, so its determinant is the square of the product of the diagonal of L
+        return 2.0 * np.sum(np.log(np.diag(self._cholesky()[0])))
 
     def compute_weights(self) -> np.ndarray:
         """Computes the training weights from the data given"""
-        return np.linalg.solve(self.lower_cholesky, self._y_minus_mean)
+        return cho_solve(self._cholesky(), self._y_minus_mean, check_finite=False)
 
     def compute_likelihood(self) -> float:
-        """Computes the marginal likelihood from the data given"""
+        """Computes the (log) marginal likelihood from the data given"""
         return (
-            0.5 * np.dot(self._y_minus_mean.T, self.compute_weights()).item()
+            -0.5 * np.dot(self._y_minus_mean.T, self.compute_weights()).item()
             - 0.5 * self.logdet
             - 0.5 * self.ntrain * np.log(2 * np.pi)
         )
 
-    def predict(self, x_test: np.ndarray) -> np.ndarray:
-        """Returns an array containing the test point predictions."""
+    def add_training_points(self, x_new: np.ndarray, y_new: np.ndarray):
+        r"""Appends training points to the model and updates the weights and likelihood, keeping the
+        hyperparameters fixed. Instead of factorizing the new (n+k) x (n+k) covariance matrix from scratch,
+        the cached Cholesky factor L of the n x n covariance matrix is extended with k new rows
+
+        .. math::
+
+            L' = \begin{pmatrix} L & 0 \\ L_{21} & L_{22} \end{pmatrix}, \quad
+            L_{21}^T = L^{-1} R_{12}, \quad
+            L_{22} L_{22}^T = R_{22} - L_{21} L_{21}^T
+
+        which costs O(n^2 k) instead of O((n+k)^3), so adding a few points every iteration of adaptive
+        sampling scales with the size of the training set.
+
+        :param x_new: A k x nfeats array of training inputs (or a single point as a 1D array)
+        :param y_new: The k training outputs
+        :raises ValueError: If the shapes of the new points do not match the model, or if the new covariance
+            matrix is not positive definite (e.g. a point is a duplicate of a training point)
+        """
+
+        x_new = np.atleast_2d(np.asarray(x_new, dtype=float))
+        y_new = np.asarray(y_new, dtype=float).reshape((-1, 1))
+
+        if x_new.shape[1] != self.x.shape[1]:
+            raise ValueError(
+                f"New training points have {x_new.shape[1]} features, model has {self.x.shape[1]}."
+            )
+        if len(x_new) != len(y_new):
+            raise ValueError(
+                f"Number of new training inputs ({len(x_new)}) and outputs ({len(y_new)}) does not match."
+            )
+
+        ntrain = len(self.x)
+        nnew = len(x_new)
+        lower = self._cholesky()[0]
+
+        l21 = solve_triangular(
+            lower, self.kernel.r(self.x, x_new), lower=True, check_finite=False
+        ).T
+        schur = self.kernel.R(x_new) + self.jitter * np.identity(nnew) - l21 @ l21.T
+        try:
+            l22 = np.linalg.cholesky(schur)
+        except np.linalg.LinAlgError:
+            raise ValueError(
+                "Covariance matrix is not positive definite after adding the training points, "
+                "the points may be (near) duplicates of existing training points."
+            )
+
+        extended = np.zeros((ntrain + nnew, ntrain + nnew))
+        extended[:ntrain, :ntrain] = lower
+        extended[ntrain:, :ntrain] = l21
+        extended[ntrain:, ntrain:] = l22
+
+        self.x = np.concatenate((self.x, x_new))
+        self.y = np.concatenate(
+            (np.asarray(self.y, dtype=float).reshape((-1, 1)), y_new)
+        )
+        self.ntrain = ntrain + nnew
+        self._cholesky_cache = (self._cholesky_key(), (extended, True))
+
+        self.weights = self.compute_weights()
+        self.likelihood = self.compute_likelihood()
+
+    def predict(
+        self,
+        x_test: np.ndarray,
+        chunk_size: Optional[int] = None,
+        precision: Union[Precision, str] = Precision.Double,
+    ) -> np.ndarray:
+        """Returns an array containing the test point predictions.
+
+        :param x_test: The n_test by nfeats test points (features)
+        :param chunk_size: If given, the test points are predicted in chunks of this many points, so that
+            only an n_train by chunk_size covariance matrix is held in memory at any time
+        :param precision: The floating point precision of the covariance matrix, see `Precision`
+        """
 
         # make into a 2d array in case a 1d is passed in
         if x_test.ndim == 1:
             x_test = x_test[np.newaxis, ...]
 
+        precision = Precision(precision)
+        return apply_in_batches(
+            lambda x: self._predict(x, precision), x_test, chunk_size
+        )
+
+    def _predict(
+        self, x_test: np.ndarray, precision: Precision = Precision.Double
+    ) -> np.ndarray:
+        if precision is not Precision.Double:
+            return (
+                self.mean.value(x_test)
+                + reduced_precision_predict(
+                    self.kernel, self.x, x_test, self.weights, precision
+                )[:, -1]
+            ).flatten()
         return (
             self.mean.value(x_test) + np.dot(self.r(x_test).T, self.weights)[:, -1]
         ).flatten()
 
-    def variance(self, x_test: np.ndarray) -> np.ndarray:
-        """Return the variance for the test data points."""
+    def variance(
+        self, x_test: np.ndarray, chunk_size: Optional[int] = None
+    ) -> np.ndarray:
+        """Return the variance for the test data points.
+
+        :param x_test: The n_test by nfeats test points (features)
+        :param chunk_size: If given, the variance is computed in chunks of this many points, so that
+            only an n_train by chunk_size covariance matrix is held in memory at any time
+        """
+
+        if x_test.ndim == 1:
+            x_test = x_test[np.newaxis, ...]
+
+        return apply_in_batches(self._variance, x_test, chunk_size)
+
+    def _variance(self, x_test: np.ndarray) -> np.ndarray:
         train_test_covar = self.r(x_test)
         # temporary matrix, see Rasmussen Williams page 19 algo. 2.1
-        v = np.linalg.solve(self.lower_cholesky, train_test_covar)
+        v = solve_triangular(
+            self._cholesky()[0], train_test_covar, lower=True, check_finite=False
+        )
 
         # TODO: need to multiply by tau^2 in order to get "true" variance which can be used for error estimations.
         # here it can only be used to compare points to figure out which point has the largest variance.
-        return 1.0 - np.diag(np.matmul(v.T, v)).flatten()
+        # only the diagonal of v^T v is needed, so do not compute the full n_test x n_test matrix
+        return 1.0 - np.einsum("ij,ij->j", v, v)
 
-    def _write_file(self, path: Path) -> None:
-        if not path.parent.exists():
-            mkdir(path.parent)
+    def write(self, path: Optional[Union[str, Path]] = None, binary: bool = True):
+        """Writes the model file and (optionally) its binary copy, see `write_binary`.
+
+        :param path: The path of the model file, or a directory in which to write the model file,
+            defaults to the path of the model
+        :param binary: Whether to also write the binary copy of the model
+        """
+        path = Path(path or self.path)
         if path.is_dir():
-            path = (
-                path
-                / f"{self.system_name}_{self.prop}_{self.atom_name}{Model.get_filetype()}"
+            path = path / self._default_filename
+        super().write(path)
+        if binary:
+            self.write_binary(path)
+
+    def write_binary(self, path: Optional[Union[str, Path]] = None):
+        """Writes a binary (uncompressed ``.npz``) copy of the model next to the model file,
+        which is read instead of the model file when it is up to date. The training outputs and weights
+        are stored as arrays, which are memory mapped when the binary copy is read.
+
+        The training inputs are stored separately in a ``.x_<hash>.npy`` file named after the hash of
+        its contents, so models with the same training inputs (e.g. the models of all properties of an atom)
+        share one file, which is only memory mapped once when the models are read.
+
+        The size and modification time of the model file are stored in the binary copy, so if the model
+        file is modified afterwards, the binary copy is out of date and the model file is read instead.
+
+        If the binary copy replaces one with different training inputs, the previous ``.x_<hash>.npy`` file
+        is removed once no other binary copy in the directory uses it.
+
+        :param path: The path of the model file, defaults to the path of the model
+        """
+        path = Path(path or self.path)
+        binary_path = self._binary_path(path)
+        stat = path.stat()
+
+        previous_x_file = _training_inputs_file(binary_path)
+
+        x = np.asarray(self.x, dtype=float)
+        x_path = path.parent / f".x_{array_hash(x)}.npy"
+        # write to temporary files first, so a partially written file is never read
+        if not x_path.exists():
+            tmp_path = x_path.with_name(f"{x_path.name}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.save(f, x)
+            os.replace(tmp_path, x_path)
+
+        tmp_path = binary_path.with_name(f".{binary_path.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                header=np.array(self._header_str()),
+                x_file=np.array(x_path.name),
+                y=np.asarray(self.y, dtype=float).reshape((-1, 1)),
+                weights=np.asarray(self.weights, dtype=float).reshape((-1, 1)),
+                source=np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64),
             )
+        os.replace(tmp_path, binary_path)
 
+        if previous_x_file is not None and previous_x_file != x_path.name:
+            binary_paths = path.parent.glob(f"*{Model.get_filetype()}.npz")
+            if not any(
+                _training_inputs_file(p) == previous_x_file for p in binary_paths
+            ):
+                (path.parent / previous_x_file).unlink(missing_ok=True)
+
+    @property
+    def _default_filename(self) -> str:
+        return f"{self.system_name}_{self.prop}_{self.atom_name}{Model.get_filetype()}"
+
+    def _set_write_defaults_if_needed(self):
         # these are so that the writing of models does not crash. They do not affect predictions
         if not self.jitter:
             self.jitter = 1e-6
@@ -415,15 +734,27 @@ class Model(ReadFile, WriteFile):
             self.likelihood = 1.0
         if not self.notes:
             self.notes = {}
+        if not self.input_units:
+            self.input_units = _get_default_input_units(self.nfeats)
+        if not self.output_unit:
+            self.output_unit = _get_default_output_unit(self.prop)
+
+    def _header_str(self) -> str:
+        """Returns everything in the model file apart from the training data and weights"""
 
         write_str = ""
 
         write_str += "# [metadata]\n"
-        write_str += f"# program {self.program}\n"
-        write_str += f"# version {self.program_version}\n"
-        write_str += f"# jitter {self.jitter}\n"
-        write_str += f"# likelihood {self.likelihood}\n"
-        for key, val in self.notes.items():
+        # metadata which is not known (e.g. not in the model file which was read) is not written
+        if self.program:
+            write_str += f"# program {self.program}\n"
+        if self.program_version:
+            write_str += f"# version {self.program_version}\n"
+        if self.jitter:
+            write_str += f"# jitter {self.jitter}\n"
+        if self.likelihood:
+            write_str += f"# likelihood {self.likelihood}\n"
+        for key, val in (self.notes or {}).items():
             write_str += f"# {key} = {val}\n"
         write_str += "\n"
         write_str += "[system]\n"
@@ -451,6 +782,15 @@ class Model(ReadFile, WriteFile):
         write_str += "scaling.x none\n"
         write_str += "scaling.y none\n"
         write_str += "\n"
+
+        return write_str
+
+    def _write_file(self, path: Path) -> str:
+        if not path.parent.exists():
+            mkdir(path.parent)
+
+        write_str = self._header_str()
+
         write_str += "[training_data.x]\n"
         for xi in self.x:
             write_str += f"{' '.join(map(str, xi))}\n"
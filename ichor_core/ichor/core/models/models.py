@@ -1,16 +1,19 @@
 import re
 from functools import wraps
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import Dict, List, Optional, Union
 
 import numpy as np
 import pandas as pd
 from ichor.core.atoms import ALF, Atoms, ListOfAtoms
+from ichor.core.common.np import array_hash
 from ichor.core.common.sorting import ignore_alpha
 from ichor.core.common.types.itypes import F
 from ichor.core.files.directory import Directory
 from ichor.core.files.file_data import HasAtoms
 from ichor.core.models.model import Model
+from ichor.core.models.precision import Precision
+from ichor.core.models.predictor import _model_state_key, ModelsPredictor
 from natsort import natsorted
 
 
@@ -105,24 +108,100 @@ class Models(Directory, list):
         """Returns the name of the system for which models were made."""
         return self[0].system
 
+    def share_training_data(self) -> int:
+        """Makes models of the same atom which have identical training inputs (as found by a hash of
+        their contents) share one training inputs array, instead of every model holding its own copy.
+        Models read from binary copies which share a training inputs file already share the same array.
+
+        :return: The number of distinct training input arrays
+        """
+        hashes = {}
+        shared = {}
+        for model in self:
+            x = model.x
+            if id(x) not in hashes:
+                hashes[id(x)] = array_hash(x)
+            model.x = shared.setdefault((model.atom_name, hashes[id(x)]), x)
+        return len(shared)
+
+    @property
+    def predictor(self) -> ModelsPredictor:
+        """Returns a `ModelsPredictor` which groups the models by atom, training inputs and
+        kernel hyperparameters to predict all properties of an atom at once. It is rebuilt
+        if models are added or removed, or if the training data, weights, jitter or kernel
+        hyperparameters of a model change."""
+        key = tuple(_model_state_key(model) for model in self)
+        predictor = self.__dict__.get("_predictor")
+        if predictor is None or predictor[0] != key:
+            self.share_training_data()
+            # sharing the training data can replace the training inputs arrays
+            key = tuple(_model_state_key(model) for model in self)
+            predictor = (key, ModelsPredictor(self))
+            self._predictor = predictor
+        return predictor[1]
+
     @x_to_features
-    def predict(self, x_test) -> pd.DataFrame:
+    def predict(
+        self,
+        x_test,
+        chunk_size: Optional[int] = None,
+        sink: Optional[Union[str, Path]] = None,
+        precision: Union[Precision, str] = Precision.Double,
+        workers: Optional[int] = None,
+    ) -> Union[pd.DataFrame, Path]:
         # todo: update docs
-        """Returns dictionary of DataFrame({"atom": {"property": [values]}})"""
+        """Returns dictionary of DataFrame({"atom": {"property": [values]}})
+
+        :param x_test: The test points, see `get_features_dict`
+        :param chunk_size: If given, the test points are predicted in chunks of this many points,
+            which bounds the memory used by the train-test covariance matrices
+        :param sink: If given, the predictions are written chunk by chunk to this ``.npy``, ``.parquet``
+            or ``.h5`` file instead of being returned, with one column per atom and property
+            (see `ModelsPredictor.predict_to_file`). The path of the file is returned.
+        :param precision: The floating point precision of the covariance matrices, single or mixed precision
+            halve the memory used but are less accurate (see `Precision` and `precision_report`)
+        :param workers: If given, the atoms (and chunks of test points) are predicted in parallel in a pool
+            of this many threads, see `ModelsPredictor.predict`
+        """
+        if sink is not None:
+            return self.predictor.predict_to_file(
+                x_test,
+                sink,
+                chunk_size=chunk_size or 10000,
+                precision=precision,
+                workers=workers or 1,
+            )
+        return pd.DataFrame(
+            self.predictor.predict(
+                x_test, chunk_size=chunk_size, precision=precision, workers=workers
+            )
+        )
+
+    def precision_report(
+        self,
+        precision: Union[Precision, str] = Precision.Single,
+        chunk_size: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """Returns a DataFrame comparing the predictions made in single or mixed precision to double
+        precision on the training inputs of every model, see `ModelsPredictor.precision_report`.
+
+        :param precision: The precision to compare to double precision, see `Precision`
+        :param chunk_size: If given, the training inputs are predicted in chunks of this many points
+        """
         return pd.DataFrame(
-            {
-                atom: {model.type: model.predict(features) for model in self[atom]}
-                for atom, features in x_test.items()
-            }
+            self.predictor.precision_report(precision, chunk_size=chunk_size)
         )
 
     @x_to_features
-    def variance(self, x_test) -> pd.DataFrame:
+    def variance(
+        self,
+        x_test,
+        chunk_size: Optional[int] = None,
+        workers: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """Returns a DataFrame of the variance of every model for the test points, see `predict`"""
         return pd.DataFrame(
-            {
-                atom: {model.type: model.variance(features) for model in self[atom]}
-                for atom, features in x_test.items()
-            }
+            self.predictor.variance(x_test, chunk_size=chunk_size, workers=workers)
         )
 
     def get_features_dict(
@@ -0,0 +1,77 @@
+from enum import Enum
+from typing import Union
+
+import numpy as np
+from ichor.core.common.np import batched_slices
+from ichor.core.models.kernels import Kernel
+from ichor.core.models.kernels.fused import fused_evaluator
+
+# number of training points of the float32 covariance matrix which are converted to float64 at a time
+# when predicting with `Precision.Mixed`
+_mixed_precision_block_size = 128
+
+
+class Precision(Enum):
+    """The floating point precision used to compute predictions.
+
+    - ``Double``: everything is computed in float64 (the default)
+    - ``Single``: the covariance matrix and its product with the weights are computed in float32
+    - ``Mixed``: the covariance matrix is computed in float32, the product with the weights is accumulated
+      in float64, a block of training points at a time
+
+    Single and mixed precision halve the memory used by the train-test covariance matrices (which is the
+    largest array when predicting many test points), at the cost of accuracy.
+    See `ModelsPredictor.precision_report` to check the accuracy for a set of models.
+
+    .. note::
+        Only the covariance matrices of stationary kernels (`RBF`, `RBFCyclic`, `PeriodicKernel` and
+        products of these) are computed in float32, other kernels are computed in float64 and then rounded.
+    """
+
+    Double = "double"
+    Single = "single"
+    Mixed = "mixed"
+
+
+def reduced_precision_predict(
+    kernel: Kernel,
+    x_train: np.ndarray,
+    x_test: np.ndarray,
+    weights: np.ndarray,
+    precision: Union[Precision, str],
+) -> np.ndarray:
+    """Returns the product of the train-test covariance matrix with the weights, computed in single or mixed
+    precision (see `Precision`). The mean function is not added.
+
+    :param kernel: The kernel of the model(s)
+    :param x_train: The n_train by nfeatures training inputs
+    :param x_test: The n_test by nfeatures test inputs
+    :param weights: The n_train by n_models weights
+    :param precision: `Precision.Single` or `Precision.Mixed`
+    :return: An n_test by n_models float64 array
+    """
+
+    precision = Precision(precision)
+    if precision is Precision.Double:
+        raise ValueError(
+            "Reduced precision predictions must use single or mixed precision."
+        )
+
+    fused = fused_evaluator(kernel)
+    if fused is not None:
+        r = fused.k(x_train, x_test, dtype=np.float32)
+    else:
+        r = kernel.r(x_train, x_test).astype(np.float32)
+
+    if precision is Precision.Single:
+        return np.dot(r.T, weights.astype(np.float32)).astype(np.float64)
+
+    # the float32 covariance matrix is converted to float64 a block of training points at a time (into
+    # the same buffer), so the products with the weights are accumulated in float64
+    result = np.zeros((r.shape[1], weights.shape[1]))
+    buffer = np.empty((min(_mixed_precision_block_size, len(r)), r.shape[1]))
+    for rows in batched_slices(len(r), _mixed_precision_block_size):
+        block = buffer[: rows.stop - rows.start]
+        np.copyto(block, r[rows])
+        result += np.dot(block.T, weights[rows])
+    return result
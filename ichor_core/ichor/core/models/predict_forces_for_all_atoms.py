@@ -1,11 +1,193 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple, Union
 
 import numpy as np
-from ichor.core.atoms import ALF, Atoms
-from ichor.core.models.calculate_fflux_derivatives import (
-    fflux_derivs,
-    fflux_derivs_rbf_only_one_dimensional,
+from ichor.core.atoms import ALF, Atoms, ListOfAtoms
+from ichor.core.calculators import get_system_alf_array
+from ichor.core.calculators.features.alf_features_calculator import (
+    _alf_features_and_derivatives,
 )
+from ichor.core.common.constants import ang2bohr
+from ichor.core.common.np import batched_slices
+from ichor.core.common.units import AtomicDistance
+from ichor.core.models.calculate_fflux_derivatives import fflux_predict_values
+from ichor.core.models.kernels import RBF
+
+# maximum number of elements of the feature derivative arrays of one chunk of geometries
+_max_forces_chunk_elements = 2**22
+
+
+def get_iqa_models(
+    models: "ichor.core.models.Models",  # noqa F821
+    atom_names: List[str],
+) -> List["ichor.core.models.Model"]:  # noqa F821
+    """Returns the iqa model of every atom, in the same order as the atom names.
+
+    :param models: A models instance which wraps around a directory containing model files.
+    :param atom_names: The names of the atoms, e.g. ['N1', 'H2', 'H3', 'H4']
+    :raises ValueError: If there is no iqa model for one of the atoms
+    """
+    iqa_models = {model.atom_name: model for model in models if model.prop == "iqa"}
+    missing_atoms = [a for a in atom_names if a not in iqa_models]
+    if missing_atoms:
+        raise ValueError(f"No iqa models found for atoms {missing_atoms}.")
+    return [iqa_models[atom_name] for atom_name in atom_names]
+
+
+def _energy_gradient(
+    dQ_df: np.ndarray,
+    alf_array: np.ndarray,
+    alf_derivatives: np.ndarray,
+    remaining_derivatives: np.ndarray,
+    remaining: np.ndarray,
+) -> np.ndarray:
+    """Returns the derivatives of the total energy with respect to the coordinates of every atom, from the
+    derivatives of the atomic energies with respect to the features (dQ/df) and the derivatives of the
+    features with respect to the coordinates (see `_alf_features_and_derivatives`).
+
+    :param dQ_df: An n_timesteps x n_atoms x n_features array of the derivatives of the atomic energies
+    :param alf_array: The n_atoms x 3 system ALF array
+    :param alf_derivatives: The derivatives of the features with respect to the coordinates of the ALF atoms
+    :param remaining_derivatives: The derivatives of the non-ALF features with respect to the coordinates of
+        the remaining (non-ALF) atoms
+    :param remaining: The indices of the remaining atoms of every atom
+    :return: An n_timesteps x n_atoms x 3 array
+    """
+    # the derivative of the energy with respect to the coordinates of every atom is the sum
+    # of dQ/df * df/dx over all features of all atoms, every feature only depends on the atoms
+    # in the ALF of its atom and (for the non-ALF features) on one remaining atom
+    natoms = len(alf_array)
+    gradient = np.zeros((len(dQ_df), natoms, 3))
+    np.add.at(
+        gradient,
+        (slice(None), alf_array[:, : alf_derivatives.shape[3]]),
+        np.einsum("tcf,tcfax->tcax", dQ_df, alf_derivatives),
+    )
+    np.add.at(
+        gradient,
+        (slice(None), remaining),
+        np.einsum(
+            "tcrf,tcrfx->tcrx",
+            dQ_df[..., 3:].reshape(remaining_derivatives.shape[:-1]),
+            remaining_derivatives,
+        ),
+    )
+    return gradient
+
+
+def predict_fflux_energies_and_forces_batched(
+    coordinates: np.ndarray,
+    models: "ichor.core.models.Models",  # noqa F821
+    system_alf: List[ALF],  # noqa F821
+    atom_names: List[str],
+    units: AtomicDistance = AtomicDistance.Bohr,
+    chunk_size: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Predicts the total (iqa) energies and the Cartesian forces that FFLUX predicts for a batch of geometries.
+
+    For every geometry, the features, C matrix and dQ/df of every atom are computed once, the analytic
+    derivatives of the features with respect to the coordinates (the Wilson B matrix blocks) are assembled
+    for all atoms at once, and the derivatives of all atomic energies are contracted with them in a single pass.
+
+    .. note::
+        The energies are in Hartree and the forces are in Hartree per Bohr (as in FFLUX).
+        The `system_alf` argument is 0-indexed (as calculated by ichor methods),
+        while the ALF in the .model files is 1-indexed.
+
+    :param coordinates: A ``n_timesteps`` x ``n_atoms`` x 3 array of Cartesian coordinates,
+        or a single ``n_atoms`` x 3 geometry
+    :param models: A models instance which wraps around a directory containing model files.
+        An iqa model is needed for every atom.
+    :param system_alf: The system alf as a list of `ALF` instances (or list of lists), 0-indexed
+    :param atom_names: The names of the atoms, in the same order as the coordinates
+    :param units: The units of the coordinates, Bohr by default
+    :param chunk_size: The number of geometries for which forces are calculated at a time. By default,
+        this is chosen so that the arrays of feature derivatives stay small.
+    :return: A tuple of the ``n_timesteps`` array of energies and the ``n_timesteps`` x ``n_atoms`` x 3 array
+        of forces (a float and an ``n_atoms`` x 3 array if a single geometry was given)
+    """
+
+    coordinates = np.asarray(coordinates, dtype=float)
+    single_geometry = coordinates.ndim == 2
+    if single_geometry:
+        coordinates = coordinates[np.newaxis]
+
+    # make sure the coords are in Bohr because forces are calculated per Bohr
+    if units is AtomicDistance.Angstroms:
+        coordinates = coordinates * ang2bohr
+
+    ntimesteps, natoms, _ = coordinates.shape
+    alf_array = get_system_alf_array(system_alf, natoms)
+    iqa_models = get_iqa_models(models, atom_names)
+
+    if chunk_size is None:
+        chunk_size = max(1, _max_forces_chunk_elements // (36 * natoms**2))
+
+    energies = np.empty(ntimesteps)
+    forces = np.empty((ntimesteps, natoms, 3))
+
+    for rows in batched_slices(ntimesteps, chunk_size):
+        (
+            features,
+            alf_derivatives,
+            remaining_derivatives,
+            remaining,
+        ) = _alf_features_and_derivatives(coordinates[rows], alf_array)
+
+        # dQ/df of every atom, n_chunk x n_atoms x n_features
+        dQ_df = np.empty(features.shape)
+        energies[rows] = 0.0
+        for atm_idx, model in enumerate(iqa_models):
+            Q, dQ_df[:, atm_idx] = fflux_predict_values(
+                model,
+                features[:, atm_idx],
+                rbf_only=isinstance(model.kernel, RBF),
+            )
+            energies[rows] += Q
+
+        forces[rows] = -_energy_gradient(
+            dQ_df, alf_array, alf_derivatives, remaining_derivatives, remaining
+        )
+
+    if single_geometry:
+        return energies.item(), forces[0]
+    return energies, forces
+
+
+def predict_fflux_forces_batched(
+    atoms: Union[Atoms, ListOfAtoms],
+    models: "ichor.core.models.Models",  # noqa F821
+    system_alf: List[ALF],  # noqa F821
+    chunk_size: Optional[int] = None,
+) -> np.ndarray:
+    """Predicts the Cartesian forces that FFLUX predicts for one geometry or every geometry
+    of a trajectory (e.g. a DL_POLY HISTORY file), see `predict_fflux_energies_and_forces_batched`.
+
+    :param atoms: An Atoms instance, or a ListOfAtoms instance (such as a Trajectory) containing many geometries.
+        Note that the ordering of the atoms matters, i.e. the index of the atoms
+        must match the index of the model files.
+    :param models: A models instance which wraps around a directory containing model files.
+    :param system_alf: The system alf as a list of `ALF` instances, 0-indexed
+    :param chunk_size: The number of geometries for which forces are calculated at a time
+    :return: An ``n_atoms`` x 3 array of forces for an Atoms instance, or an ``n_timesteps`` x ``n_atoms`` x 3
+        array of forces for a ListOfAtoms instance, in Hartree per Bohr
+    """
+
+    if isinstance(atoms, Atoms):
+        coordinates = atoms.to_bohr().coordinates
+        units = AtomicDistance.Bohr
+    else:
+        coordinates = atoms.coordinates
+        units = atoms.units
+
+    _, forces = predict_fflux_energies_and_forces_batched(
+        coordinates,
+        models,
+        system_alf,
+        atoms.atom_names,
+        units=units,
+        chunk_size=chunk_size,
+    )
+    return forces
 
 
 def predict_fflux_forces_for_all_atoms(
@@ -29,46 +211,7 @@ def predict_fflux_forces_for_all_atoms(
     :return: A np.ndarray of shape n_atoms x 3 containing the x,y,z force for every atom
     """
 
-    atomic_forces_list = []
-
-    # make sure the coords are in Bohr because forces are calculated per Bohr
-    atoms = atoms.to_bohr()
-    atom_names = atoms.atom_names
-    natoms = len(atoms)
-
-    # make sure the ordering of the models is the same as the sequence of atoms
-    models_list = []
-    for atom_name in atom_names:
-        for model in models:
-            if model.atom_name == atom_name and model.prop == "iqa":
-                models_list.append(model)
-
-    for atm_idx in range(natoms):
-
-        # forces exerted on atom atoms[atom_idx]
-        local_forces = np.zeros(3)
-        non_local_atoms = [t for t in range(natoms) if t not in system_alf[atm_idx]]
-
-        # first three atoms that are central, x-axis, xy-plane
-        for j in range(3):
-            force = fflux_derivs(
-                atm_idx,
-                system_alf[atm_idx][j],
-                atoms,
-                system_alf,
-                models_list[system_alf[atm_idx][j]],
-            )
-            local_forces = local_forces - force
-        # rest of atoms in molecule
-        for non_local_atm in non_local_atoms:
-            force = fflux_derivs(
-                atm_idx, non_local_atm, atoms, system_alf, models_list[non_local_atm]
-            )
-            local_forces = local_forces - force
-
-        atomic_forces_list.append(local_forces)
-
-    return np.array(atomic_forces_list)
+    return predict_fflux_forces_batched(atoms, models, system_alf)
 
 
 def predict_fflux_forces_for_all_atoms_dict(
@@ -119,36 +262,4 @@ def predict_fflux_forces_for_all_atoms_one_dimensional(
     :return: A np.ndarray of shape n_atoms x 3 containing the x,y,z force for every atom
     """
 
-    atomic_forces_list = []
-
-    # make sure the coords are in Bohr because forces are calculated per Bohr
-    atoms = atoms.to_bohr()
-    atom_names = atoms.atom_names
-    natoms = len(atoms)
-
-    # make sure the ordering of the models is the same as the sequence of atoms
-    models_list = []
-    for atom_name in atom_names:
-        for model in models:
-            if model.atom_name == atom_name and model.prop == "iqa":
-                models_list.append(model)
-
-    for atm_idx in range(natoms):
-
-        # forces exerted on atom atoms[atom_idx]
-        local_forces = np.zeros(3)
-
-        # first three atoms that are central, x-axis, xy-plane
-        for j in range(2):
-            force = fflux_derivs_rbf_only_one_dimensional(
-                atm_idx,
-                system_alf[atm_idx][j],
-                atoms,
-                system_alf,
-                models_list[system_alf[atm_idx][j]],
-            )
-            local_forces = local_forces - force
-
-        atomic_forces_list.append(local_forces)
-
-    return np.array(atomic_forces_list)
+    return predict_fflux_forces_batched(atoms, models, system_alf)
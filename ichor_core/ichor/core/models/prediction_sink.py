@@ -0,0 +1,154 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Union
+
+import numpy as np
+from ichor.core.common.io import mkdir
+
+
+class PredictionSink(ABC):
+    """Base class for files which predictions are written to chunk by chunk, so that the predictions
+    for very large test sets (e.g. long trajectories) never need to be held in memory all at once.
+
+    Predictions are written as a 2D array of n_test rows, with one column per (atom, property).
+
+    :param path: The path of the file to write
+    :param columns: The names of the columns, e.g. ``O1_iqa``
+    :param n: The total number of rows (test points) which will be written
+    """
+
+    _filetype = ""
+
+    def __init__(self, path: Union[str, Path], columns: List[str], n: int):
+        self.path = Path(path)
+        self.columns = list(columns)
+        self.n = n
+        if not self.path.parent.exists():
+            mkdir(self.path.parent)
+
+    @abstractmethod
+    def write(self, rows: slice, values: np.ndarray):
+        """Writes a chunk of predictions.
+
+        :param rows: The rows (test points) which the chunk corresponds to
+        :param values: An array of shape (number of rows, number of columns)
+        """
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class NpySink(PredictionSink):
+    """Writes predictions to a ``.npy`` file (via a memory map), which can be loaded with ``np.load``
+    (optionally with ``mmap_mode="r"``). The order of the columns is given by ``ModelsPredictor.columns``."""
+
+    _filetype = ".npy"
+
+    def __init__(self, path: Union[str, Path], columns: List[str], n: int):
+        super().__init__(path, columns, n)
+        self._array = np.lib.format.open_memmap(
+            self.path, mode="w+", dtype=np.float64, shape=(n, len(self.columns))
+        )
+
+    def write(self, rows: slice, values: np.ndarray):
+        self._array[rows] = values
+
+    def close(self):
+        if self._array is not None:
+            self._array.flush()
+            self._array = None
+
+
+class ParquetSink(PredictionSink):
+    """Writes predictions to a parquet file, one row group per chunk, with one named column per
+    atom and property. The file can be read with ``pandas.read_parquet``."""
+
+    _filetype = ".parquet"
+
+    def __init__(self, path: Union[str, Path], columns: List[str], n: int):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        super().__init__(path, columns, n)
+        self._schema = pa.schema([(column, pa.float64()) for column in self.columns])
+        self._writer = pq.ParquetWriter(self.path, self._schema)
+
+    def write(self, rows: slice, values: np.ndarray):
+        import pyarrow as pa
+
+        self._writer.write_table(
+            pa.Table.from_arrays(list(values.T), schema=self._schema)
+        )
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class HDF5Sink(PredictionSink):
+    """Writes predictions to a ``predictions`` dataset in an HDF5 file, the names of the columns are
+    stored in the ``columns`` attribute of the dataset.
+
+    .. note::
+        Requires h5py, which is not a dependency of ichor and needs to be installed separately.
+    """
+
+    _filetype = ".h5"
+
+    def __init__(self, path: Union[str, Path], columns: List[str], n: int):
+        try:
+            import h5py
+        except ImportError as e:
+            raise ImportError(
+                "h5py needs to be installed to write predictions to HDF5 files."
+            ) from e
+
+        super().__init__(path, columns, n)
+        self._file = h5py.File(self.path, "w")
+        self._dataset = self._file.create_dataset(
+            "predictions", shape=(n, len(self.columns)), dtype="f8"
+        )
+        self._dataset.attrs["columns"] = self.columns
+
+    def write(self, rows: slice, values: np.ndarray):
+        self._dataset[rows] = values
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+_sinks = {
+    ".npy": NpySink,
+    ".parquet": ParquetSink,
+    ".pq": ParquetSink,
+    ".h5": HDF5Sink,
+    ".hdf5": HDF5Sink,
+}
+
+
+def get_prediction_sink(
+    path: Union[str, Path], columns: List[str], n: int
+) -> PredictionSink:
+    """Returns the sink to write predictions to, based on the suffix of the path
+    (``.npy``, ``.parquet``/``.pq`` or ``.h5``/``.hdf5``).
+
+    :param path: The path of the file to write
+    :param columns: The names of the columns
+    :param n: The total number of rows (test points) which will be written
+    :raises ValueError: If the suffix of the path is not supported
+    """
+    path = Path(path)
+    if path.suffix not in _sinks:
+        raise ValueError(
+            f"Cannot write predictions to '{path}', the file must be one of {list(_sinks)}."
+        )
+    return _sinks[path.suffix](path, columns, n)
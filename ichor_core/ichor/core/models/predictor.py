@@ -0,0 +1,448 @@
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from ichor.core.common.np import apply_in_batches, array_hash, batched_slices
+from ichor.core.common.parallel import thread_map
+from ichor.core.models.kernels.kernel import CompositeKernel, Kernel
+from ichor.core.models.model import Model
+from ichor.core.models.precision import Precision, reduced_precision_predict
+from ichor.core.models.prediction_sink import get_prediction_sink
+
+
+def _kernel_key(kernel: Kernel) -> tuple:
+    """Returns a hashable key made from the type, active dimensions and hyperparameters
+    of a kernel (and its child kernels). Kernels with the same key give the same covariance matrices."""
+    if isinstance(kernel, CompositeKernel):
+        return (
+            type(kernel).__name__,
+            _kernel_key(kernel.k1),
+            _kernel_key(kernel.k2),
+        )
+    return (
+        type(kernel).__name__,
+        np.ravel(kernel.active_dims).tobytes(),
+        np.ravel(kernel.params).astype(float).tobytes(),
+    )
+
+
+def _model_state_key(model: Model) -> tuple:
+    """Returns a hashable key which changes when the training data, weights, jitter or kernel
+    hyperparameters of a model are replaced (e.g. by `Model.add_training_points`), so that
+    a `ModelsPredictor` made from the model can be rebuilt."""
+    return (
+        id(model),
+        id(model.x),
+        id(model.weights),
+        model.jitter,
+        _kernel_key(model.kernel),
+    )
+
+
+class ModelGroup:
+    """A group of models for one atom which have the same training inputs, jitter and the same kernel
+    (hyperparameters), e.g. the iqa and multipole moment models of an atom. The train-test
+    covariance matrix is the same for all models in the group, so it is only computed once and
+    all properties are predicted with a single matrix multiplication with the stacked weights.
+
+    :param models: The models in the group, these must have identical training inputs, jitter and kernels
+    """
+
+    def __init__(self, models: List[Model]):
+        self.models = list(models)
+        # used to compute the covariance and variance for every model of the group
+        self.model = self.models[0]
+        self.weights = np.hstack([model.weights for model in self.models])
+
+    @property
+    def atom_name(self) -> str:
+        return self.model.atom_name
+
+    @property
+    def types(self) -> List[str]:
+        """The properties (iqa, q00, etc.) of the models in the group, in the order of the predictions"""
+        return [model.type for model in self.models]
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.model.x
+
+    def r(self, x_test: np.ndarray) -> np.ndarray:
+        """Returns the n_train by n_test covariance matrix, which is shared by all models in the group"""
+        return self.model.r(x_test)
+
+    def mean(self, x_test: np.ndarray) -> np.ndarray:
+        """Returns the n_test by n_models array of the mean function values of every model"""
+        return np.stack([model.mean.value(x_test) for model in self.models], axis=-1)
+
+    def predict(
+        self,
+        x_test: np.ndarray,
+        chunk_size: Optional[int] = None,
+        precision: Union[Precision, str] = Precision.Double,
+    ) -> np.ndarray:
+        """Returns an n_test by n_models array containing the predictions of every model in the group.
+
+        :param x_test: The n_test by nfeatures test inputs (features)
+        :param chunk_size: If given, the test inputs are predicted in chunks of this many points
+        :param precision: The floating point precision of the covariance matrix, see `Precision`
+        """
+        if x_test.ndim == 1:
+            x_test = x_test[np.newaxis, ...]
+
+        precision = Precision(precision)
+        return apply_in_batches(
+            lambda x: self._predict(x, precision), x_test, chunk_size
+        )
+
+    def _predict(
+        self, x_test: np.ndarray, precision: Precision = Precision.Double
+    ) -> np.ndarray:
+        if precision is not Precision.Double:
+            return self.mean(x_test) + reduced_precision_predict(
+                self.model.kernel, self.x, x_test, self.weights, precision
+            )
+        return self.mean(x_test) + np.dot(self.r(x_test).T, self.weights)
+
+    def variance(
+        self, x_test: np.ndarray, chunk_size: Optional[int] = None
+    ) -> np.ndarray:
+        """Returns the variance of the test inputs, which does not depend on the training outputs so
+        it is the same for all models in the group."""
+        if x_test.ndim == 1:
+            x_test = x_test[np.newaxis, ...]
+
+        return self.model.variance(x_test, chunk_size=chunk_size)
+
+    def __len__(self):
+        return len(self.models)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(atom={self.atom_name}, types={self.types})"
+
+
+class ModelsPredictor:
+    """Predicts all properties of all atoms from a set of models, grouping the models of every atom
+    by their training inputs, jitter and kernel hyperparameters so that each train-test covariance matrix is
+    only computed once per group (instead of once per model).
+
+    :param models: The models to predict with, e.g. a ``Models`` instance
+    """
+
+    def __init__(self, models: Iterable[Model]):
+        grouped_models = defaultdict(list)
+        # models often share the same training inputs array, so only hash every array once
+        hashes = {}
+        for model in models:
+            x = model.x
+            if id(x) not in hashes:
+                hashes[id(x)] = array_hash(x)
+            key = (
+                model.atom_name,
+                hashes[id(x)],
+                model.jitter,
+                _kernel_key(model.kernel),
+            )
+            grouped_models[key].append(model)
+
+        self.groups: Dict[str, List[ModelGroup]] = defaultdict(list)
+        for (atom_name, *_), group in grouped_models.items():
+            self.groups[atom_name].append(ModelGroup(group))
+        self.groups = dict(self.groups)
+
+    @property
+    def atom_names(self) -> List[str]:
+        return list(self.groups.keys())
+
+    @property
+    def ngroups(self) -> int:
+        return sum(len(groups) for groups in self.groups.values())
+
+    @property
+    def columns(self) -> List[Tuple[str, str]]:
+        """The (atom name, property) of every column returned by `iter_predict` and written by `predict_to_file`"""
+        return [
+            (atom_name, prop)
+            for atom_name, groups in self.groups.items()
+            for group in groups
+            for prop in group.types
+        ]
+
+    def predict_atom(
+        self,
+        atom_name: str,
+        x_test: np.ndarray,
+        chunk_size: Optional[int] = None,
+        precision: Union[Precision, str] = Precision.Double,
+    ) -> Dict[str, np.ndarray]:
+        """Predicts all properties of one atom.
+
+        :param atom_name: The name of the atom, e.g. O1
+        :param x_test: The n_test by nfeatures features of the atom
+        :param chunk_size: If given, the test inputs are predicted in chunks of this many points
+        :param precision: The floating point precision of the covariance matrices, see `Precision`
+        :return: A dictionary of property name to an array of n_test predictions
+        """
+        predictions = {}
+        for group in self.groups[atom_name]:
+            group_predictions = group.predict(
+                x_test, chunk_size=chunk_size, precision=precision
+            )
+            for i, prop in enumerate(group.types):
+                predictions[prop] = group_predictions[:, i]
+        return predictions
+
+    def variance_atom(
+        self, atom_name: str, x_test: np.ndarray, chunk_size: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """Computes the variance of all models of one atom.
+
+        :param atom_name: The name of the atom, e.g. O1
+        :param x_test: The n_test by nfeatures features of the atom
+        :param chunk_size: If given, the variance is computed in chunks of this many points
+        :return: A dictionary of property name to an array of n_test variances
+        """
+        variances = {}
+        for group in self.groups[atom_name]:
+            group_variance = group.variance(x_test, chunk_size=chunk_size)
+            for prop in group.types:
+                variances[prop] = group_variance
+        return variances
+
+    def _map_groups(
+        self,
+        func: Callable[[ModelGroup, np.ndarray], np.ndarray],
+        x_test: Dict[str, np.ndarray],
+        chunk_size: Optional[int],
+        workers: int,
+    ) -> Dict[str, List[Tuple[ModelGroup, np.ndarray]]]:
+        """Applies a function to the test inputs of every group of models in a pool of threads. Every group
+        (and every chunk of test inputs if a chunk size is given) is a separate task, so that long
+        trajectories are also split over the threads if there are only a few atoms.
+
+        :param func: Callable which takes a group and the test inputs of a chunk, and returns an array with
+            one row per test input
+        :param x_test: A dictionary of atom name to the n_test by nfeatures features of the atom
+        :param chunk_size: If given, the test inputs of every group are split into chunks of this many points
+        :param workers: The number of threads, see `thread_map`
+        :return: A dictionary of atom name to a list of the groups of the atom and their results
+        """
+        tasks = []
+        for atom_name, features in x_test.items():
+            if atom_name not in self.groups:
+                continue
+            features = np.atleast_2d(features)
+            chunks = (
+                [slice(None)]
+                if chunk_size is None or len(features) == 0
+                else list(batched_slices(len(features), chunk_size))
+            )
+            for group in self.groups[atom_name]:
+                tasks += [(atom_name, group, features[rows]) for rows in chunks]
+
+        results = thread_map(lambda task: func(task[1], task[2]), tasks, workers)
+
+        chunked_results = defaultdict(dict)
+        for (atom_name, group, _), result in zip(tasks, results):
+            chunked_results[atom_name].setdefault(group, []).append(result)
+        return {
+            atom_name: [
+                (group, np.concatenate(chunks)) for group, chunks in groups.items()
+            ]
+            for atom_name, groups in chunked_results.items()
+        }
+
+    def predict(
+        self,
+        x_test: Dict[str, np.ndarray],
+        chunk_size: Optional[int] = None,
+        precision: Union[Precision, str] = Precision.Double,
+        workers: Optional[int] = None,
+    ) -> Dict[str, Dict[str, np.ndarray]]:
+        """Predicts every property for every atom.
+
+        :param x_test: A dictionary of atom name to the n_test by nfeatures features of the atom
+        :param chunk_size: If given, the test inputs are predicted in chunks of this many points
+        :param precision: The floating point precision of the covariance matrices, see `Precision`
+        :param workers: If given, the groups of models (and chunks of test inputs) are predicted in a pool
+            of this many threads, with the number of BLAS threads limited to avoid oversubscription
+            (see `thread_map`)
+        :return: A dictionary of atom name to a dictionary of property name to the predictions
+        """
+        if workers is None:
+            return {
+                atom_name: self.predict_atom(
+                    atom_name, features, chunk_size=chunk_size, precision=precision
+                )
+                for atom_name, features in x_test.items()
+                if atom_name in self.groups
+            }
+
+        precision = Precision(precision)
+        results = self._map_groups(
+            lambda group, x: group.predict(x, precision=precision),
+            x_test,
+            chunk_size,
+            workers,
+        )
+        return {
+            atom_name: {
+                prop: group_predictions[:, i]
+                for group, group_predictions in groups
+                for i, prop in enumerate(group.types)
+            }
+            for atom_name, groups in results.items()
+        }
+
+    def variance(
+        self,
+        x_test: Dict[str, np.ndarray],
+        chunk_size: Optional[int] = None,
+        workers: Optional[int] = None,
+    ) -> Dict[str, Dict[str, np.ndarray]]:
+        """Computes the variance of every model for every atom.
+
+        :param x_test: A dictionary of atom name to the n_test by nfeatures features of the atom
+        :param chunk_size: If given, the variance is computed in chunks of this many points
+        :param workers: If given, the variance of the groups of models (and chunks of test inputs) is computed
+            in a pool of this many threads, see `predict`
+        :return: A dictionary of atom name to a dictionary of property name to the variances
+        """
+        if workers is None:
+            return {
+                atom_name: self.variance_atom(
+                    atom_name, features, chunk_size=chunk_size
+                )
+                for atom_name, features in x_test.items()
+                if atom_name in self.groups
+            }
+
+        results = self._map_groups(
+            lambda group, x: group.variance(x), x_test, chunk_size, workers
+        )
+        return {
+            atom_name: {
+                prop: group_variance
+                for group, group_variance in groups
+                for prop in group.types
+            }
+            for atom_name, groups in results.items()
+        }
+
+    def _ntest(self, x_test: Dict[str, np.ndarray]) -> int:
+        """Returns the number of test points, checking that features are given for every atom"""
+        missing_atoms = [a for a in self.groups.keys() if a not in x_test]
+        if missing_atoms:
+            raise ValueError(f"No test inputs given for atoms {missing_atoms}.")
+
+        ntest = {len(np.atleast_2d(x_test[atom_name])) for atom_name in self.groups}
+        if len(ntest) > 1:
+            raise ValueError(
+                "The test inputs of every atom must have the same number of points."
+            )
+        return ntest.pop() if ntest else 0
+
+    def iter_predict(
+        self,
+        x_test: Dict[str, np.ndarray],
+        chunk_size: int = 10000,
+        precision: Union[Precision, str] = Precision.Double,
+        workers: int = 1,
+    ) -> Iterator[Tuple[slice, np.ndarray]]:
+        """Predicts every property for every atom, one chunk of test points at a time.
+
+        :param x_test: A dictionary of atom name to the n_test by nfeatures features of the atom,
+            features are needed for every atom that there are models for
+        :param chunk_size: The number of test points in every chunk
+        :param precision: The floating point precision of the covariance matrices, see `Precision`
+        :param workers: The number of threads the groups of models of every chunk are predicted with,
+            see `thread_map`
+        :return: Yields tuples of the slice of test points in the chunk and an array of shape
+            (number of points in chunk, number of columns), the order of columns is given by `columns`
+        :raises ValueError: If features are missing for an atom or do not have the same number of points
+        """
+        ntest = self._ntest(x_test)
+        groups = [
+            (atom_name, group)
+            for atom_name, atom_groups in self.groups.items()
+            for group in atom_groups
+        ]
+
+        for rows in batched_slices(ntest, chunk_size):
+            yield rows, np.hstack(
+                thread_map(
+                    lambda atom_group: atom_group[1].predict(
+                        np.atleast_2d(x_test[atom_group[0]])[rows], precision=precision
+                    ),
+                    groups,
+                    workers,
+                )
+            )
+
+    def predict_to_file(
+        self,
+        x_test: Dict[str, np.ndarray],
+        path: Union[str, Path],
+        chunk_size: int = 10000,
+        precision: Union[Precision, str] = Precision.Double,
+        workers: int = 1,
+    ) -> Path:
+        """Predicts every property for every atom and writes the predictions to a file one chunk at a time,
+        so that the memory used does not depend on the number of test points.
+
+        :param x_test: A dictionary of atom name to the n_test by nfeatures features of the atom
+        :param path: The file to write, one of ``.npy``, ``.parquet`` or ``.h5`` (see `get_prediction_sink`)
+        :param chunk_size: The number of test points predicted at a time
+        :param precision: The floating point precision of the covariance matrices, see `Precision`
+        :param workers: The number of threads the groups of models are predicted with, see `iter_predict`
+        :return: The path of the written file
+        """
+        columns = [f"{atom_name}_{prop}" for atom_name, prop in self.columns]
+        ntest = self._ntest(x_test)
+
+        with get_prediction_sink(path, columns, ntest) as sink:
+            for rows, predictions in self.iter_predict(
+                x_test, chunk_size=chunk_size, precision=precision, workers=workers
+            ):
+                sink.write(rows, predictions)
+
+        return Path(path)
+
+    def precision_report(
+        self,
+        precision: Union[Precision, str] = Precision.Single,
+        chunk_size: Optional[int] = None,
+    ) -> List[Dict[str, Union[str, float]]]:
+        """Compares predictions made in single or mixed precision to predictions made in double precision,
+        predicting the training inputs of every model.
+
+        :param precision: The precision to compare to double precision, see `Precision`
+        :param chunk_size: If given, the training inputs are predicted in chunks of this many points
+        :return: A list with a dictionary for every model, containing the atom name, property, the maximum
+            absolute error, the root mean squared error and the maximum absolute error relative to the largest
+            (absolute) double precision prediction
+        """
+        report = []
+        for atom_name, groups in self.groups.items():
+            for group in groups:
+                double = group.predict(group.x, chunk_size=chunk_size)
+                reduced = group.predict(
+                    group.x, chunk_size=chunk_size, precision=precision
+                )
+                error = np.abs(reduced - double)
+                for i, prop in enumerate(group.types):
+                    report.append(
+                        {
+                            "atom": atom_name,
+                            "property": prop,
+                            "max_abs_error": error[:, i].max(),
+                            "rms_error": np.sqrt(np.mean(error[:, i] ** 2)),
+                            "max_rel_error": error[:, i].max()
+                            / max(np.abs(double[:, i]).max(), 1e-300),
+                        }
+                    )
+        return report
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(atoms={self.atom_names}, ngroups={self.ngroups})"
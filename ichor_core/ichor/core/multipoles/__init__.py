@@ -34,6 +34,15 @@ from ichor.core.multipoles.quadrupole import (
     rotate_quadrupole,
     unpack_cartesian_quadrupole,
 )
+from ichor.core.multipoles.rotation import (
+    rotate_dipole_batched,
+    rotate_hexadecapole_batched,
+    rotate_multipoles_batched,
+    rotate_octupole_batched,
+    rotate_quadrupole_batched,
+    rotate_spherical_multipoles,
+    spherical_rotation_matrices,
+)
 
 
 __all__ = [
@@ -65,4 +74,11 @@ __all__ = [
     "get_gaussian_and_aimall_molecular_quadrupole",
     "get_gaussian_and_aimall_molecular_octupole",
     "get_gaussian_and_aimall_molecular_hexadecapole",
+    "rotate_dipole_batched",
+    "rotate_quadrupole_batched",
+    "rotate_octupole_batched",
+    "rotate_hexadecapole_batched",
+    "rotate_multipoles_batched",
+    "rotate_spherical_multipoles",
+    "spherical_rotation_matrices",
 ]
@@ -0,0 +1,182 @@
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+from ichor.core.multipoles.dipole import (
+    dipole_cartesian_to_spherical,
+    dipole_spherical_to_cartesian,
+)
+from ichor.core.multipoles.hexadecapole import (
+    hexadecapole_cartesian_to_spherical,
+    hexadecapole_spherical_to_cartesian,
+)
+from ichor.core.multipoles.octupole import (
+    octupole_cartesian_to_spherical,
+    octupole_spherical_to_cartesian,
+)
+from ichor.core.multipoles.quadrupole import (
+    quadrupole_cartesian_to_spherical,
+    quadrupole_spherical_to_cartesian,
+)
+
+# functions converting between spherical and Cartesian multipole moments for every rank
+_conversion_functions = {
+    1: (dipole_spherical_to_cartesian, dipole_cartesian_to_spherical),
+    2: (quadrupole_spherical_to_cartesian, quadrupole_cartesian_to_spherical),
+    3: (octupole_spherical_to_cartesian, octupole_cartesian_to_spherical),
+    4: (hexadecapole_spherical_to_cartesian, hexadecapole_cartesian_to_spherical),
+}
+
+
+@lru_cache(maxsize=None)
+def _spherical_cartesian_conversion_matrices(
+    rank: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the matrices which convert spherical multipole moments of a rank to Cartesian
+    multipole moments and back. Both conversions are linear, so the matrices are built by converting
+    unit vectors with the (scalar) conversion functions of the rank.
+
+    :param rank: The rank of the multipole moments, 1 (dipole) to 4 (hexadecapole)
+    :return: A tuple of: ``(2 * rank + 1)`` x ``3 ** rank`` matrix converting the flattened Cartesian tensor
+        to spherical moments, and a ``3 ** rank`` x ``(2 * rank + 1)`` matrix converting spherical moments
+        to the flattened Cartesian tensor
+    """
+
+    if rank not in _conversion_functions:
+        raise ValueError(
+            f"Multipole moments can only be rotated for ranks {list(_conversion_functions)}, not {rank}."
+        )
+
+    spherical_to_cartesian, cartesian_to_spherical = _conversion_functions[rank]
+    ncomponents = 2 * rank + 1
+
+    to_cartesian = np.stack(
+        [
+            np.asarray(spherical_to_cartesian(*unit_vector), dtype=float).ravel()
+            for unit_vector in np.eye(ncomponents)
+        ],
+        axis=-1,
+    )
+    to_spherical = np.stack(
+        [
+            np.asarray(
+                cartesian_to_spherical(unit_tensor.reshape((3,) * rank)), dtype=float
+            )
+            for unit_tensor in np.eye(3**rank)
+        ],
+        axis=-1,
+    )
+
+    return to_spherical, to_cartesian
+
+
+def spherical_rotation_matrices(C: np.ndarray, rank: int) -> np.ndarray:
+    """Returns the real rotation matrices (the real-valued equivalent of Wigner D matrices) which
+    rotate spherical multipole moments of a rank, for a stack of C matrices. Rotating the
+    spherical moments ``q`` of the rank with a C matrix is then ``D @ q``, which gives the
+    same result as the ``rotate_dipole``, ``rotate_quadrupole``, etc. functions.
+
+    The matrices can be reused to rotate the multipole moments of many atoms (or properties) which
+    share the same C matrix.
+
+    :param C: An array of shape ``... x 3 x 3`` containing rotation matrices (typically ALF C matrices)
+    :param rank: The rank of the multipole moments, 1 (dipole) to 4 (hexadecapole)
+    :return: An array of shape ``... x (2 * rank + 1) x (2 * rank + 1)``
+    """
+
+    C = np.asarray(C, dtype=float)
+    batch_shape = C.shape[:-2]
+    C = C.reshape(-1, 3, 3)
+
+    to_spherical, to_cartesian = _spherical_cartesian_conversion_matrices(rank)
+    ncomponents = 2 * rank + 1
+
+    # Cartesian tensor of every spherical unit vector, n x ncomponents x 3 x ... x 3
+    rotated = np.broadcast_to(
+        to_cartesian.T.reshape((1, ncomponents) + (3,) * rank),
+        (len(C), ncomponents) + (3,) * rank,
+    )
+    # rotate one index of the Cartesian tensor at a time, the rotated index is moved to the end
+    # so after rotating all indices they are in the original order again
+    for _ in range(rank):
+        rotated = np.einsum("nia,nka...->nk...i", C, rotated)
+
+    D = np.einsum("pc,nkc->npk", to_spherical, rotated.reshape(len(C), ncomponents, -1))
+
+    return D.reshape(batch_shape + (ncomponents, ncomponents))
+
+
+def rotate_spherical_multipoles(
+    multipoles: np.ndarray, C: np.ndarray, rank: int
+) -> np.ndarray:
+    """Rotates spherical multipole moments of one rank for many points (or atoms) at once.
+
+    :param multipoles: An array of shape ``n x (2 * rank + 1)`` containing the spherical multipole moments,
+        in the order of the spherical labels in ``ichor.core.common.constants`` (e.g. q10, q11c, q11s)
+    :param C: An array of shape ``n x 3 x 3`` of rotation matrices, or a single 3 x 3 matrix
+        used to rotate all moments
+    :param rank: The rank of the multipole moments, 1 (dipole) to 4 (hexadecapole)
+    :return: An array of shape ``n x (2 * rank + 1)`` containing the rotated spherical multipole moments
+    """
+
+    D = spherical_rotation_matrices(C, rank)
+    return np.einsum("...pk,...k->...p", D, np.asarray(multipoles, dtype=float))
+
+
+def rotate_dipole_batched(dipoles: np.ndarray, C: np.ndarray) -> np.ndarray:
+    """Batched version of `rotate_dipole`, see `rotate_spherical_multipoles`.
+
+    :param dipoles: ``n x 3`` array of q10, q11c, q11s
+    :param C: ``n x 3 x 3`` array of rotation matrices
+    """
+    return rotate_spherical_multipoles(dipoles, C, 1)
+
+
+def rotate_quadrupole_batched(quadrupoles: np.ndarray, C: np.ndarray) -> np.ndarray:
+    """Batched version of `rotate_quadrupole`, see `rotate_spherical_multipoles`.
+
+    :param quadrupoles: ``n x 5`` array of q20, q21c, q21s, q22c, q22s
+    :param C: ``n x 3 x 3`` array of rotation matrices
+    """
+    return rotate_spherical_multipoles(quadrupoles, C, 2)
+
+
+def rotate_octupole_batched(octupoles: np.ndarray, C: np.ndarray) -> np.ndarray:
+    """Batched version of `rotate_octupole`, see `rotate_spherical_multipoles`.
+
+    :param octupoles: ``n x 7`` array of q30, q31c, ..., q33s
+    :param C: ``n x 3 x 3`` array of rotation matrices
+    """
+    return rotate_spherical_multipoles(octupoles, C, 3)
+
+
+def rotate_hexadecapole_batched(hexadecapoles: np.ndarray, C: np.ndarray) -> np.ndarray:
+    """Batched version of `rotate_hexadecapole`, see `rotate_spherical_multipoles`.
+
+    :param hexadecapoles: ``n x 9`` array of q40, q41c, ..., q44s
+    :param C: ``n x 3 x 3`` array of rotation matrices
+    """
+    return rotate_spherical_multipoles(hexadecapoles, C, 4)
+
+
+def rotate_multipoles_batched(multipoles: np.ndarray, C: np.ndarray) -> np.ndarray:
+    """Rotates all spherical multipole moments (monopole up to hexadecapole) for many points at once.
+
+    :param multipoles: ``n x 25`` array of spherical multipole moments, in the order
+        of ``ichor.core.common.constants.multipole_names`` (q00, q10, q11c, ..., q44s)
+    :param C: ``n x 3 x 3`` array of rotation matrices, or a single 3 x 3 matrix
+    :return: ``n x 25`` array of rotated spherical multipole moments (the monopole is not changed)
+    """
+
+    multipoles = np.asarray(multipoles, dtype=float)
+    rotated = np.empty_like(multipoles)
+
+    # the monopole is not changed by a rotation
+    rotated[..., 0] = multipoles[..., 0]
+    for rank in range(1, 5):
+        components = slice(rank**2, (rank + 1) ** 2)
+        rotated[..., components] = rotate_spherical_multipoles(
+            multipoles[..., components], C, rank
+        )
+
+    return rotated
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from ichor.core.analysis.derivatives_benchmark import (
+    benchmark_feature_derivatives,
+    benchmarked_functions,
+    generate_geometry,
+    nearest_neighbour_alf,
+    scaling_exponents,
+)
+
+
+def test_generate_geometry():
+    coordinates = generate_geometry(20, np.random.default_rng(1), min_distance=1.0)
+    distances = np.linalg.norm(
+        coordinates[:, np.newaxis] - coordinates[np.newaxis], axis=-1
+    )
+    assert coordinates.shape == (20, 3)
+    assert distances[np.triu_indices(20, 1)].min() > 1.0
+
+    system_alf = nearest_neighbour_alf(coordinates)
+    assert [alf.origin_idx for alf in system_alf] == list(range(20))
+    assert all(len(set(alf)) == 3 for alf in system_alf)
+
+
+def test_benchmark_feature_derivatives():
+    results = benchmark_feature_derivatives(natoms=(3, 5), repeats=1, ntrain=20)
+
+    assert list(results.columns) == [
+        "function",
+        "natoms",
+        "latency",
+        "max_abs_error",
+        "max_rel_error",
+    ]
+    assert set(results["function"]) == set(benchmarked_functions)
+    assert (results["latency"] > 0).all()
+    assert (results["max_abs_error"] < 1e-8).all()
+
+    exponents = scaling_exponents(results)
+    assert set(exponents.index) == set(benchmarked_functions)
+
+
+def test_benchmark_unknown_function():
+    with pytest.raises(ValueError):
+        benchmark_feature_derivatives(natoms=(3,), functions=("form_g_matrix",))
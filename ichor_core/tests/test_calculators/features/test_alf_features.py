@@ -1,6 +1,14 @@
 import numpy as np
+import pytest
 from ichor.core.atoms import ALF, Atom, Atoms
-from ichor.core.calculators import calculate_alf_features
+from ichor.core.calculators import (
+    calculate_alf_atom_sequence,
+    calculate_alf_features,
+    calculate_alf_features_batched,
+    calculate_alf_features_derivatives_batched,
+)
+from ichor.core.common.units import AtomicDistance
+from ichor.core.models.gaussian_energy_derivative_wrt_features import form_b_matrix
 
 
 def test_alf_features_calculator():
@@ -126,3 +134,103 @@ def test_alf_features_calculator():
     # should contain the features for all atoms, atoms x nfeatures
     assert features_array.shape == (6, 12)
     np.testing.assert_allclose(features_array, true_features)
+
+
+def test_alf_features_batched_matches_atom_features():
+
+    rng = np.random.default_rng(42)
+
+    for natoms in (2, 3, 4, 9):
+        types = ["C", "H", "O"] * 3
+        geometries = rng.uniform(-3.0, 3.0, size=(5, natoms, 3))
+
+        system_alf = None
+        expected = []
+        for geometry in geometries:
+            atoms = Atoms([Atom(ty, *xyz) for ty, xyz in zip(types, geometry)])
+            if system_alf is None:
+                system_alf = atoms.alf(calculate_alf_atom_sequence)
+            expected.append(atoms.features(calculate_alf_features, system_alf))
+
+        # features are n_atoms x n_timesteps x n_features
+        expected = np.swapaxes(np.array(expected), 0, 1)
+        batched_features = calculate_alf_features_batched(geometries, system_alf)
+
+        assert batched_features.shape == expected.shape
+        np.testing.assert_allclose(batched_features, expected, atol=1e-12)
+
+        # a single geometry gives n_atoms x n_features
+        np.testing.assert_allclose(
+            calculate_alf_features_batched(geometries[0], system_alf),
+            expected[:, 0],
+            atol=1e-12,
+        )
+
+
+def test_alf_features_derivatives_batched():
+
+    rng = np.random.default_rng(7)
+    h = 1e-6
+
+    for natoms in (2, 3, 4, 9):
+        types = ["C", "H", "O"] * 3
+        geometries = rng.uniform(-3.0, 3.0, size=(3, natoms, 3))
+        atoms = Atoms([Atom(ty, *xyz) for ty, xyz in zip(types, geometries[0])])
+        system_alf = atoms.alf(calculate_alf_atom_sequence)
+
+        # n_atoms x n_timesteps x n_features x 3 n_atoms, derivatives are per Bohr
+        b_matrices = calculate_alf_features_derivatives_batched(
+            geometries, system_alf, units=AtomicDistance.Bohr
+        )
+        nfeatures = 1 if natoms == 2 else 3 * natoms - 6
+        assert b_matrices.shape == (natoms, 3, nfeatures, 3 * natoms)
+
+        finite_differences = np.empty_like(b_matrices)
+        for i in range(3 * natoms):
+            displacement = np.zeros(3 * natoms)
+            displacement[i] = h
+            displacement = displacement.reshape(natoms, 3)
+            features_plus_h, features_minus_h = (
+                calculate_alf_features_batched(
+                    geometries + sign * displacement,
+                    system_alf,
+                    units=AtomicDistance.Bohr,
+                )
+                for sign in (1.0, -1.0)
+            )
+            difference = features_plus_h - features_minus_h
+            # phi features are periodic
+            difference[..., 5::3] = (difference[..., 5::3] + np.pi) % (
+                2 * np.pi
+            ) - np.pi
+            finite_differences[..., i] = difference / (2 * h)
+
+        np.testing.assert_allclose(b_matrices, finite_differences, atol=1e-7)
+
+        # the B matrix of a single geometry is the same as the one of the atoms (in Angstroms)
+        atoms = atoms.to_angstroms()
+        np.testing.assert_allclose(
+            calculate_alf_features_derivatives_batched(
+                atoms.coordinates, system_alf, atom_indices=[1]
+            )[0],
+            form_b_matrix(atoms, system_alf, 1),
+        )
+
+
+def test_alf_features_batched_missing_xy_plane():
+
+    rng = np.random.default_rng(3)
+
+    # only a system with 2 atoms has no xy-plane atom
+    geometries = rng.uniform(-3.0, 3.0, size=(2, 2, 3))
+    features = calculate_alf_features_batched(geometries, ALF(0, 1, None))
+    assert features.shape == (1, 2, 1)
+
+    for natoms in (3, 4):
+        geometries = rng.uniform(-3.0, 3.0, size=(2, natoms, 3))
+        with pytest.raises(ValueError, match="index 0"):
+            calculate_alf_features_batched(geometries, ALF(0, 1, None))
+        system_alf = [ALF(i, (i + 1) % natoms, (i + 2) % natoms) for i in range(natoms)]
+        system_alf[0] = ALF(0, 1, None)
+        with pytest.raises(ValueError, match="index 0"):
+            calculate_alf_features_batched(geometries, system_alf)
@@ -0,0 +1,156 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+from ichor.core.calculators import calculate_alf_features
+from ichor.core.database import (
+    get_alf_from_first_db_geometry,
+    get_database_info_from_db_type,
+)
+from ichor.core.database.query_database import (
+    rotate_multipole_moments,
+    write_processed_one_atom_data_to_csv,
+)
+from ichor.core.database.sql import iter_points_from_sqlite_db
+from ichor.core.database.sql.add_to_database import add_points_to_database_bulk
+from ichor.core.database.sql.query_database import get_full_dataframe_for_all_atoms
+from ichor.core.files import PointsDirectory
+from ichor.core.models.gaussian_energy_derivative_wrt_features import (
+    convert_to_feature_forces,
+    form_b_matrix,
+)
+
+from tests.path import get_cwd
+
+example_dir = (
+    get_cwd(__file__)
+    / ".."
+    / ".."
+    / ".."
+    / "example_files"
+    / "example_points_directory"
+    / "WATER_MONOMER.pointsdir"
+)
+
+
+def _read_table(db_path, table: str, columns: str = "*"):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f"SELECT {columns} FROM {table}").fetchall()
+
+
+def test_bulk_sqlite_database(tmp_path):
+
+    points_dir = PointsDirectory(example_dir)
+
+    orm_db = points_dir.write_to_sqlite3_database(
+        tmp_path / "orm", print_missing_data=False, bulk=False
+    )
+    bulk_db = points_dir.write_to_sqlite3_database(
+        tmp_path / "bulk", print_missing_data=False, ncores=2
+    )
+
+    # the bulk ingestion writes the same rows as the ORM
+    assert _read_table(bulk_db, "atom_names") == _read_table(orm_db, "atom_names")
+    assert _read_table(bulk_db, "dataset") == _read_table(orm_db, "dataset")
+    assert _read_table(bulk_db, "points", "id, name, wfn_energy") == _read_table(
+        orm_db, "points", "id, name, wfn_energy"
+    )
+    assert _read_table(bulk_db, "points", "COUNT(*)") == [(4,)]
+    assert _read_table(bulk_db, "dataset", "COUNT(*)") == [(12,)]
+
+    # points are added to an existing database
+    points_dir[:2].write_to_sqlite3_database(bulk_db, print_missing_data=False)
+    assert _read_table(bulk_db, "points", "id, name")[-2:] == [
+        (5, "WATER_MONOMER0000"),
+        (6, "WATER_MONOMER0001"),
+    ]
+    assert _read_table(bulk_db, "dataset", "COUNT(DISTINCT point_id)") == [(6,)]
+
+    # write-ahead logging is only used during the load, also if the load fails
+    assert _read_table(bulk_db, "pragma_journal_mode") == [("delete",)]
+    with pytest.raises(KeyError):
+        add_points_to_database_bulk(bulk_db, [{"name": "WATER_MONOMER0005"}])
+    assert _read_table(bulk_db, "pragma_journal_mode") == [("delete",)]
+    assert _read_table(bulk_db, "points", "COUNT(*)") == [(6,)]
+
+
+def test_sqlite_database_indexes_and_streaming(tmp_path):
+
+    db_path = PointsDirectory(example_dir).write_to_sqlite3_database(
+        tmp_path / "water", print_missing_data=False
+    )
+
+    index_names = [
+        name
+        for name, in _read_table(db_path, "sqlite_master WHERE type = 'index'", "name")
+    ]
+    assert "ix_dataset_atom_id_point_id" in index_names
+    assert "ix_dataset_point_id" in index_names
+
+    full_df = get_full_dataframe_for_all_atoms(db_path)
+
+    # a small chunksize makes the rows of points continue in the next chunk
+    points = list(iter_points_from_sqlite_db(db_path, chunksize=5))
+    assert [point_id for point_id, _ in points] == [1, 2, 3, 4]
+    for point_id, point_df in points:
+        expected = full_df.loc[full_df["id"] == point_id].reset_index(drop=True)
+        pd.testing.assert_frame_equal(point_df.reset_index(drop=True), expected)
+
+    atom_points = list(
+        iter_points_from_sqlite_db(db_path, atom_name="H2", point_id_range=(2, 4))
+    )
+    assert [point_id for point_id, _ in atom_points] == [2, 3]
+    assert all(point_df["atom_name"].tolist() == ["H2"] for _, point_df in atom_points)
+
+
+def test_processed_csv_from_sqlite_database(tmp_path):
+
+    points_dir = PointsDirectory(example_dir)
+    db_path = points_dir.write_to_sqlite3_database(
+        tmp_path / "water", print_missing_data=False
+    )
+
+    alf = get_alf_from_first_db_geometry(db_path, "sqlite")
+    point_ids, atom_names, full_df = get_database_info_from_db_type(db_path, "sqlite")
+    write_processed_one_atom_data_to_csv(
+        full_df,
+        point_ids,
+        "H2",
+        alf,
+        calc_forces=True,
+        parent_directory=tmp_path / "csvs",
+    )
+
+    df = pd.read_csv(tmp_path / "csvs" / "H2_processed_data_alf_2_1_3.csv")
+    assert list(df.columns[:6]) == [
+        "point_id",
+        "point_name",
+        "f1_O1",
+        "f2_H3",
+        "f3_H3",
+        "wfn_energy",
+    ]
+    assert df["point_id"].tolist() == [1, 2, 3, 4]
+
+    # the vectorized features and rotated multipoles are the same as the ones of every point
+    for i, point in enumerate(points_dir):
+        atoms = point.atoms
+        np.testing.assert_allclose(
+            df.loc[i, ["f1_O1", "f2_H3", "f3_H3"]].to_numpy(dtype=float),
+            atoms["H2"].features(calculate_alf_features, alf),
+        )
+        row = full_df.loc[(full_df["id"] == i + 1) & (full_df["atom_name"] == "H2")]
+        local_multipoles = rotate_multipole_moments(row, atoms["H2"].C(alf))
+        np.testing.assert_allclose(
+            df.loc[i, list(local_multipoles)].to_numpy(dtype=float),
+            list(local_multipoles.values()),
+        )
+        feature_forces = convert_to_feature_forces(
+            np.array(list(point.gaussian_output.global_forces.values())),
+            form_b_matrix(atoms, alf, 1),
+        )
+        np.testing.assert_allclose(
+            df.loc[i, ["-dE/df1", "-dE/df2", "-dE/df3"]].to_numpy(dtype=float),
+            feature_forces,
+        )
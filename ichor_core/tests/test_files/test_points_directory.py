@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import numpy as np
@@ -755,3 +756,45 @@ def _test_points_directory(
 def test_water_monomer_point_directory1():
 
     _test_points_directory(example_dir)
+
+
+def test_points_directory_parallel_data():
+
+    point_dir_inst = PointsDirectory(example_dir)
+    raw_data = point_dir_inst.raw_data
+
+    progress = []
+    parallel_raw_data = point_dir_inst.get_raw_data(
+        ncores=2, progress_callback=lambda i, n: progress.append((i, n))
+    )
+
+    # the points are read in the worker processes, but the order of the points is kept
+    assert list(parallel_raw_data.keys()) == list(raw_data.keys())
+    assert _compare_nested_dicts(raw_data, parallel_raw_data) is True
+    assert progress == [(1, 4), (2, 4), (3, 4), (4, 4)]
+
+    # closures can be used as processing functions
+    offset = 1.0
+    wfn_energies = point_dir_inst.processed_data(
+        lambda point, x: point.wfn.total_energy + x + offset, 2.0, ncores=2
+    )
+    np.testing.assert_allclose(
+        list(wfn_energies.values()), point_dir_inst.wfn_energy + 3.0
+    )
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        threaded_raw_data = point_dir_inst.get_raw_data(executor=executor)
+    assert _compare_nested_dicts(raw_data, threaded_raw_data) is True
+
+
+def test_points_directory_iter_chunks():
+
+    point_dir_inst = PointsDirectory(example_dir)
+    chunks = list(point_dir_inst.iter_chunks(3))
+
+    assert [len(chunk) for chunk in chunks] == [3, 1]
+    assert chunks[0].atom_names == point_dir_inst[0].atoms.atom_names
+    np.testing.assert_allclose(
+        np.concatenate([chunk.coordinates for chunk in chunks]),
+        point_dir_inst.coordinates,
+    )
@@ -1,6 +1,9 @@
+import os
+import shutil
 from pathlib import Path
 
 from ichor.core.files import IntDirectory
+from ichor.core.files.file import FileState
 
 from tests.path import get_cwd
 from tests.test_files import _assert_val_optional
@@ -156,3 +159,30 @@ def _test_ints(
 def test_water_ints_dir():
 
     _test_ints(example_dir)
+
+
+def test_ints_dir_cache(tmp_path, monkeypatch):
+
+    int_dir_path = tmp_path / example_dir.name
+    shutil.copytree(example_dir, int_dir_path)
+
+    # the cache is only written if asked to
+    raw_data = IntDirectory(int_dir_path).raw_data
+    assert not (int_dir_path / IntDirectory._cache_name).exists()
+
+    monkeypatch.setattr(IntDirectory, "use_cache", True)
+    assert IntDirectory(int_dir_path).raw_data == raw_data
+    assert (int_dir_path / IntDirectory._cache_name).exists()
+
+    # the cached data is used, so the .int files are not parsed again
+    int_dir_instance = IntDirectory(int_dir_path)
+    assert int_dir_instance.raw_data == raw_data
+    assert all(i.state is FileState.Unread for i in int_dir_instance.ints)
+
+    # .int files which are modified after the cache was written are read again
+    os.utime(int_dir_path / "h2.int", ns=(1, 1))
+    int_dir_instance = IntDirectory(int_dir_path)
+    assert int_dir_instance.raw_data == raw_data
+    assert [i.state for i in int_dir_instance.ints if i.path.name == "h2.int"] == [
+        FileState.Read
+    ]
@@ -0,0 +1,171 @@
+import shutil
+
+import numpy as np
+import pytest
+from ichor.core.atoms import Atom, Atoms
+from ichor.core.files import Trajectory
+from ichor.core.files.file import FileState
+
+from tests.path import get_cwd
+
+example_dir = get_cwd(__file__) / ".." / ".." / ".." / "example_files" / "xyz"
+
+
+def _water_atoms(shift: float = 0.0) -> Atoms:
+    return Atoms(
+        [
+            Atom("O", 0.0 + shift, 0.0, 0.0),
+            Atom("H", 0.96 + shift, 0.0, 0.0),
+            Atom("H", -0.24 + shift, 0.93, 0.0),
+        ]
+    )
+
+
+def test_trajectory_coordinate_block():
+
+    traj = Trajectory(example_dir / "WATER-3000.xyz")
+
+    assert traj.atom_names == ["O1", "H2", "H3"]
+    assert traj.coordinates.shape == (len(traj), 3, 3)
+
+    # timesteps, slices and atom views are views into the same coordinate block
+    timestep = traj[5]
+    assert np.shares_memory(timestep.coordinates, traj.coordinates)
+    assert np.shares_memory(traj[10:20].coordinates, traj.coordinates)
+    assert np.shares_memory(traj["H2"].coordinates, traj.coordinates)
+
+    timestep.centre()
+    np.testing.assert_allclose(traj.coordinates[5].mean(axis=0), 0.0, atol=1e-12)
+
+    np.testing.assert_allclose(traj["H2"].coordinates, traj.coordinates[:, 1])
+    assert traj["H2"][3].name == "H2"
+
+
+def test_trajectory_add_and_write(tmp_path):
+
+    traj = Trajectory(tmp_path / "water.xyz")
+    for i in range(50):
+        traj.add(_water_atoms(shift=float(i)))
+
+    assert len(traj) == 50
+    np.testing.assert_allclose(traj.coordinates[:, 0, 0], np.arange(50))
+
+    # adding the atoms copies the coordinates into the trajectory
+    atoms = _water_atoms()
+    traj.add(atoms)
+    atoms.translate(np.ones(3))
+    np.testing.assert_allclose(traj[-1].coordinates, _water_atoms().coordinates)
+
+    traj.write()
+    read_traj = Trajectory(tmp_path / "water.xyz")
+    assert len(read_traj) == 51
+    np.testing.assert_allclose(read_traj.coordinates, traj.coordinates)
+
+
+def test_atoms_coordinate_block():
+
+    atoms = _water_atoms()
+
+    # the coordinates of every atom are a view into the coordinates of the Atoms instance
+    atoms[1].coordinates += 1.0
+    np.testing.assert_allclose(atoms.coordinates[1], [1.96, 1.0, 1.0])
+
+    # atoms taken from another Atoms instance are copied
+    subset = atoms[[0, 2]]
+    subset[0].coordinates += 5.0
+    np.testing.assert_allclose(atoms.coordinates[0], [0.0, 0.0, 0.0])
+    assert atoms[0].parent is atoms
+
+    del atoms["H2"]
+    assert atoms.atom_names == ["O1", "H3"]
+    np.testing.assert_allclose(atoms.coordinates, [[0.0, 0.0, 0.0], [-0.24, 0.93, 0.0]])
+
+
+def test_lazy_trajectory(tmp_path):
+
+    path = tmp_path / "WATER-3000.xyz"
+    shutil.copy(example_dir / "WATER-3000.xyz", path)
+
+    traj = Trajectory(path)
+    lazy_traj = Trajectory(path, lazy=True)
+
+    assert len(lazy_traj) == len(traj)
+    assert (tmp_path / "WATER-3000.xyz.idx.npz").exists()
+    assert lazy_traj.atom_names == traj.atom_names
+
+    np.testing.assert_allclose(lazy_traj[5000].coordinates, traj.coordinates[5000])
+    np.testing.assert_allclose(lazy_traj[-1].coordinates, traj.coordinates[-1])
+    np.testing.assert_allclose(lazy_traj[10:20].coordinates, traj.coordinates[10:20])
+    np.testing.assert_allclose(lazy_traj[[3, 7]].coordinates, traj.coordinates[[3, 7]])
+
+    # the whole trajectory is only parsed when all coordinates are needed
+    assert lazy_traj._coordinates is None
+    memory_map = lazy_traj._mmap
+    np.testing.assert_allclose(lazy_traj.coordinates, traj.coordinates)
+    # after which the memory map of the file is closed
+    assert memory_map.closed and lazy_traj._mmap is None
+
+    # the memory map is closed when leaving the context, and reopened if needed
+    with Trajectory(path, lazy=True) as lazy_traj:
+        np.testing.assert_allclose(lazy_traj[3].coordinates, traj.coordinates[3])
+        memory_map = lazy_traj._mmap
+    assert memory_map.closed
+    np.testing.assert_allclose(lazy_traj[4].coordinates, traj.coordinates[4])
+    lazy_traj.close()
+
+    # the cached index is rebuilt when the file changes
+    traj[:10].write(path)
+    assert len(Trajectory(path, lazy=True)) == 10
+
+
+def test_trajectory_iter_chunks(tmp_path):
+
+    path = tmp_path / "WATER-3000.xyz"
+    shutil.copy(example_dir / "WATER-3000.xyz", path)
+
+    traj = Trajectory(path)
+    chunks = list(traj.iter_chunks(3000))
+
+    # the chunks are read from a lazy copy, so only the chunks are parsed
+    # and the trajectory itself is not read (and does not become lazy)
+    assert traj._coordinates is None
+    assert traj.state is FileState.Unread and not traj._lazy
+    assert [len(chunk) for chunk in chunks] == [3000, 3000, 3000, 1001]
+    assert chunks[0].atom_names == ["O1", "H2", "H3"]
+    np.testing.assert_allclose(
+        np.concatenate([chunk.coordinates for chunk in chunks]),
+        Trajectory(path).coordinates,
+    )
+
+    with pytest.raises(ValueError):
+        traj.iter_chunks(0)
+
+    # timesteps of the trajectory can still be modified in place after iterating in chunks
+    traj[0].coordinates[:] += 1.0
+    np.testing.assert_allclose(traj[0].coordinates, chunks[0][0].coordinates + 1.0)
+
+
+def test_trajectory_to_dirs(tmp_path):
+
+    traj = Trajectory(tmp_path / "water.xyz")
+    for i in range(20):
+        traj.add(_water_atoms(shift=float(i)))
+
+    root = traj.to_dirs(
+        "water", split_size=3, every=2, center=True, parent_dir=tmp_path
+    )
+
+    xyz_files = sorted(root.glob("*/*.xyz"))
+    assert len(list(root.iterdir())) == 4
+    assert [f.name for f in xyz_files][:2] == ["WATER0000.xyz", "WATER0001.xyz"]
+    assert len(xyz_files) == 10
+    # centering the written geometries does not modify the trajectory
+    np.testing.assert_allclose(traj.coordinates[:, 0, 0], np.arange(20))
+
+    # a trajectory which has not been read is written in chunks without reading it
+    traj.write(tmp_path / "water.xyz")
+    unread_traj = Trajectory(tmp_path / "water.xyz")
+    root = unread_traj.to_dirs("water2", split_size=3, every=2, parent_dir=tmp_path)
+    assert len(sorted(root.glob("*/*.xyz"))) == 10
+    assert unread_traj.state is FileState.Unread
+    assert unread_traj._coordinates is None
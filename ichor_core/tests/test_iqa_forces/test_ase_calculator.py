@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from ase import Atoms as AseAtoms
+from ase.calculators.fd import calculate_numerical_forces
+from ase.md.verlet import VelocityVerlet
+from ase.units import Bohr, fs, Hartree
+from ichor.core.common.units import AtomicDistance
+from ichor.core.models import FFLUXCalculator, FFLUXInferenceService
+
+from tests.path import get_cwd
+from tests.test_iqa_forces.test_batched_forces import _ammonia
+
+example_dir = get_cwd(__file__) / ".." / ".." / ".." / "example_files"
+
+
+def test_ase_calculator():
+
+    atoms = _ammonia()
+    service = FFLUXInferenceService(example_dir / "models")
+    ase_atoms = AseAtoms("NH3", positions=atoms.coordinates)
+    ase_atoms.calc = FFLUXCalculator(service)
+
+    energy, forces = service.predict(atoms.coordinates, units=AtomicDistance.Angstroms)
+    assert ase_atoms.get_potential_energy() == pytest.approx(energy * Hartree)
+    np.testing.assert_allclose(
+        ase_atoms.get_forces(), forces * Hartree / Bohr, atol=1e-10
+    )
+    np.testing.assert_allclose(
+        ase_atoms.get_forces(),
+        calculate_numerical_forces(ase_atoms, eps=1e-4),
+        atol=1e-5,
+    )
+
+    # total energy is conserved in a short NVE run
+    ase_atoms.set_velocities(np.random.default_rng(0).normal(scale=0.002, size=(4, 3)))
+    total_energy = ase_atoms.get_total_energy()
+    VelocityVerlet(ase_atoms, 0.1 * fs).run(100)
+    assert ase_atoms.get_total_energy() == pytest.approx(total_energy, abs=2e-3)
+
+    with pytest.raises(ValueError):
+        wrong_atoms = AseAtoms("OH3", positions=atoms.coordinates)
+        wrong_atoms.calc = FFLUXCalculator(service)
+        wrong_atoms.get_potential_energy()
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from ichor.core.atoms import Atom, Atoms
+from ichor.core.calculators import calculate_alf_atom_sequence
+from ichor.core.common.constants import ang2bohr
+from ichor.core.common.units import AtomicDistance
+from ichor.core.models.models import Models
+from ichor.core.models.predict_forces_for_all_atoms import (
+    predict_fflux_energies_and_forces_batched,
+    predict_fflux_forces_for_all_atoms,
+)
+
+from tests.path import get_cwd
+
+example_dir = get_cwd(__file__) / ".." / ".." / ".." / "example_files"
+
+
+def _ammonia() -> Atoms:
+    return Atoms(
+        [
+            Atom("N", 0.0, 0.0, 0.11),
+            Atom("H", 0.0, 0.94, -0.27),
+            Atom("H", 0.81, -0.47, -0.25),
+            Atom("H", -0.83, -0.46, -0.28),
+        ]
+    )
+
+
+def test_batched_forces():
+
+    atoms = _ammonia()
+    models = Models(example_dir / "models")
+    system_alf = atoms.alf_list(calculate_alf_atom_sequence)
+
+    rng = np.random.default_rng(0)
+    geometries = atoms.coordinates + rng.normal(scale=0.02, size=(5, 4, 3))
+
+    energies, forces = predict_fflux_energies_and_forces_batched(
+        geometries,
+        models,
+        system_alf,
+        atoms.atom_names,
+        units=AtomicDistance.Angstroms,
+    )
+    assert energies.shape == (5,) and forces.shape == (5, 4, 3)
+
+    # every geometry gives the same result on its own or in chunks
+    _, chunked_forces = predict_fflux_energies_and_forces_batched(
+        geometries * ang2bohr, models, system_alf, atoms.atom_names, chunk_size=2
+    )
+    np.testing.assert_allclose(chunked_forces, forces, atol=1e-12)
+    single_geometry = Atoms(
+        [Atom(a.type, *xyz) for a, xyz in zip(atoms, geometries[1])]
+    )
+    np.testing.assert_allclose(
+        predict_fflux_forces_for_all_atoms(single_geometry, models, system_alf),
+        forces[1],
+        atol=1e-12,
+    )
+
+    # forces are the negative derivatives of the energy with respect to the coordinates (in Bohr)
+    h = 1e-5
+    coordinates = geometries[0] * ang2bohr
+    finite_difference = np.zeros((4, 3))
+    for i in range(4):
+        for j in range(3):
+            displaced = np.array([coordinates, coordinates])
+            displaced[0, i, j] += h
+            displaced[1, i, j] -= h
+            e, _ = predict_fflux_energies_and_forces_batched(
+                displaced, models, system_alf, atoms.atom_names
+            )
+            finite_difference[i, j] = -(e[0] - e[1]) / (2 * h)
+    np.testing.assert_allclose(forces[0], finite_difference, atol=1e-6)
+
+    with pytest.raises(ValueError):
+        predict_fflux_energies_and_forces_batched(
+            geometries, models, system_alf, ["N1", "H2", "H3", "O4"]
+        )
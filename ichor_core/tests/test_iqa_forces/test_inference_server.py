@@ -0,0 +1,110 @@
+import socket
+import struct
+
+import numpy as np
+import pytest
+from ichor.core.calculators import calculate_alf_atom_sequence
+from ichor.core.common.units import AtomicDistance
+from ichor.core.models import FFLUXInferenceService
+from ichor.core.models.inference_server import FFLUXInferenceClient
+from ichor.core.models.models import Models
+from ichor.core.models.predict_forces_for_all_atoms import (
+    predict_fflux_energies_and_forces_batched,
+)
+
+from tests.path import get_cwd
+from tests.test_iqa_forces.test_batched_forces import _ammonia
+
+example_dir = get_cwd(__file__) / ".." / ".." / ".." / "example_files"
+
+
+def test_inference_service(tmp_path):
+
+    atoms = _ammonia()
+    models = Models(example_dir / "models")
+    system_alf = atoms.alf_list(calculate_alf_atom_sequence)
+    service = FFLUXInferenceService(
+        models, atom_names=atoms.atom_names, system_alf=system_alf
+    )
+
+    rng = np.random.default_rng(0)
+    geometries = atoms.coordinates + rng.normal(scale=0.02, size=(5, 4, 3))
+
+    expected_energies, expected_forces = predict_fflux_energies_and_forces_batched(
+        geometries,
+        models,
+        system_alf,
+        atoms.atom_names,
+        units=AtomicDistance.Angstroms,
+    )
+    energies, forces = service.predict(geometries, units=AtomicDistance.Angstroms)
+    np.testing.assert_allclose(energies, expected_energies, atol=1e-10)
+    np.testing.assert_allclose(forces, expected_forces, atol=1e-10)
+
+    energy, single_forces = service.predict(
+        geometries[2], units=AtomicDistance.Angstroms
+    )
+    assert isinstance(energy, float)
+    np.testing.assert_allclose(single_forces, forces[2], atol=1e-12)
+
+    assert service.variance(geometries, units=AtomicDistance.Angstroms).shape == (5, 4)
+
+    with pytest.raises(ValueError):
+        service.predict(geometries[:, :3])
+
+    # the same predictions are served over a Unix socket
+    socket_path = tmp_path / "fflux.sock"
+    server = service.serve(socket_path)
+    try:
+        with FFLUXInferenceClient(socket_path) as client:
+            served_energies, served_forces = client.predict(
+                geometries, units=AtomicDistance.Angstroms
+            )
+            np.testing.assert_allclose(served_energies, energies, atol=1e-12)
+            np.testing.assert_allclose(served_forces, forces, atol=1e-12)
+
+            with pytest.raises(RuntimeError):
+                client.predict(geometries[:, :3])
+            served_energy, _ = client.predict(
+                geometries[2], units=AtomicDistance.Angstroms
+            )
+            assert served_energy == pytest.approx(energy)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert not socket_path.exists()
+
+
+def test_inference_server_clients(tmp_path):
+
+    atoms = _ammonia()
+    service = FFLUXInferenceService(example_dir / "models")
+    energy, forces = service.predict(atoms.coordinates, units=AtomicDistance.Angstroms)
+
+    socket_path = tmp_path / "fflux.sock"
+    server = service.serve(socket_path)
+    try:
+        # a client which stays connected does not block other clients
+        with FFLUXInferenceClient(socket_path, timeout=30) as first:
+            first.predict(atoms.coordinates, units=AtomicDistance.Angstroms)
+            with FFLUXInferenceClient(socket_path, timeout=30) as second:
+                served_energy, served_forces = second.predict(
+                    atoms.coordinates, units=AtomicDistance.Angstroms
+                )
+            assert served_energy == pytest.approx(energy)
+            np.testing.assert_allclose(served_forces, forces, atol=1e-12)
+            first.predict(atoms.coordinates, units=AtomicDistance.Angstroms)
+
+        # messages which are too large are rejected without being read
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(30)
+            sock.connect(str(socket_path))
+            sock.sendall(struct.pack("!Q", 2**62))
+            with sock.makefile("rb") as f:
+                status, nbytes = struct.unpack("!BQ", f.read(9))
+                assert status != 0
+                assert b"ValueError" in f.read(nbytes)
+                assert f.read() == b""
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,101 @@
+import numpy as np
+from ichor.core.models import Model
+from ichor.core.models.calculate_fflux_derivatives import (
+    fflux_kernel_parameters,
+    fflux_predict_value,
+    fflux_predict_value_rbf_only,
+    fflux_predict_values,
+)
+from ichor.core.models.kernels import RBF
+
+from tests.path import get_cwd
+
+example_dir = get_cwd(__file__) / ".." / ".." / ".." / "example_files" / "models"
+
+
+def _predict_value_loop(x_train, weights, mean, thetas, periodic, x_test):
+    """Reference implementation, looping over training points and features"""
+    Q_est = 0.0
+    dQ_df = np.zeros(len(x_test))
+    for j in range(len(x_train)):
+        expo = 0.0
+        dQ_df_temp = np.zeros(len(x_test))
+        for h in range(len(x_test)):
+            fdiff = x_train[j, h] - x_test[h]
+            if periodic[h]:
+                expo += 4.0 * thetas[h] * np.sin(fdiff / 2.0) ** 2
+                dQ_df_temp[h] = weights[j] * 2.0 * thetas[h] * np.sin(fdiff)
+            else:
+                expo += thetas[h] * fdiff * fdiff
+                dQ_df_temp[h] = weights[j] * 2.0 * thetas[h] * fdiff
+        Q_est += weights[j] * np.exp(-expo)
+        dQ_df += np.exp(-expo) * dQ_df_temp
+    return Q_est + mean, dQ_df
+
+
+def test_fflux_predict_value():
+
+    model = Model(example_dir / "AMMONIA_iqa_N1.model")
+    rng = np.random.default_rng(0)
+    x_test = model.x[:5] + rng.normal(scale=0.05, size=(5, model.nfeats))
+    mean = model.mean.value(x_test[:1]).item()
+
+    thetas, periodic = fflux_kernel_parameters(model)
+    np.testing.assert_array_equal(np.flatnonzero(periodic), [5])
+    assert fflux_kernel_parameters(model)[0] is thetas
+
+    Q, dQ_df = fflux_predict_values(model, x_test)
+    assert Q.shape == (5,) and dQ_df.shape == (5, model.nfeats)
+
+    for x, q, dq in zip(x_test, Q, dQ_df):
+        expected_q, expected_dq = _predict_value_loop(
+            model.x, np.ravel(model.weights), mean, thetas, periodic, x
+        )
+        single_q, single_dq = fflux_predict_value(model, x)
+        assert isinstance(single_q, float)
+        np.testing.assert_allclose([q, single_q], expected_q, rtol=1e-12)
+        np.testing.assert_allclose(dq, expected_dq, rtol=1e-12, atol=1e-12)
+        np.testing.assert_allclose(single_dq, dq, rtol=1e-12, atol=1e-12)
+
+    # the derivatives agree with finite differences of the predictions
+    h = 1e-6
+    finite_difference = [
+        (
+            fflux_predict_value(model, x_test[0] + h * e)[0]
+            - fflux_predict_value(model, x_test[0] - h * e)[0]
+        )
+        / (2 * h)
+        for e in np.eye(model.nfeats)
+    ]
+    np.testing.assert_allclose(dQ_df[0], finite_difference, rtol=1e-5, atol=1e-6)
+
+
+def test_fflux_predict_value_rbf_only():
+
+    example_model = Model(example_dir / "AMMONIA_iqa_N1.model")
+    thetas, _ = fflux_kernel_parameters(example_model)
+    model = Model(
+        "rbf_only.model",
+        kernel=RBF("k1", thetas.copy()),
+        mean=example_model.mean,
+        x=example_model.x,
+        weights=example_model.weights,
+        use_binary=False,
+    )
+    x_test = model.x[:3] + 0.01
+    mean = model.mean.value(x_test[:1]).item()
+    no_periodic = np.zeros(model.x.shape[1], dtype=bool)
+
+    for x in x_test:
+        expected_q, expected_dq = _predict_value_loop(
+            model.x, np.ravel(model.weights), mean, thetas, no_periodic, x
+        )
+        q, dq = fflux_predict_value_rbf_only(model, x)
+        np.testing.assert_allclose(q, expected_q, rtol=1e-12)
+        np.testing.assert_allclose(dq, expected_dq, rtol=1e-12, atol=1e-12)
+
+    # parameters are recomputed when the hyperparameters change
+    model.kernel._thetas = 2 * thetas
+    np.testing.assert_allclose(
+        fflux_kernel_parameters(model, rbf_only=True)[0], 2 * thetas
+    )
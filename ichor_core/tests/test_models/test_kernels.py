@@ -0,0 +1,67 @@
+import numpy as np
+from ichor.core.models import Model
+from ichor.core.models.kernels import PeriodicKernel, RBF, RBFCyclic
+from ichor.core.models.kernels.kernel import KernelProd, KernelSum
+
+from tests.path import get_cwd
+
+example_dir = get_cwd(__file__) / ".." / ".." / ".." / "example_files" / "models"
+
+
+def test_model_kernel_is_fused():
+
+    model = Model(example_dir / "AMMONIA_iqa_N1.model")
+    kernel = model.kernel
+    assert kernel._fused is not None
+
+    x = model.x
+    x_test = x[:100] + 0.05
+    np.testing.assert_allclose(
+        kernel.r(x, x_test), kernel.k1.r(x, x_test) * kernel.k2.r(x, x_test), atol=1e-12
+    )
+    np.testing.assert_allclose(kernel.R(x), kernel.k1.R(x) * kernel.k2.R(x), atol=1e-12)
+
+    # changes to the hyperparameters are picked up
+    kernel.k2._thetas = 2.0 * kernel.k2._thetas
+    np.testing.assert_allclose(
+        kernel.r(x, x_test), kernel.k1.r(x, x_test) * kernel.k2.r(x, x_test), atol=1e-12
+    )
+
+
+def test_fused_stationary_product():
+
+    rng = np.random.default_rng(0)
+    x1 = rng.uniform(-np.pi, np.pi, size=(30, 9))
+    x2 = rng.uniform(-np.pi, np.pi, size=(20, 9))
+
+    kernel = KernelProd(
+        KernelProd(
+            RBF("k1", rng.uniform(0.1, 1.0, 3), active_dims=np.array([0, 1, 3])),
+            RBFCyclic(
+                "k2", rng.uniform(0.1, 1.0, 6), active_dims=np.array([2, 4, 5, 6, 7, 8])
+            ),
+        ),
+        PeriodicKernel(
+            "k3",
+            rng.uniform(0.1, 1.0, 2),
+            np.full(2, 2 * np.pi),
+            active_dims=np.array([5, 8]),
+        ),
+    )
+    expected = kernel.k(x1, x2)
+    assert kernel.compile() is kernel
+    assert kernel._fused is not None
+    np.testing.assert_allclose(kernel.k(x1, x2), expected, atol=1e-12)
+
+    # sums are not fused, but the products inside are
+    kernel = KernelSum(
+        KernelProd(
+            RBF("k1", np.array([0.5]), active_dims=np.array([0])),
+            RBF("k2", np.array([0.2]), active_dims=np.array([1])),
+        ),
+        RBF("k3", np.array([0.3, 0.4]), active_dims=np.array([0, 1])),
+    )
+    expected = kernel.R(x1)
+    kernel.compile()
+    assert kernel._fused is None and kernel.k1._fused is not None
+    np.testing.assert_allclose(kernel.R(x1), expected, atol=1e-12)
@@ -0,0 +1,136 @@
+import shutil
+
+import numpy as np
+import pytest
+from ichor.core.models import Model
+
+from tests.path import get_cwd
+
+example_dir = get_cwd(__file__) / ".." / ".." / ".." / "example_files" / "models"
+
+
+def test_model_cholesky_cache():
+
+    model = Model(example_dir / "AMMONIA_iqa_N1.model")
+    R = model.R
+    L = np.linalg.cholesky(R)
+    x_test = model.x[:50] + 0.01
+
+    np.testing.assert_allclose(model.lower_cholesky, L, atol=1e-8)
+    np.testing.assert_allclose(model.logdet, np.linalg.slogdet(R)[1])
+
+    v = np.linalg.solve(L, model.r(x_test))
+    np.testing.assert_allclose(
+        model.variance(x_test), 1.0 - np.diag(v.T @ v), atol=1e-8
+    )
+
+    # the factorization is only computed once
+    factor = model._cholesky()
+    model.variance(x_test)
+    model.compute_likelihood()
+    assert model._cholesky() is factor
+
+    # and is recomputed when the jitter, training inputs or hyperparameters change
+    model.jitter = 1e-6
+    assert model._cholesky() is not factor
+    np.testing.assert_allclose(
+        model.lower_cholesky, np.linalg.cholesky(model.R), atol=1e-8
+    )
+
+    factor = model._cholesky()
+    model.x = model.x[:100]
+    model.ntrain = 100
+    assert model.lower_cholesky.shape == (100, 100)
+
+    factor = model._cholesky()
+    model.kernel.k1._thetas = 2.0 * model.kernel.k1._thetas
+    assert model._cholesky() is not factor
+
+    factor = model._cholesky()
+    model.clear_cache()
+    assert model._cholesky() is not factor
+
+
+def test_model_binary_copy(tmp_path):
+
+    path = tmp_path / "AMMONIA_iqa_N1.model"
+    shutil.copy(example_dir / "AMMONIA_iqa_N1.model", path)
+
+    text_model = Model(path, use_binary=False)
+    text_model.read()
+    assert not text_model.binary_path.exists()
+
+    # the binary copy is only written when reading the model file if asked to
+    Model(path).read()
+    assert not text_model.binary_path.exists()
+    Model(path, write_binary_on_read=True).read()
+    assert text_model.binary_path.exists()
+
+    binary_model = Model(path)
+    binary_model.read()
+    assert isinstance(binary_model.x, np.memmap)
+    for attr in ["atom_name", "prop", "alf", "ntrain", "nfeats", "jitter"]:
+        assert getattr(binary_model, attr) == getattr(text_model, attr)
+    np.testing.assert_array_equal(binary_model.x, text_model.x)
+    np.testing.assert_array_equal(binary_model.weights, text_model.weights)
+    x_test = text_model.x[:10] + 0.01
+    np.testing.assert_array_equal(
+        binary_model.predict(x_test), text_model.predict(x_test)
+    )
+
+    # the binary copy is not used once the model file changes
+    new_path = tmp_path / "new.model"
+    text_model.weights = 2.0 * text_model.weights
+    text_model.write(new_path, binary=False)
+    shutil.copy(new_path, path)
+    model = Model(path)
+    model.read()
+    assert not isinstance(model.x, np.memmap)
+    np.testing.assert_allclose(model.weights, text_model.weights)
+
+    # the training inputs file is removed when the training inputs of the binary copy change
+    x_files = list(tmp_path.glob(".x_*.npy"))
+    model.x = model.x[:-1]
+    model.write_binary()
+    new_x_files = list(tmp_path.glob(".x_*.npy"))
+    assert len(x_files) == len(new_x_files) == 1 and x_files != new_x_files
+
+
+def test_model_add_training_points():
+
+    full_model = Model(example_dir / "AMMONIA_iqa_N1.model")
+    x, y = full_model.x, full_model.y
+
+    model = Model(example_dir / "AMMONIA_iqa_N1.model")
+    model.read()
+    model.x = x[:450]
+    model.y = y[:450]
+    model.ntrain = 450
+    model.compute_weights()
+
+    model.add_training_points(x[450:480], y[450:480])
+    model.add_training_points(x[480], y[480])
+    model.add_training_points(x[481:], y[481:])
+
+    assert model.ntrain == full_model.ntrain
+    np.testing.assert_array_equal(model.x, x)
+    np.testing.assert_allclose(
+        model.lower_cholesky, np.linalg.cholesky(full_model.R), atol=1e-8
+    )
+    # R is badly conditioned, so compare the predictions rather than the weights themselves
+    full_model.weights = full_model.compute_weights()
+    x_test = x[:50] + 0.01
+    np.testing.assert_allclose(
+        model.predict(x_test), full_model.predict(x_test), atol=1e-8
+    )
+    np.testing.assert_allclose(model.likelihood, full_model.compute_likelihood())
+
+    # the extended factorization is cached and is not recomputed
+    factor = model._cholesky()
+    model.compute_likelihood()
+    assert model._cholesky() is factor
+
+    with pytest.raises(ValueError):
+        model.add_training_points(x[:2, :3], y[:2])
+    with pytest.raises(ValueError):
+        model.add_training_points(x[:2], y[:3])
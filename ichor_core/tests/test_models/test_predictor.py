@@ -0,0 +1,230 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ichor.core.common.parallel import limit_blas_threads
+from ichor.core.models import Model, Models, ModelsPredictor, Precision
+
+from tests.path import get_cwd
+
+example_dir = get_cwd(__file__) / ".." / ".." / ".." / "example_files" / "models"
+
+
+def _model_with_weights(model: Model, prop: str, weights: np.ndarray) -> Model:
+    return Model(
+        example_dir / f"{model.system_name}_{prop}_{model.atom_name}.model",
+        system_name=model.system_name,
+        atom_name=model.atom_name,
+        prop=prop,
+        alf=model.alf,
+        natoms=model.natoms,
+        ntrain=model.ntrain,
+        nfeats=model.nfeats,
+        mean=model.mean,
+        kernel=model.kernel,
+        x=model.x,
+        y=model.y,
+        jitter=model.jitter,
+        weights=weights,
+    )
+
+
+def test_models_predictor():
+
+    models = Models(example_dir)
+    rng = np.random.default_rng(0)
+
+    # models of the same atom with the same training inputs and kernel are grouped together
+    for model in list(models):
+        for prop in ["q00", "q10"]:
+            models.append(
+                _model_with_weights(model, prop, rng.normal(size=model.weights.shape))
+            )
+
+    predictor = models.predictor
+    assert isinstance(predictor, ModelsPredictor)
+    assert predictor.ngroups == 4
+    assert sorted(predictor.atom_names) == ["H2", "H3", "H4", "N1"]
+
+    x_test = {
+        atom: models[atom][0].x[:20] + rng.normal(scale=0.01, size=(20, 6))
+        for atom in models.atom_names
+    }
+    predictions = models.predict(x_test)
+    variances = models.variance(x_test)
+
+    for atom in models.atom_names:
+        for model in models[atom]:
+            np.testing.assert_allclose(
+                predictions[atom][model.type], model.predict(x_test[atom])
+            )
+            np.testing.assert_allclose(
+                variances[atom][model.type], model.variance(x_test[atom])
+            )
+
+    # the predictor is rebuilt when models are removed
+    models.pop()
+    assert models.predictor is not predictor
+
+
+def test_models_predictor_after_model_changes():
+
+    models = Models(example_dir)
+    rng = np.random.default_rng(0)
+    x_test = {
+        atom: models[atom][0].x[:20] + rng.normal(scale=0.01, size=(20, 6))
+        for atom in models.atom_names
+    }
+    models.predict(x_test)
+
+    # the predictor is rebuilt when the training data or weights of a model change
+    model = models["N1"][0]
+    model.add_training_points(x_test["N1"][:2] + 0.05, model.y[:2])
+    predictions = models.predict(x_test)
+    np.testing.assert_allclose(predictions["N1"]["iqa"], model.predict(x_test["N1"]))
+
+    model.weights = model.weights * 2.0
+    predictions = models.predict(x_test)
+    np.testing.assert_allclose(predictions["N1"]["iqa"], model.predict(x_test["N1"]))
+
+    # models with different jitter are not grouped together
+    models.append(_model_with_weights(model, "q00", model.weights))
+    models[-1].jitter = model.jitter * 10
+    assert models.predictor.ngroups == 5
+
+
+def test_models_chunked_prediction(tmp_path):
+
+    models = Models(example_dir)
+    rng = np.random.default_rng(1)
+    x_test = {
+        atom: models[atom][0].x[:101] + rng.normal(scale=0.01, size=(101, 6))
+        for atom in models.atom_names
+    }
+
+    predictions = models.predict(x_test)
+    chunked_predictions = models.predict(x_test, chunk_size=25)
+    for atom in models.atom_names:
+        np.testing.assert_allclose(
+            chunked_predictions[atom]["iqa"], predictions[atom]["iqa"]
+        )
+        np.testing.assert_allclose(
+            models[atom][0].variance(x_test[atom], chunk_size=7),
+            models[atom][0].variance(x_test[atom]),
+            atol=1e-12,
+        )
+
+    npy_path = models.predict(x_test, chunk_size=25, sink=tmp_path / "pred.npy")
+    parquet_path = models.predict(x_test, chunk_size=25, sink=tmp_path / "pred.parquet")
+    npy_predictions = np.load(npy_path)
+    parquet_predictions = pd.read_parquet(parquet_path)
+
+    assert npy_predictions.shape == (101, 4)
+    for i, (atom, prop) in enumerate(models.predictor.columns):
+        np.testing.assert_allclose(npy_predictions[:, i], predictions[atom][prop])
+        np.testing.assert_allclose(
+            parquet_predictions[f"{atom}_{prop}"], predictions[atom][prop]
+        )
+
+    with pytest.raises(ValueError):
+        models.predict(x_test, sink=tmp_path / "pred.txt")
+
+
+def test_models_share_training_data(tmp_path):
+
+    model = Model(example_dir / "AMMONIA_iqa_N1.model")
+    for prop in ["iqa", "q00", "q10"]:
+        _model_with_weights(model, prop, model.weights).write(tmp_path)
+
+    # the training inputs are only stored once
+    assert len(list(tmp_path.glob(".x_*.npy"))) == 1
+    assert len(list(tmp_path.glob("*.model.npz"))) == 3
+
+    # and are shared by all models read from the binary copies
+    models = Models(tmp_path)
+    assert len({id(model.x) for model in models}) == 1
+
+    # models read from the model files share their training inputs once they are compared
+    models = Models(tmp_path)
+    for model in models:
+        model.use_binary = False
+    assert len({id(model.x) for model in models}) == 3
+    assert models.share_training_data() == 1
+    assert len({id(model.x) for model in models}) == 1
+    np.testing.assert_array_equal(models[0].x, model.x)
+
+
+def test_models_reduced_precision():
+
+    models = Models(example_dir)
+    rng = np.random.default_rng(2)
+    x_test = {
+        atom: models[atom][0].x[:50] + rng.normal(scale=0.01, size=(50, 6))
+        for atom in models.atom_names
+    }
+    predictions = models.predict(x_test)
+
+    for precision in [Precision.Single, "mixed"]:
+        reduced_predictions = models.predict(x_test, precision=precision)
+        for atom in models.atom_names:
+            np.testing.assert_allclose(
+                reduced_predictions[atom]["iqa"], predictions[atom]["iqa"], atol=1e-3
+            )
+            np.testing.assert_allclose(
+                models[atom][0].predict(
+                    x_test[atom], chunk_size=20, precision=precision
+                ),
+                predictions[atom]["iqa"],
+                atol=1e-3,
+            )
+
+        report = models.precision_report(precision)
+        assert list(report.columns) == [
+            "atom",
+            "property",
+            "max_abs_error",
+            "rms_error",
+            "max_rel_error",
+        ]
+        assert len(report) == len(models)
+        assert (report["max_abs_error"] < 1e-3).all()
+
+    with pytest.raises(ValueError):
+        models.predict(x_test, precision="half")
+
+
+def test_models_threaded_prediction(tmp_path):
+
+    models = Models(example_dir)
+    rng = np.random.default_rng(3)
+    x_test = {
+        atom: models[atom][0].x[:61] + rng.normal(scale=0.01, size=(61, 6))
+        for atom in models.atom_names
+    }
+
+    predictions = models.predict(x_test)
+    variances = models.variance(x_test)
+    for chunk_size in [None, 16]:
+        threaded_predictions = models.predict(x_test, chunk_size=chunk_size, workers=3)
+        threaded_variances = models.variance(x_test, chunk_size=chunk_size, workers=3)
+        pd.testing.assert_frame_equal(
+            threaded_predictions[predictions.columns], predictions
+        )
+        pd.testing.assert_frame_equal(threaded_variances[variances.columns], variances)
+
+    npy_path = models.predict(
+        x_test, chunk_size=25, sink=tmp_path / "pred.npy", workers=2
+    )
+    for i, (atom, prop) in enumerate(models.predictor.columns):
+        np.testing.assert_allclose(np.load(npy_path)[:, i], predictions[atom][prop])
+
+    with pytest.raises(ValueError):
+        models.predict(x_test, workers=0)
+
+
+def test_limit_blas_threads():
+
+    threadpoolctl = pytest.importorskip("threadpoolctl")
+    with limit_blas_threads(1):
+        for info in threadpoolctl.threadpool_info():
+            if info["user_api"] == "blas":
+                assert info["num_threads"] == 1
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from ichor.core.files import IntDirectory
+from ichor.core.multipoles import (
+    rotate_dipole,
+    rotate_hexadecapole,
+    rotate_multipoles_batched,
+    rotate_octupole,
+    rotate_quadrupole,
+    spherical_rotation_matrices,
+)
+
+from tests.path import get_cwd
+
+example_dir = get_cwd(__file__) / ".." / ".." / ".." / "example_files"
+
+
+def _random_rotation_matrices(n: int, rng: np.random.Generator) -> np.ndarray:
+    q, r = np.linalg.qr(rng.normal(size=(n, 3, 3)))
+    # make the rotations unique and proper (determinant of 1)
+    q *= np.sign(np.diagonal(r, axis1=-2, axis2=-1))[:, None, :]
+    q[np.linalg.det(q) < 0, :, 0] *= -1
+    return q
+
+
+def test_rotate_multipoles_batched():
+
+    rng = np.random.default_rng(42)
+    C = _random_rotation_matrices(20, rng)
+    multipoles = rng.normal(size=(20, 25))
+
+    rotated = rotate_multipoles_batched(multipoles, C)
+
+    for m, c, r in zip(multipoles, C, rotated):
+        expected = np.concatenate(
+            [
+                m[:1],
+                rotate_dipole(*m[1:4], c),
+                rotate_quadrupole(*m[4:9], c),
+                rotate_octupole(*m[9:16], c),
+                rotate_hexadecapole(*m[16:25], c),
+            ]
+        )
+        np.testing.assert_allclose(r, expected, atol=1e-12)
+
+    # a single C matrix can be used for a single point
+    np.testing.assert_allclose(
+        rotate_multipoles_batched(multipoles[0], C[0]), rotated[0], atol=1e-12
+    )
+
+    # rotation matrices of spherical moments are orthogonal
+    for rank in range(1, 5):
+        D = spherical_rotation_matrices(C, rank)
+        assert D.shape == (20, 2 * rank + 1, 2 * rank + 1)
+        np.testing.assert_allclose(
+            D @ D.transpose(0, 2, 1),
+            np.broadcast_to(np.eye(2 * rank + 1), D.shape),
+            atol=1e-12,
+        )
+
+    with pytest.raises(ValueError):
+        spherical_rotation_matrices(C, 5)
+
+
+def test_rotate_int_multipoles_batched():
+
+    ints = IntDirectory(
+        example_dir
+        / "example_point_directory"
+        / "WD0000.pointdir"
+        / "WD0000_atomicfiles"
+    )
+    rng = np.random.default_rng(0)
+    C = _random_rotation_matrices(1, rng)[0]
+
+    for int_file in ints:
+        local_multipoles = int_file.local_spherical_multipoles(C)
+        names = list(local_multipoles.keys())
+        rotated = rotate_multipoles_batched(
+            [int_file.global_spherical_multipoles[name] for name in names], C
+        )
+        np.testing.assert_allclose(
+            rotated, [local_multipoles[name] for name in names], atol=1e-10
+        )
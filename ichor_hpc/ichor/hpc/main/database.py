@@ -53,7 +53,7 @@ def submit_make_database(
         # need to write each pointdirectory to a separate json directory
         text_list.append(f"pd_parent = Path('{str(points_dir_path.absolute())}')")
         text_list.append(
-            f"PointsDirectoryParent(pd_parent).{str_database_method}('{db_name}')"
+            f"PointsDirectoryParent(pd_parent).{str_database_method}('{db_name}', ncores={ncores})"
         )
 
         return submit_free_flow_python_command_on_compute(
@@ -69,7 +69,7 @@ def submit_make_database(
         text_list.append("from ichor.core.files import PointsDirectory")
         text_list.append("from pathlib import Path")
         text_list.append(f"pd = PointsDirectory('{str(points_dir_path.absolute())}')")
-        text_list.append(f"pd.{str_database_method}('{db_name}')")
+        text_list.append(f"pd.{str_database_method}('{db_name}', ncores={ncores})")
 
         return submit_free_flow_python_command_on_compute(
             text_list, SCRIPT_NAMES["pd_to_database"], ncores=ncores